@@ -1,4 +1,29 @@
 from .base import ClusteringStrategy
+from .weighted_points import WeightedPoints
 from .kmeans_clustering import KMeansClusteringService
+from .minibatch_clustering import MiniBatchKMeansClusteringService
+from .kmedoids_clustering import KMedoidsClusteringService
+from .global_clustering import GlobalClustering
+from .sweep_clustering import SweepClustering
+from .auto_k_clustering import AutoKClustering, ValutazioneK
+from .recursive_splitting import NodoCluster, RecursiveSplittingClustering
+from .capacity_balanced import CapacityBalancedClustering
+from .grid_aggregation import GridAggregationClustering
+from .cached_clustering import CachedClusteringStrategy
 
-__all__ = ["ClusteringStrategy", "KMeansClusteringService"]
+__all__ = [
+    "ClusteringStrategy",
+    "WeightedPoints",
+    "KMeansClusteringService",
+    "MiniBatchKMeansClusteringService",
+    "KMedoidsClusteringService",
+    "GlobalClustering",
+    "SweepClustering",
+    "AutoKClustering",
+    "ValutazioneK",
+    "RecursiveSplittingClustering",
+    "NodoCluster",
+    "CapacityBalancedClustering",
+    "GridAggregationClustering",
+    "CachedClusteringStrategy",
+]
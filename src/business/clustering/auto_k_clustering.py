@@ -0,0 +1,166 @@
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+import numpy as np
+from .base import ClusteringStrategy
+from .kmeans_clustering import KMeansClusteringService
+from src.business.optimization.base import OptimizationStrategy
+from src.business.optimization.spatial_index import proietta_km
+from src.data.models.studente import Studente
+from src.data.models.duration_matrix import DurationMatrix
+
+
+# Stato dei processi worker: studenti, matrice stimata e stimatore inviati una volta
+_studenti_worker: Optional[List[Studente]] = None
+_matrice_worker: Optional[DurationMatrix] = None
+_stimatore_worker: Optional[OptimizationStrategy] = None
+
+
+def _inizializza_worker(
+    studenti: List[Studente], matrice: DurationMatrix, stimatore: OptimizationStrategy
+) -> None:
+    """Initializer del process pool: ogni k riusa gli stessi dati"""
+    global _studenti_worker, _matrice_worker, _stimatore_worker
+    _studenti_worker, _matrice_worker, _stimatore_worker = studenti, matrice, stimatore
+
+
+def _valuta_worker(k: int) -> Tuple[int, int]:
+    """Task eseguito nel worker: valutazione di un k"""
+    assert _studenti_worker is not None and _matrice_worker is not None
+    assert _stimatore_worker is not None
+    return _valuta(k, _studenti_worker, _matrice_worker, _stimatore_worker)
+
+
+def _valuta(
+    k: int,
+    studenti: List[Studente],
+    matrice: DurationMatrix,
+    stimatore: OptimizationStrategy,
+) -> Tuple[int, int]:
+    """
+    (percorsi da scaricare, auto stimate) con k cluster K-Means.
+    Percorsi = sum L_i (L_i + 1): tutte le coppie ordinate tra le L_i
+    località del cluster e la destinazione, come in modalità popola.
+    """
+    percorsi, auto = 0, 0
+    for cluster in KMeansClusteringService(k).cluster_studenti(studenti):
+        n_localita = len({s.localita for s in cluster})
+        percorsi += n_localita * (n_localita + 1)
+        auto += len(stimatore.optimize_cluster(cluster, matrice))
+    return percorsi, auto
+
+
+@dataclass(frozen=True)
+class ValutazioneK:
+    """Riga della tabella di confronto tra numeri di cluster"""
+
+    k: int
+    percorsi: int  # Chiamate API di routing richieste da popola
+    auto: int  # Flotta stimata su durate in linea d'aria
+
+
+class AutoKClustering(ClusteringStrategy):
+    """
+    K-Means con numero di cluster scelto automaticamente tra i candidati.
+    Per ogni k si stimano i percorsi che popola dovrà scaricare e la
+    flotta, ottimizzando con lo stimatore su durate in linea d'aria alla
+    velocita_kmh (i percorsi reali non sono ancora in cache). Tra i k con
+    flotta entro tolleranza_flotta dalla migliore vince quello con meno
+    percorsi. La stima non usa la cache: popola e ottimizza scelgono lo
+    stesso k sugli stessi studenti.
+    """
+
+    def __init__(
+        self,
+        candidati_k: List[int],
+        stimatore: OptimizationStrategy,
+        coordinate_destinazione: Callable[[], Optional[Tuple[float, float]]],
+        comune_destinazione: str = "DALMINE",
+        tolleranza_flotta: float = 0.02,
+        velocita_kmh: float = 50.0,
+        numero_worker: int = 1,
+    ):
+        self.candidati_k = sorted(set(candidati_k))
+        self.stimatore = stimatore
+        self.coordinate_destinazione = coordinate_destinazione
+        self.destinazione = comune_destinazione
+        self.tolleranza_flotta = tolleranza_flotta
+        self.velocita_kmh = velocita_kmh
+        self.numero_worker = numero_worker
+        self.k_scelto: Optional[int] = None
+        self.valutazioni: List[ValutazioneK] = []
+        self.n_clusters = self.candidati_k[0]  # Il k scelto dopo la valutazione
+
+    def cluster_studenti(self, studenti: List[Studente]) -> List[List[Studente]]:
+        """Valuta i candidati, stampa il confronto e applica il k scelto"""
+        studenti_validi = [s for s in studenti if s.coordinate is not None]
+        candidati = [k for k in self.candidati_k if k <= len(studenti_validi)]
+        if not candidati:
+            raise ValueError(
+                f"Studenti insufficienti ({len(studenti_validi)}) "
+                f"per {self.candidati_k[0]} cluster"
+            )
+
+        matrice = self._matrice_stimata(studenti_validi)
+        if self.numero_worker > 1 and len(candidati) > 1:
+            risultati = self._valuta_parallelo(candidati, studenti_validi, matrice)
+        else:
+            risultati = {
+                k: _valuta(k, studenti_validi, matrice, self.stimatore)
+                for k in candidati
+            }
+
+        self.valutazioni = [ValutazioneK(k, *risultati[k]) for k in candidati]
+        self.k_scelto = self._scegli(self.valutazioni)
+        self.n_clusters = self.k_scelto
+        self._stampa_tabella()
+        return KMeansClusteringService(self.k_scelto).cluster_studenti(studenti_validi)
+
+    def _scegli(self, valutazioni: List[ValutazioneK]) -> int:
+        """Meno percorsi tra i k con flotta entro tolleranza, poi flotta e k minori"""
+        soglia = min(v.auto for v in valutazioni) * (1 + self.tolleranza_flotta)
+        ammessi = [v for v in valutazioni if v.auto <= soglia]
+        return min(ammessi, key=lambda v: (v.percorsi, v.auto, v.k)).k
+
+    def _stampa_tabella(self) -> None:
+        print("Scelta automatica del numero di cluster:")
+        print(f"  {'k':>4} {'percorsi':>10} {'auto stimate':>13}")
+        for v in self.valutazioni:
+            segno = "  <-" if v.k == self.k_scelto else ""
+            print(f"  {v.k:>4} {v.percorsi:>10} {v.auto:>13}{segno}")
+
+    def _matrice_stimata(self, studenti: List[Studente]) -> DurationMatrix:
+        """Durate in linea d'aria tra le località degli studenti e la destinazione"""
+        coordinate_dest = self.coordinate_destinazione()
+        if coordinate_dest is None:
+            raise ValueError(
+                f"Coordinate di {self.destinazione} mancanti: "
+                "necessarie per stimare la flotta"
+            )
+        coordinate: Dict[str, Tuple[float, float]] = {
+            s.localita: s.coordinate for s in studenti if s.coordinate is not None
+        }
+        coordinate[self.destinazione] = coordinate_dest
+
+        localita = list(coordinate)
+        punti = proietta_km(
+            np.array([coordinate[loc] for loc in localita], dtype=float)
+        )
+        km = np.hypot(*(punti[:, None, :] - punti[None, :, :]).transpose(2, 0, 1))
+        return DurationMatrix(
+            localita=localita, durate=km / self.velocita_kmh * 3600, distanze=km * 1000
+        )
+
+    def _valuta_parallelo(
+        self,
+        candidati: List[int],
+        studenti: List[Studente],
+        matrice: DurationMatrix,
+    ) -> Dict[int, Tuple[int, int]]:
+        """Un task per k su un process pool: i dati viaggiano una volta per worker"""
+        with ProcessPoolExecutor(
+            max_workers=min(self.numero_worker, len(candidati)),
+            initializer=_inizializza_worker,
+            initargs=(studenti, matrice, self.stimatore),
+        ) as executor:
+            return dict(zip(candidati, executor.map(_valuta_worker, candidati)))
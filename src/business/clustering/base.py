@@ -10,6 +10,8 @@ class ClusteringStrategy(ABC):
     mantenendo il resto del codice invariato.
     """
 
+    n_clusters: int  # Cluster richiesti (attributo o property dei decoratori)
+
     @abstractmethod
     def cluster_studenti(self, studenti: List[Studente]) -> List[List[Studente]]:
         """
@@ -22,3 +24,10 @@ class ClusteringStrategy(ABC):
             Lista di cluster (ogni cluster è una lista di studenti)
         """
         pass
+
+    def partial_fit(self, studenti: List[Studente]) -> None:
+        """
+        Riceve gli studenti man mano che vengono geocodificati, prima di
+        cluster_studenti. Di default non fa nulla: serve alle strategie
+        incrementali.
+        """
@@ -0,0 +1,115 @@
+import hashlib
+import json
+from collections import Counter
+from typing import Dict, List, Optional
+from .base import ClusteringStrategy
+from src.data.repositories.cache_repository import ClusteringCache
+from src.data.models.studente import Studente
+
+
+class CachedClusteringStrategy(ClusteringStrategy):
+    """
+    Decoratore: riusa le assegnazioni salvate in ClusteringCache.
+    La chiave è lo SHA-256 di località, coordinate e numero di studenti
+    per località, più i parametri del clustering: popola e ottimizza
+    ottengono gli stessi cluster (quindi gli stessi percorsi necessari)
+    senza rieseguire la strategia base. Quando gli input cambiano
+    cambia la chiave e il clustering si ricalcola.
+    """
+
+    def __init__(
+        self,
+        base: ClusteringStrategy,
+        cache: ClusteringCache,
+        parametri: Dict[str, object],
+    ):
+        self.base = base
+        self.cache = cache
+        self.parametri = parametri
+
+    @property
+    def n_clusters(self) -> int:
+        return self.base.n_clusters
+
+    @n_clusters.setter
+    def n_clusters(self, valore: int) -> None:
+        self.base.n_clusters = valore
+
+    def partial_fit(self, studenti: List[Studente]) -> None:
+        self.base.partial_fit(studenti)
+
+    def cluster_studenti(self, studenti: List[Studente]) -> List[List[Studente]]:
+        """Cluster dalla cache se la chiave è presente, altrimenti dalla base"""
+        studenti_validi = [s for s in studenti if s.coordinate is not None]
+        chiave = self.chiave(studenti_validi)
+
+        assegnazioni = self.cache.get(chiave)
+        if assegnazioni is not None:
+            clusters = self._ricostruisci(studenti_validi, assegnazioni)
+            if clusters is not None:
+                print(f"Cluster dalla cache ({chiave[:12]})")
+                return clusters
+
+        clusters = self.base.cluster_studenti(studenti)
+        assegnazioni = self._assegnazioni(studenti_validi, clusters)
+        if assegnazioni is not None:
+            self.cache.set(chiave, assegnazioni)
+            self.cache.save()
+        return clusters
+
+    def chiave(self, studenti: List[Studente]) -> str:
+        """Hash degli input: (località, coordinate, studenti) ordinati e parametri"""
+        conteggi = Counter(s.localita for s in studenti)
+        coordinate = {
+            s.localita: list(s.coordinate) for s in studenti if s.coordinate is not None
+        }
+        contenuto = {
+            "parametri": self.parametri,
+            "localita": [
+                [loc, coordinate.get(loc), conteggi[loc]] for loc in sorted(conteggi)
+            ],
+        }
+        testo = json.dumps(contenuto, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(testo.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _assegnazioni(
+        studenti: List[Studente], clusters: List[List[Studente]]
+    ) -> Optional[Dict[str, List[int]]]:
+        """
+        Cluster di ogni studente, raggruppati per località in ordine di
+        lista; None se la base non ha assegnato tutti gli studenti.
+        """
+        cluster_di = {id(s): i for i, cluster in enumerate(clusters) for s in cluster}
+        assegnazioni: Dict[str, List[int]] = {}
+        for s in studenti:
+            if id(s) not in cluster_di:
+                return None
+            assegnazioni.setdefault(s.localita, []).append(cluster_di[id(s)])
+        return assegnazioni
+
+    @staticmethod
+    def _ricostruisci(
+        studenti: List[Studente], assegnazioni: Dict[str, List[int]]
+    ) -> Optional[List[List[Studente]]]:
+        """
+        Cluster dalle assegnazioni salvate; None se non corrispondono agli
+        studenti (voce corrotta o collisione).
+        """
+        posizione: Dict[str, int] = {}
+        etichette = []
+        for s in studenti:
+            k = posizione.get(s.localita, 0)
+            salvate = assegnazioni.get(s.localita, [])
+            if k >= len(salvate):
+                return None
+            etichette.append(salvate[k])
+            posizione[s.localita] = k + 1
+        if any(posizione.get(loc, 0) != len(v) for loc, v in assegnazioni.items()):
+            return None
+
+        n_clusters = max(etichette, default=-1) + 1
+        clusters: List[List[Studente]] = [[] for _ in range(n_clusters)]
+        for s, etichetta in zip(studenti, etichette):
+            clusters[etichetta].append(s)
+        return [c for c in clusters if c]
@@ -0,0 +1,126 @@
+import math
+from typing import List, Optional, Tuple
+import numpy as np
+from .base import ClusteringStrategy
+from src.business.optimization.spatial_index import proietta_km
+from src.data.models.studente import Studente
+
+
+class CapacityBalancedClustering(ClusteringStrategy):
+    """
+    Decoratore: sposta studenti di confine tra cluster perché le dimensioni
+    tendano a multipli della capacità auto. Un cluster con resto r > 0
+    richiede un'auto in più per r studenti: se un cluster vicino ha resto
+    s > 0 con r + s <= capacità, trasferirgli gli r studenti più vicini
+    toglie un'auto al limite inferiore sum(ceil(n_i / capacità)) senza
+    aggiungerne altrove.
+    I trasferimenti si applicano dal più economico (km in più verso il
+    centroide di arrivo rispetto a quello di partenza, centroidi fissi)
+    finché il costo medio per studente resta entro max_spostamento_km.
+    """
+
+    def __init__(
+        self,
+        base: ClusteringStrategy,
+        capacita_auto: int,
+        max_spostamento_km: float = 5.0,
+    ):
+        self.base = base
+        self.capacita_auto = capacita_auto
+        self.max_spostamento_km = max_spostamento_km
+
+    @property
+    def n_clusters(self) -> int:
+        return self.base.n_clusters
+
+    @n_clusters.setter
+    def n_clusters(self, valore: int) -> None:
+        self.base.n_clusters = valore
+
+    def partial_fit(self, studenti: List[Studente]) -> None:
+        self.base.partial_fit(studenti)
+
+    def cluster_studenti(self, studenti: List[Studente]) -> List[List[Studente]]:
+        """Cluster della base con i trasferimenti di confine applicati"""
+        clusters = [list(c) for c in self.base.cluster_studenti(studenti)]
+        if len(clusters) < 2:
+            return clusters
+
+        # Un'unica proiezione per tutti i cluster
+        tutti = proietta_km(
+            np.array([s.coordinate for c in clusters for s in c], dtype=float)
+        )
+        tagli = np.cumsum([len(c) for c in clusters])[:-1]
+        punti = np.split(tutti, tagli)
+        centroidi = np.array([p.mean(axis=0) for p in punti])
+
+        auto_iniziali = self._auto_minime(clusters)
+        trasferimenti = 0
+        while True:
+            scelta = self._miglior_trasferimento(clusters, punti, centroidi)
+            if scelta is None:
+                break
+            i, j, spostati = scelta
+            self._trasferisci(clusters, punti, i, j, spostati)
+            trasferimenti += 1
+
+        if trasferimenti:
+            print(
+                f"Bilanciamento cluster: {trasferimenti} trasferimenti, "
+                f"auto minime {auto_iniziali} -> {self._auto_minime(clusters)}"
+            )
+        return [c for c in clusters if c]
+
+    def _auto_minime(self, clusters: List[List[Studente]]) -> int:
+        return sum(math.ceil(len(c) / self.capacita_auto) for c in clusters)
+
+    def _miglior_trasferimento(
+        self,
+        clusters: List[List[Studente]],
+        punti: List[np.ndarray],
+        centroidi: np.ndarray,
+    ) -> Optional[Tuple[int, int, np.ndarray]]:
+        """
+        (donatore, ricevente, posizioni degli studenti da spostare) del
+        trasferimento ammissibile più economico, o None.
+        """
+        resti = np.array([len(c) % self.capacita_auto for c in clusters])
+        costo_migliore = float("inf")
+        migliore: Optional[Tuple[int, int, np.ndarray]] = None
+        for i in np.flatnonzero(resti > 0):
+            r = int(resti[i])
+            riceventi = np.flatnonzero(
+                (resti > 0) & (resti + r <= self.capacita_auto)
+            )
+            riceventi = riceventi[riceventi != i]
+            if not len(riceventi):
+                continue
+
+            proprio = np.hypot(*(punti[i] - centroidi[i]).T)
+            for j in riceventi:
+                extra = np.hypot(*(punti[i] - centroidi[j]).T) - proprio
+                if r < len(extra):
+                    spostati = np.argpartition(extra, r - 1)[:r]
+                else:
+                    spostati = np.arange(len(extra))
+                costo = float(extra[spostati].sum())
+                if costo <= self.max_spostamento_km * r and costo < costo_migliore:
+                    costo_migliore, migliore = costo, (int(i), int(j), spostati)
+
+        return migliore
+
+    @staticmethod
+    def _trasferisci(
+        clusters: List[List[Studente]],
+        punti: List[np.ndarray],
+        i: int,
+        j: int,
+        spostati: np.ndarray,
+    ) -> None:
+        """Sposta gli studenti alle posizioni date dal cluster i al cluster j"""
+        maschera = np.zeros(len(clusters[i]), dtype=bool)
+        maschera[spostati] = True
+        clusters[j].extend(s for s, m in zip(clusters[i], maschera) if m)
+        clusters[i] = [s for s, m in zip(clusters[i], maschera) if not m]
+        punti[j] = np.vstack((punti[j], punti[i][maschera]))
+        punti[i] = punti[i][~maschera]
@@ -0,0 +1,19 @@
+from typing import List
+from .base import ClusteringStrategy
+from src.data.models.studente import Studente
+
+
+class GlobalClustering(ClusteringStrategy):
+    """
+    Nessun clustering: un unico cluster con tutti gli studenti geocodificati.
+    Pensato per l'ottimizzazione globale con ricerca ristretta alle località
+    vicine (GreedyOptimizer con k_localita_vicine), che non perde gli
+    abbinamenti a cavallo dei confini tra cluster.
+    """
+
+    n_clusters = 1
+
+    def cluster_studenti(self, studenti: List[Studente]) -> List[List[Studente]]:
+        """Studenti con coordinate, in un solo cluster (nessuno se vuoto)"""
+        studenti_validi = [s for s in studenti if s.coordinate is not None]
+        return [studenti_validi] if studenti_validi else []
@@ -0,0 +1,76 @@
+from dataclasses import replace
+from typing import Dict, List, Tuple
+import numpy as np
+from .base import ClusteringStrategy
+from .weighted_points import WeightedPoints
+from src.business.optimization.spatial_index import proietta_km
+from src.data.models.studente import Studente
+
+
+class GridAggregationClustering(ClusteringStrategy):
+    """
+    Decoratore: prima del clustering raccoglie le coordinate in celle di
+    una griglia di lato cella_km e porta ogni studente sul baricentro
+    pesato della propria cella. WeightedPoints deduplica le coordinate
+    uguali, quindi la strategia base lavora su un punto pesato per cella:
+    le sue strutture spaziali dipendono dalle celle, non dalle località,
+    anche con iscritti da tutta la Lombardia.
+    La base riceve copie degli studenti con le coordinate della cella e i
+    cluster tornano agli oggetti originali, che non vengono modificati.
+    Con una base che assegna per punto (K-Means, sweep) gli
+    studenti di una cella finiscono nello stesso cluster; una base che
+    sposta singoli studenti (CapacityBalanced) può separarli.
+    """
+
+    def __init__(self, base: ClusteringStrategy, cella_km: float):
+        self.base = base
+        self.cella_km = cella_km
+
+    @property
+    def n_clusters(self) -> int:
+        return self.base.n_clusters
+
+    @n_clusters.setter
+    def n_clusters(self, valore: int) -> None:
+        self.base.n_clusters = valore
+
+    def partial_fit(self, studenti: List[Studente]) -> None:
+        self.base.partial_fit(studenti)
+
+    def cluster_studenti(self, studenti: List[Studente]) -> List[List[Studente]]:
+        """Cluster della base calcolati sulle celle"""
+        studenti_validi = [s for s in studenti if s.coordinate is not None]
+        if not studenti_validi:
+            return self.base.cluster_studenti(studenti_validi)
+
+        punti = WeightedPoints.da_studenti(studenti_validi)
+        cella, baricentri = self._celle(punti)
+        print(f"Aggregazione su griglia: {len(punti)} punti -> {len(baricentri)} celle")
+
+        coordinate_cella = list(map(tuple, baricentri.tolist()))
+        copie = [
+            replace(studente, coordinate=coordinate_cella[c])
+            for studente, c in zip(studenti_validi, cella[punti.indice].tolist())
+        ]
+        originale: Dict[int, Studente] = {
+            id(copia): studente for copia, studente in zip(copie, studenti_validi)
+        }
+        clusters = self.base.cluster_studenti(copie)
+        return [[originale[id(copia)] for copia in cluster] for cluster in clusters]
+
+    def _celle(self, punti: WeightedPoints) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        (cella di ogni punto, baricentro pesato di ogni cella): le celle
+        sono quadrati di cella_km sul piano proiettato.
+        """
+        griglia = np.floor(proietta_km(punti.coordinate) / self.cella_km)
+        _, cella = np.unique(griglia.astype(np.int64), axis=0, return_inverse=True)
+        cella = cella.reshape(-1)
+        pesi = np.bincount(cella, weights=punti.pesi)
+        baricentri = np.column_stack(
+            [
+                np.bincount(cella, weights=punti.pesi * punti.coordinate[:, i]) / pesi
+                for i in range(2)
+            ]
+        )
+        return cella, baricentri
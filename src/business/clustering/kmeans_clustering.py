@@ -1,14 +1,16 @@
-import numpy as np
 from sklearn.cluster import KMeans
 from typing import List
 from .base import ClusteringStrategy
+from .weighted_points import WeightedPoints
 from src.data.models.studente import Studente
 
 
 class KMeansClusteringService(ClusteringStrategy):
     """
     Implementazione clustering con K-Means.
-    Raggruppa studenti per vicinanza geografica.
+    Raggruppa studenti per vicinanza geografica, lavorando sulle
+    coordinate distinte pesate per numero di studenti: il costo dipende
+    dalle località, non dagli iscritti.
     """
 
     def __init__(self, n_clusters: int):
@@ -27,18 +29,14 @@ class KMeansClusteringService(ClusteringStrategy):
                 f"per {self.n_clusters} cluster"
             )
 
-        # Matrice coordinate
-        coordinate_matrix = np.array([s.coordinate for s in studenti_validi])
+        # Coordinate distinte pesate per numero di studenti
+        punti = WeightedPoints.da_studenti(studenti_validi)
+        n_clusters = min(self.n_clusters, len(punti))
 
         # Esecuzione K-Means
-        kmeans = KMeans(n_clusters=self.n_clusters, random_state=0, n_init="auto").fit(
-            coordinate_matrix
+        kmeans = KMeans(n_clusters=n_clusters, random_state=0, n_init="auto").fit(
+            punti.coordinate, sample_weight=punti.pesi
         )
 
-        # Raggruppa studenti per label
-        clusters = [[] for _ in range(self.n_clusters)]
-        for studente, label in zip(studenti_validi, kmeans.labels_):
-            clusters[label].append(studente)
-
-        # Filtra cluster vuoti
-        return [c for c in clusters if c]
+        # Raggruppa studenti per label (senza cluster vuoti)
+        return punti.raggruppa(studenti_validi, kmeans.labels_, n_clusters)
@@ -0,0 +1,171 @@
+from typing import Callable, List, Tuple
+import numpy as np
+from .base import ClusteringStrategy
+from src.business.optimization.spatial_index import proietta_km
+from src.data.models.studente import Studente
+from src.data.models.duration_matrix import DurationMatrix
+
+
+class KMedoidsClusteringService(ClusteringStrategy):
+    """
+    K-medoids sui tempi stradali tra località, pesati per numero di studenti.
+    Le durate della cache sono simmetrizzate (media dei due versi); le
+    coppie senza percorso in cache usano la distanza in linea d'aria alla
+    velocita_fallback_kmh, così la strategia funziona anche a cache parziale
+    (modalità popola).
+    Inizializzazione BUILD, poi scambi in stile FasterPAM: per ogni località
+    candidata il guadagno di sostituire ciascun medoide si calcola in un
+    solo passaggio vettoriale O(località), e il primo scambio migliorativo
+    si applica subito.
+    """
+
+    def __init__(
+        self,
+        n_clusters: int,
+        fornitore_matrice: Callable[[], DurationMatrix],
+        velocita_fallback_kmh: float = 50.0,
+        max_passate: int = 50,
+    ):
+        self.n_clusters = n_clusters
+        self.fornitore_matrice = fornitore_matrice
+        self.velocita_fallback = velocita_fallback_kmh
+        self.max_passate = max_passate
+        self.medoidi: List[str] = []
+
+    def cluster_studenti(self, studenti: List[Studente]) -> List[List[Studente]]:
+        """Un cluster per medoide, con le località assegnate al più vicino"""
+        studenti_validi = [s for s in studenti if s.coordinate is not None]
+
+        if len(studenti_validi) < self.n_clusters:
+            raise ValueError(
+                f"Studenti insufficienti ({len(studenti_validi)}) "
+                f"per {self.n_clusters} cluster"
+            )
+
+        localita = sorted({s.localita for s in studenti_validi})
+        indice = {loc: i for i, loc in enumerate(localita)}
+        loc_di = np.array([indice[s.localita] for s in studenti_validi])
+        pesi = np.bincount(loc_di, minlength=len(localita)).astype(float)
+
+        coordinate = {
+            s.localita: s.coordinate for s in studenti_validi if s.coordinate is not None
+        }
+        distanze = self._distanze(localita, [coordinate[loc] for loc in localita])
+
+        medoidi = self._build(distanze, pesi, min(self.n_clusters, len(localita)))
+        medoidi = self._scambi(distanze, pesi, medoidi)
+        self.medoidi = [localita[m] for m in medoidi]
+
+        etichette = np.argmin(distanze[medoidi], axis=0)
+        clusters: List[List[Studente]] = [[] for _ in medoidi]
+        for studente, loc in zip(studenti_validi, loc_di):
+            clusters[etichette[loc]].append(studente)
+        return [c for c in clusters if c]
+
+    def _distanze(self, localita: List[str], coordinate: List[tuple]) -> np.ndarray:
+        """Durate simmetriche in secondi, linea d'aria dove manca la cache"""
+        andata = self.fornitore_matrice().sottomatrice_durate(localita)
+        ritorno = andata.T
+        simmetriche = np.where(
+            np.isnan(andata),
+            ritorno,
+            np.where(np.isnan(ritorno), andata, (andata + ritorno) / 2),
+        )
+
+        mancanti = np.isnan(simmetriche)
+        if mancanti.any():
+            punti = proietta_km(np.array(coordinate, dtype=float))
+            km = np.hypot(*(punti[:, None, :] - punti[None, :, :]).transpose(2, 0, 1))
+            simmetriche[mancanti] = km[mancanti] / self.velocita_fallback * 3600
+        return simmetriche
+
+    @staticmethod
+    def _build(distanze: np.ndarray, pesi: np.ndarray, k: int) -> np.ndarray:
+        """Medoidi iniziali: ognuno riduce il più possibile il costo pesato"""
+        medoidi = [int(np.argmin(distanze @ pesi))]
+        vicino = distanze[medoidi[0]].copy()
+        for _ in range(1, k):
+            guadagno = np.maximum(vicino[None, :] - distanze, 0.0) @ pesi
+            guadagno[medoidi] = -1.0
+            m = int(np.argmax(guadagno))
+            medoidi.append(m)
+            np.minimum(vicino, distanze[m], out=vicino)
+        return np.array(medoidi)
+
+    def _scambi(
+        self, distanze: np.ndarray, pesi: np.ndarray, medoidi: np.ndarray
+    ) -> np.ndarray:
+        """
+        Scambi medoide/località finché un giro completo delle candidate non
+        migliora il costo (o si esauriscono le passate).
+        """
+        n, k = len(distanze), len(medoidi)
+        if k < 2 or k >= n:
+            return medoidi
+        medoidi = medoidi.copy()
+        vicino, d_vicino, d_secondo = self._assegna(distanze, medoidi)
+        scala = max(float(d_vicino @ pesi), 1.0) * 1e-12
+
+        x, senza_miglioramenti = 0, 0
+        while senza_miglioramenti < n and x < n * self.max_passate:
+            candidata = x % n
+            x += 1
+            if candidata in medoidi:
+                senza_miglioramenti += 1
+                continue
+
+            delta, m = self._miglior_scambio(
+                distanze[candidata], pesi, vicino, d_vicino, d_secondo, k
+            )
+            if delta < -scala:
+                medoidi[m] = candidata
+                vicino, d_vicino, d_secondo = self._assegna(distanze, medoidi)
+                senza_miglioramenti = 0
+            else:
+                senza_miglioramenti += 1
+        return medoidi
+
+    @staticmethod
+    def _assegna(
+        distanze: np.ndarray, medoidi: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Medoide più vicino e distanze dal primo e dal secondo più vicino"""
+        verso = distanze[medoidi]
+        ordine = np.argpartition(verso, 1, axis=0)[:2]
+        colonne = np.arange(verso.shape[1])
+        return ordine[0], verso[ordine[0], colonne], verso[ordine[1], colonne]
+
+    @staticmethod
+    def _miglior_scambio(
+        da_candidata: np.ndarray,
+        pesi: np.ndarray,
+        vicino: np.ndarray,
+        d_vicino: np.ndarray,
+        d_secondo: np.ndarray,
+        k: int,
+    ) -> Tuple[float, int]:
+        """
+        Variazione di costo dello scambio migliore per una candidata e
+        posizione del medoide da sostituire (FasterPAM).
+        """
+        # Perdita se si toglie ogni medoide senza aggiungere la candidata
+        delta = np.bincount(vicino, pesi * (d_secondo - d_vicino), minlength=k)
+
+        piu_vicina = da_candidata < d_vicino
+        # Punti che passano alla candidata qualunque medoide si tolga
+        condiviso = float(pesi[piu_vicina] @ (da_candidata - d_vicino)[piu_vicina])
+        delta += np.bincount(
+            vicino[piu_vicina],
+            (pesi * (d_vicino - d_secondo))[piu_vicina],
+            minlength=k,
+        )
+        # Punti che, tolto il loro medoide, preferiscono la candidata al secondo
+        intermedia = ~piu_vicina & (da_candidata < d_secondo)
+        delta += np.bincount(
+            vicino[intermedia],
+            (pesi * (da_candidata - d_secondo))[intermedia],
+            minlength=k,
+        )
+
+        m = int(np.argmin(delta))
+        return float(delta[m]) + condiviso, m
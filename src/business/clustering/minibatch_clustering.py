@@ -0,0 +1,129 @@
+from typing import List, Optional, Union
+import numpy as np
+from sklearn.cluster import MiniBatchKMeans
+from .base import ClusteringStrategy
+from .weighted_points import WeightedPoints
+from src.data.repositories.cache_repository import CentroidiCache
+from src.data.models.studente import Studente
+
+
+class MiniBatchKMeansClusteringService(ClusteringStrategy):
+    """
+    Clustering con MiniBatchKMeans, pensato per grandi iscrizioni.
+    I centroidi di ogni esecuzione finiscono in CentroidiCache: la volta
+    successiva si riparte da lì con una sola inizializzazione e poche
+    iterazioni, invece di un K-Means da zero con n_init="auto". Dopo una
+    piccola variazione degli iscritti i centroidi sono già quasi a
+    convergenza.
+    Ogni esecuzione sovrascrive i centroidi salvati: l'archivio va usato
+    solo insieme alla cache dei cluster, così ottimizza riprende i cluster
+    di popola invece di ripartire dai centroidi appena aggiornati.
+    Con l'archivio, partial_fit riceve gli studenti man mano che vengono
+    caricati e aggiorna i centroidi a blocchi di batch_size studenti;
+    cluster_studenti parte poi dai centroidi così aggiornati.
+    """
+
+    def __init__(
+        self,
+        n_clusters: int,
+        archivio: Optional[CentroidiCache] = None,
+        batch_size: int = 1024,
+        max_iterazioni_warm: int = 10,
+        seed: int = 0,
+    ):
+        self.n_clusters = n_clusters
+        self.archivio = archivio
+        self.batch_size = batch_size
+        self.max_iterazioni_warm = max_iterazioni_warm
+        self.seed = seed
+        self.modello: Optional[MiniBatchKMeans] = None  # Stato di partial_fit
+        self._in_attesa: List[Studente] = []  # Studenti del blocco successivo
+
+    @property
+    def chiave(self) -> str:
+        return f"minibatch-{self.n_clusters}"
+
+    def partial_fit(self, studenti: List[Studente]) -> None:
+        """
+        Accoda gli studenti geocodificati e aggiorna i centroidi a ogni
+        blocco completo. Senza archivio non fa nulla: centroidi solo in
+        memoria non arriverebbero a ottimizza, che ripartirebbe da zero.
+        """
+        if self.archivio is None:
+            return
+        self._in_attesa.extend(s for s in studenti if s.coordinate is not None)
+        if len(self._in_attesa) < self.batch_size:
+            return
+
+        punti = WeightedPoints.da_studenti(self._in_attesa)
+        if self.modello is None:
+            centroidi = self._centroidi_salvati()
+            if centroidi is None and len(punti) < self.n_clusters:
+                return  # Punti distinti insufficienti per inizializzare: si accumula
+            self.modello = self._modello(
+                centroidi if centroidi is not None else "k-means++", self.n_clusters
+            )
+        self.modello.partial_fit(punti.coordinate, sample_weight=punti.pesi)
+        self._in_attesa = []
+
+    def cluster_studenti(self, studenti: List[Studente]) -> List[List[Studente]]:
+        """
+        MiniBatchKMeans sulle coordinate distinte pesate, a caldo dai
+        centroidi di partial_fit o salvati se disponibili.
+        """
+        studenti_validi = [s for s in studenti if s.coordinate is not None]
+
+        if len(studenti_validi) < self.n_clusters:
+            raise ValueError(
+                f"Studenti insufficienti ({len(studenti_validi)}) "
+                f"per {self.n_clusters} cluster"
+            )
+
+        punti = WeightedPoints.da_studenti(studenti_validi)
+        n_clusters = min(self.n_clusters, len(punti))
+
+        if self.modello is not None and hasattr(self.modello, "cluster_centers_"):
+            centroidi: Optional[np.ndarray] = self.modello.cluster_centers_
+        else:
+            centroidi = self._centroidi_salvati()
+        self.modello, self._in_attesa = None, []
+        if centroidi is not None and len(centroidi) != n_clusters:
+            centroidi = None  # Meno punti distinti che cluster: si riparte da zero
+        warm = centroidi is not None
+
+        init = "k-means++" if centroidi is None else centroidi
+        modello = self._modello(init, n_clusters)
+        modello.fit(punti.coordinate, sample_weight=punti.pesi)
+
+        if self.archivio is not None:
+            self.archivio.set(self.chiave, modello.cluster_centers_.tolist())
+            self.archivio.save()
+
+        print(
+            f"MiniBatchKMeans {'a caldo' if warm else 'da zero'}: "
+            f"{modello.n_iter_} iterazioni"
+        )
+        return punti.raggruppa(studenti_validi, modello.labels_, n_clusters)
+
+    def _centroidi_salvati(self) -> Optional[np.ndarray]:
+        """Centroidi dell'esecuzione precedente, se compatibili"""
+        if self.archivio is None:
+            return None
+        centroidi = self.archivio.get(self.chiave)
+        if centroidi is None or len(centroidi) != self.n_clusters:
+            return None
+        return np.array(centroidi, dtype=float)
+
+    def _modello(
+        self, init: Union[str, np.ndarray], n_clusters: int
+    ) -> MiniBatchKMeans:
+        """Con centroidi iniziali (a caldo): un'inizializzazione e poche iterazioni"""
+        warm = not isinstance(init, str)
+        return MiniBatchKMeans(
+            n_clusters=n_clusters,
+            init=init,
+            n_init=1 if warm else "auto",
+            max_iter=self.max_iterazioni_warm if warm else 100,
+            batch_size=self.batch_size,
+            random_state=self.seed,
+        )
@@ -0,0 +1,116 @@
+import math
+from dataclasses import dataclass, field
+from typing import List, Optional
+from sklearn.cluster import KMeans
+from .base import ClusteringStrategy
+from .weighted_points import WeightedPoints
+from src.data.models.studente import Studente
+
+
+@dataclass
+class NodoCluster:
+    """Nodo dell'albero di suddivisione: le foglie sono i cluster finali"""
+
+    studenti: List[Studente] = field(repr=False)
+    genitore: Optional[int] = None  # Indice del nodo padre in albero
+    figli: List[int] = field(default_factory=list)
+
+    @property
+    def foglia(self) -> bool:
+        return not self.figli
+
+
+class RecursiveSplittingClustering(ClusteringStrategy):
+    """
+    Decoratore: suddivide ricorsivamente con K-Means i cluster della
+    strategia base oltre max_studenti o max_localita (0 = nessun limite),
+    finché ogni pezzo rientra nei limiti. Greedy e popola sono quadratici
+    nella dimensione del cluster: un cluster enorme (es. tutta BERGAMO)
+    domina il tempo totale.
+    L'albero padre-figlio dell'ultima esecuzione resta in `albero`
+    (radici = cluster della base) per il ribilanciamento ai confini.
+    Un cluster con una sola località non è divisibile e resta com'è.
+    """
+
+    def __init__(
+        self,
+        base: ClusteringStrategy,
+        max_studenti: int = 0,
+        max_localita: int = 0,
+    ):
+        self.base = base
+        self.max_studenti = max_studenti
+        self.max_localita = max_localita
+        self.albero: List[NodoCluster] = []
+        self.foglie: List[int] = []  # foglie[i] = nodo del cluster restituito i
+
+    @property
+    def n_clusters(self) -> int:
+        return self.base.n_clusters
+
+    @n_clusters.setter
+    def n_clusters(self, valore: int) -> None:
+        self.base.n_clusters = valore
+
+    def partial_fit(self, studenti: List[Studente]) -> None:
+        self.base.partial_fit(studenti)
+
+    def cluster_studenti(self, studenti: List[Studente]) -> List[List[Studente]]:
+        """Cluster della base, con quelli fuori soglia suddivisi"""
+        self.albero = []
+        self.foglie = []
+        radici = self.base.cluster_studenti(studenti)
+        for cluster in radici:
+            self._suddividi(cluster, None)
+
+        if len(self.foglie) > len(radici):
+            print(
+                f"Suddivisione cluster: {len(radici)} -> {len(self.foglie)} cluster"
+            )
+        return [self.albero[i].studenti for i in self.foglie]
+
+    def _suddividi(self, cluster: List[Studente], genitore: Optional[int]) -> None:
+        """Aggiunge il nodo e, se fuori soglia, i suoi figli"""
+        indice = len(self.albero)
+        self.albero.append(NodoCluster(cluster, genitore))
+        if genitore is not None:
+            self.albero[genitore].figli.append(indice)
+
+        pezzi = self._dividi(cluster) if self._fuori_soglia(cluster) else []
+        if len(pezzi) < 2:
+            self.foglie.append(indice)
+            return
+        for pezzo in pezzi:
+            self._suddividi(pezzo, indice)
+
+    def _fuori_soglia(self, cluster: List[Studente]) -> bool:
+        if 0 < self.max_studenti < len(cluster):
+            return True
+        if self.max_localita > 0:
+            return len({s.localita for s in cluster}) > self.max_localita
+        return False
+
+    def _dividi(self, cluster: List[Studente]) -> List[List[Studente]]:
+        """
+        K-Means sul cluster con il numero di pezzi stimato dalle soglie
+        (almeno 2), limitato dai punti distinti disponibili.
+        """
+        punti = WeightedPoints.da_studenti(cluster)
+        distinti = len(punti)
+        if distinti < 2:
+            return []
+
+        pezzi = 2
+        if self.max_studenti > 0:
+            pezzi = max(pezzi, math.ceil(len(cluster) / self.max_studenti))
+        if self.max_localita > 0:
+            n_localita = len({s.localita for s in cluster})
+            pezzi = max(pezzi, math.ceil(n_localita / self.max_localita))
+        pezzi = min(pezzi, distinti)
+
+        etichette = (
+            KMeans(n_clusters=pezzi, random_state=0, n_init="auto")
+            .fit(punti.coordinate, sample_weight=punti.pesi)
+            .labels_
+        )
+        return punti.raggruppa(cluster, etichette, pezzi)
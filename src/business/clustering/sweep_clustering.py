@@ -0,0 +1,108 @@
+import math
+from typing import Callable, List, Optional, Tuple
+import numpy as np
+from .base import ClusteringStrategy
+from .weighted_points import WeightedPoints
+from src.business.optimization.spatial_index import proietta_km
+from src.data.models.studente import Studente
+
+
+class SweepClustering(ClusteringStrategy):
+    """
+    Clustering a settori angolari attorno alla destinazione.
+    Tutte le auto vanno verso la destinazione: studenti nella stessa
+    direzione possono viaggiare insieme anche se lontani lungo il raggio.
+    Le località si ordinano per angolo (bearing) dalla destinazione,
+    partendo dal varco angolare più ampio, e si tagliano in n_clusters
+    settori consecutivi con circa lo stesso numero di studenti,
+    arrotondato a multipli della capacità auto. Le località non si
+    dividono tra settori.
+    Nessuna iterazione: un ordinamento, O(N + L log L).
+    """
+
+    def __init__(
+        self,
+        n_clusters: int,
+        coordinate_destinazione: Callable[[], Optional[Tuple[float, float]]],
+        capacita_auto: int = 4,
+        comune_destinazione: str = "DALMINE",
+    ):
+        self.n_clusters = n_clusters
+        self.coordinate_destinazione = coordinate_destinazione
+        self.capacita_auto = capacita_auto
+        self.destinazione = comune_destinazione
+
+    def cluster_studenti(self, studenti: List[Studente]) -> List[List[Studente]]:
+        """Settori angolari consecutivi, bilanciati per numero di studenti"""
+        studenti_validi = [s for s in studenti if s.coordinate is not None]
+
+        if len(studenti_validi) < self.n_clusters:
+            raise ValueError(
+                f"Studenti insufficienti ({len(studenti_validi)}) "
+                f"per {self.n_clusters} cluster"
+            )
+
+        centro = self.coordinate_destinazione()
+        if centro is None:
+            raise ValueError(
+                f"Coordinate di {self.destinazione} mancanti: "
+                "necessarie per il clustering a settori"
+            )
+
+        punti = WeightedPoints.da_studenti(studenti_validi)
+        ordine = self._ordine_angolare(punti.coordinate, centro)
+        settore = np.empty(len(punti), dtype=np.intp)
+        for i, (inizio, fine) in enumerate(self._tagli(punti.pesi[ordine])):
+            settore[ordine[inizio:fine]] = i
+        return punti.raggruppa(studenti_validi, settore, self.n_clusters)
+
+    @staticmethod
+    def _ordine_angolare(
+        coordinate: np.ndarray, centro: Tuple[float, float]
+    ) -> np.ndarray:
+        """
+        Punti per angolo crescente (a parità, per distanza), ruotati in modo
+        che la sequenza inizi subito dopo il varco angolare più ampio.
+        """
+        xy = proietta_km(np.vstack((coordinate, centro)))
+        delta = xy[:-1] - xy[-1]
+        angolo = np.arctan2(delta[:, 1], delta[:, 0])  # Nord = 0, senso orario
+        distanza = np.hypot(delta[:, 0], delta[:, 1])
+        ordine = np.lexsort((distanza, angolo))
+
+        if len(ordine) > 1:
+            ordinati = angolo[ordine]
+            varchi = np.diff(ordinati, append=ordinati[0] + 2 * math.pi)
+            inizio = (int(np.argmax(varchi)) + 1) % len(ordine)
+            ordine = np.roll(ordine, -inizio)
+        return ordine
+
+    def _tagli(self, pesi: np.ndarray) -> List[Tuple[int, int]]:
+        """
+        Intervalli [inizio, fine) dei settori lungo la sequenza angolare.
+        Ogni taglio cade sul confine tra località più vicino al proprio
+        obiettivo cumulato, un multiplo della capacità; ogni settore ha
+        almeno una località.
+        """
+        n_punti = len(pesi)
+        k = min(self.n_clusters, n_punti)
+        cumulati = np.cumsum(pesi)
+        per_settore = float(cumulati[-1]) / k
+        capacita = self.capacita_auto
+
+        confini = [0]
+        for i in range(1, k):
+            # Obiettivo cumulato: multiplo della capacità più vicino a i settori medi
+            bersaglio = round(i * per_settore / capacita) * capacita
+            j = int(np.searchsorted(cumulati, bersaglio))
+            # Taglio prima o dopo la località j, il più vicino al bersaglio
+            taglio = j
+            if j < n_punti and (
+                j == 0 or cumulati[j] - bersaglio < bersaglio - cumulati[j - 1]
+            ):
+                taglio = j + 1
+            # Almeno una località per settore, anche per i successivi
+            taglio = min(max(taglio, confini[-1] + 1), n_punti - (k - i))
+            confini.append(taglio)
+        confini.append(n_punti)
+        return list(zip(confini[:-1], confini[1:]))
@@ -1,4 +1,27 @@
-from .base import OptimizationStrategy
+from .base import ImprovementStrategy, OptimizationStrategy
 from .greedy_optimizer import GreedyOptimizer
+from .savings_optimizer import SavingsOptimizer
+from .regret_optimizer import RegretOptimizer
+from .exact_optimizer import ExactOptimizer
+from .grasp_optimizer import GraspOptimizer
+from .annealing_optimizer import AnnealingOptimizer, ParametriAnnealing
+from .improved_optimizer import ImprovedOptimizer
+from .local_search import LocalSearchImprover
+from .stop_order import StopOrderSolver
+from .cross_cluster_rebalancer import CrossClusterRebalancer
 
-__all__ = ["OptimizationStrategy", "GreedyOptimizer"]
\ No newline at end of file
+__all__ = [
+    "OptimizationStrategy",
+    "ImprovementStrategy",
+    "GreedyOptimizer",
+    "SavingsOptimizer",
+    "RegretOptimizer",
+    "ExactOptimizer",
+    "GraspOptimizer",
+    "AnnealingOptimizer",
+    "ParametriAnnealing",
+    "ImprovedOptimizer",
+    "LocalSearchImprover",
+    "StopOrderSolver",
+    "CrossClusterRebalancer",
+]
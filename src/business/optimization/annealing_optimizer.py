@@ -0,0 +1,412 @@
+import math
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+import numpy as np
+from .base import OptimizationStrategy
+from .car_route import CarRoute
+from .cluster_kernel import ClusterKernel
+from src.data.models.studente import Studente
+from src.data.models.equipaggio import Equipaggio
+from src.data.models.duration_matrix import DurationMatrix
+
+
+PESO_AUTO = 3600.0  # Costo di un'auto in più, in secondi di guida equivalenti
+PESO_OCCUPAZIONE = 60.0  # Premio per persone² a bordo: spinge a svuotare le auto
+
+# Soluzione compatta: posizioni nel kernel per ogni auto, autista in testa
+Soluzione = List[List[int]]
+# (soluzione corrente, migliore, costo migliore, mosse) di un'epoca su un'isola
+RisultatoEpoca = Tuple[Soluzione, Soluzione, float, int]
+
+# Stato dei processi worker: kernel e parametri inviati una sola volta
+_kernel_worker: Optional[ClusterKernel] = None
+_parametri_worker: Optional[Tuple[int, float]] = None
+
+
+def _inizializza_worker(
+    kernel: ClusterKernel, capacita_auto: int, max_deviazione: float
+) -> None:
+    """Initializer del process pool: ogni isola riusa lo stesso kernel"""
+    global _kernel_worker, _parametri_worker
+    _kernel_worker = kernel
+    _parametri_worker = (capacita_auto, max_deviazione)
+
+
+def _epoca_worker(argomenti: tuple) -> RisultatoEpoca:
+    """Task eseguito nel worker: un'epoca di annealing su un'isola"""
+    assert _kernel_worker is not None and _parametri_worker is not None
+    return _esegui_epoca(_kernel_worker, *_parametri_worker, *argomenti)
+
+
+def _esegui_epoca(
+    kernel: ClusterKernel,
+    capacita_auto: int,
+    max_deviazione: float,
+    soluzione: Soluzione,
+    seme: np.random.SeedSequence,
+    temperature: Tuple[float, float],
+    mosse: int,
+) -> RisultatoEpoca:
+    """
+    Esegue `mosse` tentativi con raffreddamento geometrico tra le
+    temperature (inizio, fine).
+    Restituisce (soluzione corrente, migliore, costo migliore, mosse).
+    """
+    isola = _Isola(kernel, capacita_auto, max_deviazione, soluzione)
+    rng = np.random.default_rng(seme)
+    temperatura, temperatura_fine = temperature
+    fattore = (temperatura_fine / temperatura) ** (1 / max(mosse, 1))
+
+    # Numeri casuali estratti in blocco: il ciclo resta in Python puro
+    studenti = rng.integers(kernel.n_studenti, size=mosse).tolist()
+    casuali = rng.random((mosse, 4)).tolist()
+
+    for p, u in zip(studenti, casuali):
+        isola.mossa(p, u, temperatura)
+        temperatura *= fattore
+    isola.conferma_migliore()
+    return isola.soluzione(), isola.migliore, isola.costo_migliore, mosse
+
+
+class _Isola:
+    """
+    Stato di una soluzione per l'annealing. Il costo combina auto usate,
+    occupazione e durata dei percorsi; ogni mossa (spostamento o scambio
+    di uno studente) è valutata sui due CarRoute coinvolti: O(capacità).
+    Le auto con durate mancanti restano come sono, fuori dal costo.
+    """
+
+    def __init__(
+        self,
+        kernel: ClusterKernel,
+        capacita_auto: int,
+        max_deviazione: float,
+        soluzione: Soluzione,
+    ):
+        self.kernel = kernel
+        self.capacita_auto = capacita_auto
+        self.max_deviazione = max_deviazione
+        self.loc: List[int] = kernel.loc.tolist()
+
+        self.membri: List[List[int]] = [list(m) for m in soluzione]
+        self.rotte: List[Optional[CarRoute]] = [self._rotta(m) for m in self.membri]
+        self.auto_di: List[int] = [0] * kernel.n_studenti
+        for a, membri in enumerate(self.membri):
+            for p in membri:
+                self.auto_di[p] = a
+
+        # Studenti senza durata verso la destinazione restano dove sono,
+        # come i membri delle auto il cui percorso ha durate mancanti
+        self.mobile = np.isfinite(kernel.durata_dest[kernel.loc]).tolist()
+        for membri, rotta in zip(self.membri, self.rotte):
+            if rotta is not None and not math.isfinite(rotta.costo):
+                for p in membri:
+                    self.mobile[p] = False
+
+        # Studenti per località e località raggiungibili entro la deviazione
+        self.per_localita = [
+            np.flatnonzero(kernel.loc == loc).tolist()
+            for loc in range(len(kernel.localita))
+        ]
+        self.vicine = [
+            np.flatnonzero(
+                (kernel.deviazione[loc] <= max_deviazione)
+                | (kernel.deviazione[:, loc] <= max_deviazione)
+            ).tolist()
+            for loc in range(len(kernel.localita))
+        ]
+
+        self.costo = sum(
+            self._costo_auto(len(m), r)
+            for m, r in zip(self.membri, self.rotte)
+            if r is None or math.isfinite(r.costo)
+        )
+        self.costo_migliore = self.costo
+        self.migliore: Soluzione = self.soluzione()
+        self._da_salvare = False  # Migliore non ancora copiata in self.migliore
+
+    def _rotta(self, membri: List[int]) -> Optional[CarRoute]:
+        """Percorso nell'ordine di partenza dei membri, autista in testa"""
+        if not membri:
+            return None
+        return CarRoute.da_tappe(
+            self.kernel, list(dict.fromkeys(self.loc[p] for p in membri))
+        )
+
+    @staticmethod
+    def _costo_auto(n_membri: int, rotta: Optional[CarRoute]) -> float:
+        """Costo di un'auto; inf se il percorso usa durate mancanti"""
+        if not n_membri or rotta is None:
+            return 0.0
+        if not math.isfinite(rotta.costo):
+            return math.inf
+        return PESO_AUTO + rotta.costo - PESO_OCCUPAZIONE * n_membri**2
+
+    def _ammissibile(self, rotta: Optional[CarRoute]) -> bool:
+        return rotta is None or rotta.deviazione <= self.max_deviazione
+
+    def _senza(self, a: int, p: int) -> Optional[CarRoute]:
+        """Percorso dell'auto a senza il membro p (None se resta vuota)"""
+        if len(self.membri[a]) == 1:
+            return None
+        loc = self.loc[p]
+        corrente = self.rotte[a]
+        assert corrente is not None  # Auto con almeno due membri
+        rotta = corrente.copia()
+        if sum(1 for m in self.membri[a] if self.loc[m] == loc) == 1:
+            rotta.rimuovi(loc)
+        return rotta
+
+    def _con(self, rotta: Optional[CarRoute], p: int) -> CarRoute:
+        """Percorso con il membro p aggiunto"""
+        if rotta is None:
+            return CarRoute(self.kernel, self.loc[p])
+        rotta.inserisci(self.loc[p])
+        return rotta
+
+    def mossa(self, p: int, u: List[float], temperatura: float) -> None:
+        """
+        Propone uno spostamento o uno scambio tra p e uno studente q
+        di una località vicina; u sono quattro numeri uniformi in [0, 1).
+        """
+        vicine = self.vicine[self.loc[p]]
+        candidati = self.per_localita[vicine[int(u[0] * len(vicine))]]
+        q = candidati[int(u[1] * len(candidati))]
+        a, b = self.auto_di[p], self.auto_di[q]
+        if a == b or not (self.mobile[p] and self.mobile[q]):
+            return
+
+        n_a, n_b = len(self.membri[a]), len(self.membri[b])
+        scambio = u[2] >= 0.5 or n_b >= self.capacita_auto
+        if scambio and self.loc[p] == self.loc[q]:
+            return  # Scambio tra compaesani: nulla cambia
+        rotta_a: Optional[CarRoute]
+        if scambio:
+            rotta_a = self._con(self._senza(a, p), q)
+            rotta_b = self._con(self._senza(b, q), p)
+            nuovi_a, nuovi_b = n_a, n_b
+        else:
+            corrente_b = self.rotte[b]
+            assert corrente_b is not None  # q è a bordo
+            rotta_a = self._senza(a, p)
+            rotta_b = self._con(corrente_b.copia(), p)
+            nuovi_a, nuovi_b = n_a - 1, n_b + 1
+
+        if not (self._ammissibile(rotta_a) and self._ammissibile(rotta_b)):
+            return
+
+        delta = (
+            self._costo_auto(nuovi_a, rotta_a)
+            + self._costo_auto(nuovi_b, rotta_b)
+            - self._costo_auto(n_a, self.rotte[a])
+            - self._costo_auto(n_b, self.rotte[b])
+        )
+        if not math.isfinite(delta):
+            return  # Percorso con durate mancanti
+        if delta > 0 and u[3] >= math.exp(-delta / temperatura):
+            return
+
+        if delta > 0:
+            self.conferma_migliore()
+        self._applica(a, b, p, q, scambio, rotta_a, rotta_b)
+        self.costo += delta
+        if self.costo < self.costo_migliore - 1e-9:
+            self.costo_migliore = self.costo
+            self._da_salvare = True
+
+    def conferma_migliore(self) -> None:
+        """
+        Copia la soluzione corrente come migliore se lo è e non è ancora
+        salvata. Serve solo prima di una mossa peggiorativa e a fine
+        epoca: le serie di miglioramenti non copiano nulla.
+        """
+        if self._da_salvare:
+            self.migliore = self.soluzione()
+            self._da_salvare = False
+
+    def _applica(
+        self,
+        a: int,
+        b: int,
+        p: int,
+        q: int,
+        scambio: bool,
+        rotta_a: Optional[CarRoute],
+        rotta_b: Optional[CarRoute],
+    ) -> None:
+        """Aggiorna membri, percorsi e appartenenze delle due auto"""
+        self.membri[a].remove(p)
+        self.membri[b].append(p)
+        self.auto_di[p] = b
+        if scambio:
+            self.membri[b].remove(q)
+            self.membri[a].append(q)
+            self.auto_di[q] = a
+        self.rotte[a], self.rotte[b] = rotta_a, rotta_b
+
+    def soluzione(self) -> Soluzione:
+        """Auto non vuote, membri in ordine di percorso (autista in testa)"""
+        risultato = []
+        for membri, rotta in zip(self.membri, self.rotte):
+            if membri and rotta is not None:
+                ordine = {loc: k for k, loc in enumerate(rotta.tappe)}
+                risultato.append(sorted(membri, key=lambda p: ordine[self.loc[p]]))
+        return risultato
+
+
+@dataclass(frozen=True)
+class ParametriAnnealing:
+    """Parametri di ricerca dell'annealing a isole"""
+
+    isole: int = 4
+    epoche: int = 10
+    mosse_per_epoca: int = 20000
+    temperatura_iniziale: float = 600.0
+    temperatura_finale: float = 5.0
+    seed: int = 42
+    numero_worker: int = 1  # Processi per le isole
+
+
+class AnnealingOptimizer(OptimizationStrategy):
+    """
+    Simulated annealing a isole, pensato per la pianificazione notturna.
+    Parte dalla flotta dell'optimizer base; ogni isola esegue epoche di
+    annealing indipendenti (in processi separati con numero_worker > 1)
+    e dopo ogni epoca riceve la migliore soluzione dell'isola precedente
+    (migrazione ad anello) se è migliore della propria.
+    Capacità e deviazione massima valgono per ogni soluzione visitata.
+    Il risultato è la migliore soluzione di tutte le epoche, a partire
+    da quella dell'optimizer base: mai peggiore del punto di partenza.
+    """
+
+    def __init__(
+        self,
+        optimizer: OptimizationStrategy,
+        capacita_auto: int,
+        max_deviazione_sec: int,
+        parametri: Optional[ParametriAnnealing] = None,
+        comune_destinazione: str = "DALMINE",
+    ):
+        self.optimizer = optimizer
+        self.capacita_auto = capacita_auto
+        self.max_deviazione = max_deviazione_sec
+        self.parametri = parametri or ParametriAnnealing()
+        self.destinazione = comune_destinazione
+
+    def optimize_cluster(
+        self, cluster: List[Studente], matrice: DurationMatrix
+    ) -> List[Equipaggio]:
+        """Annealing sulle isole, poi la migliore soluzione trovata"""
+        iniziali = self.optimizer.optimize_cluster(cluster, matrice)
+        if len(iniziali) < 2:
+            return iniziali
+
+        kernel = ClusterKernel.build(cluster, matrice, self.destinazione)
+        posizioni = {id(s): p for p, s in enumerate(kernel.studenti)}
+        partenza = [[posizioni[id(m)] for m in e.membri] for e in iniziali]
+
+        parametri = self.parametri
+        soluzioni = [partenza] * parametri.isole
+        # Migliore globale: le isole ripartono dalla corrente, non dalla migliore
+        costo_partenza = _Isola(
+            kernel, self.capacita_auto, self.max_deviazione, partenza
+        ).costo
+        globale: Tuple[float, Soluzione] = (costo_partenza, partenza)
+        semi = [
+            s.spawn(parametri.epoche)
+            for s in np.random.SeedSequence(parametri.seed).spawn(parametri.isole)
+        ]
+
+        executor: Optional[ProcessPoolExecutor] = None
+        if parametri.numero_worker > 1 and parametri.isole > 1:
+            executor = ProcessPoolExecutor(
+                max_workers=min(parametri.numero_worker, parametri.isole),
+                initializer=_inizializza_worker,
+                initargs=(kernel, self.capacita_auto, self.max_deviazione),
+            )
+        try:
+            for epoca in range(parametri.epoche):
+                inizio = time.perf_counter()
+                risultati = self._esegui_isole(
+                    executor, kernel, soluzioni, [s[epoca] for s in semi], epoca
+                )
+                secondi = time.perf_counter() - inizio
+
+                migliori = [(costo, migliore) for _, migliore, costo, _ in risultati]
+                correnti = [corrente for corrente, _, _, _ in risultati]
+                soluzioni = self._migra(correnti, migliori)
+
+                mosse = sum(r[3] for r in risultati)
+                globale = min([globale] + migliori, key=lambda m: m[0])
+                print(
+                    f"  Annealing epoca {epoca + 1}/{parametri.epoche}: "
+                    f"{len(globale[1])} auto, {mosse / max(secondi, 1e-9):,.0f} mosse/s"
+                )
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
+        return self._crea_equipaggi(kernel, globale[1])
+
+    def _temperature(self, epoca: int) -> Tuple[float, float]:
+        """Temperature di inizio e fine epoca sul raffreddamento globale"""
+        iniziale, epoche = self.parametri.temperatura_iniziale, self.parametri.epoche
+        rapporto = self.parametri.temperatura_finale / iniziale
+        inizio = iniziale * rapporto ** (epoca / epoche)
+        fine = iniziale * rapporto ** ((epoca + 1) / epoche)
+        return inizio, fine
+
+    def _esegui_isole(
+        self,
+        executor: Optional[ProcessPoolExecutor],
+        kernel: ClusterKernel,
+        soluzioni: List[Soluzione],
+        semi: List[np.random.SeedSequence],
+        epoca: int,
+    ) -> List[RisultatoEpoca]:
+        """Un'epoca su ogni isola, nel pool o nel processo corrente"""
+        temperature = self._temperature(epoca)
+        argomenti = [
+            (soluzione, seme, temperature, self.parametri.mosse_per_epoca)
+            for soluzione, seme in zip(soluzioni, semi)
+        ]
+        if executor is not None:
+            return list(executor.map(_epoca_worker, argomenti))
+        return [
+            _esegui_epoca(kernel, self.capacita_auto, self.max_deviazione, *a)
+            for a in argomenti
+        ]
+
+    @staticmethod
+    def _migra(
+        correnti: List[Soluzione], migliori: List[Tuple[float, Soluzione]]
+    ) -> List[Soluzione]:
+        """
+        Migrazione ad anello: l'isola i riparte dalla migliore dell'isola
+        i-1 se è migliore della propria, altrimenti dalla propria corrente.
+        """
+        nuove = []
+        for i, corrente in enumerate(correnti):
+            costo_vicina, migliore_vicina = migliori[i - 1]
+            if costo_vicina < migliori[i][0]:
+                nuove.append(migliore_vicina)
+            else:
+                nuove.append(corrente)
+        return nuove
+
+    def _crea_equipaggi(
+        self, kernel: ClusterKernel, soluzione: Soluzione
+    ) -> List[Equipaggio]:
+        """Equipaggi dalla soluzione compatta, tappe in ordine di percorso"""
+        return [
+            Equipaggio(
+                id=equipaggio_id,
+                autista=kernel.studenti[membri[0]],
+                passeggeri=[kernel.studenti[p] for p in membri[1:]],
+                percorso_tappe=[kernel.studenti[p].localita for p in membri]
+                + [self.destinazione],
+            )
+            for equipaggio_id, membri in enumerate(soluzione, 1)
+        ]
@@ -1,8 +1,8 @@
 from abc import ABC, abstractmethod
-from typing import List, Dict
+from typing import List
 from src.data.models.studente import Studente
 from src.data.models.equipaggio import Equipaggio
-from src.data.models.percorso import Percorso
+from src.data.models.duration_matrix import DurationMatrix
 
 
 class OptimizationStrategy(ABC):
@@ -13,16 +13,39 @@ class OptimizationStrategy(ABC):
 
     @abstractmethod
     def optimize_cluster(
-        self, cluster: List[Studente], percorsi: Dict[str, Percorso]
+        self, cluster: List[Studente], matrice: DurationMatrix
     ) -> List[Equipaggio]:
         """
         Forma equipaggi ottimali da un cluster di studenti.
 
         Args:
             cluster: Studenti dello stesso cluster geografico
-            percorsi: Mappa chiave->Percorso per lookup veloce
+            matrice: Matrice durate indicizzata per id località
 
         Returns:
             Lista equipaggi formati
         """
-        pass
\ No newline at end of file
+        pass
+
+
+class ImprovementStrategy(ABC):
+    """
+    Interfaccia per fasi di miglioramento applicate dopo optimize_cluster.
+
+    """
+
+    @abstractmethod
+    def migliora(
+        self, equipaggi: List[Equipaggio], matrice: DurationMatrix
+    ) -> List[Equipaggio]:
+        """
+        Migliora gli equipaggi di un cluster già formati.
+
+        Args:
+            equipaggi: Equipaggi prodotti da una OptimizationStrategy
+            matrice: Matrice durate indicizzata per id località
+
+        Returns:
+            Lista equipaggi con gli stessi studenti
+        """
+        pass
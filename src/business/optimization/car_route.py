@@ -0,0 +1,147 @@
+from typing import List, Optional, Tuple, Union
+import numpy as np
+from .cluster_kernel import ClusterKernel
+
+
+DESTINAZIONE = -1  # Id fittizio della destinazione nelle tappe
+
+
+class CarRoute:
+    """
+    Percorso di un'auto sulle località di un ClusterKernel:
+    località dell'autista -> tappe intermedie -> destinazione.
+    Il costo è mantenuto come stato: inserire o rimuovere una tappa
+    costa O(lunghezza del percorso), senza ricalcolare tutto.
+    """
+
+    def __init__(self, kernel: ClusterKernel, loc_autista: int):
+        self.kernel = kernel
+        self.tappe: List[int] = [loc_autista]  # Id locali distinti, autista in testa
+        self.costo = float(kernel.durata_dest[loc_autista])
+
+    @classmethod
+    def da_tappe(cls, kernel: ClusterKernel, tappe: List[int]) -> "CarRoute":
+        """Percorso con le tappe nell'ordine dato (id locali distinti)"""
+        rotta = cls(kernel, tappe[0])
+        rotta.tappe = list(tappe)
+        rotta.costo = sum(
+            rotta._arco(tappa, rotta._successiva(k)) for k, tappa in enumerate(tappe)
+        )
+        return rotta
+
+    @property
+    def diretto(self) -> float:
+        """Durata del tragitto diretto autista -> destinazione"""
+        return float(self.kernel.durata_dest[self.tappe[0]])
+
+    @property
+    def deviazione(self) -> float:
+        """Tempo aggiunto rispetto al tragitto diretto dell'autista"""
+        return self.costo - self.diretto
+
+    def _arco(self, a: int, b: int) -> float:
+        """Durata a -> b, dove b può essere la destinazione"""
+        if b == DESTINAZIONE:
+            return float(self.kernel.durata_dest[a])
+        return float(self.kernel.durate[a, b])
+
+    def _successiva(self, k: int) -> int:
+        """Tappa successiva alla k-esima (la destinazione dopo l'ultima)"""
+        return self.tappe[k + 1] if k + 1 < len(self.tappe) else DESTINAZIONE
+
+    def costo_inserimento(self, loc: int) -> Tuple[float, Optional[int]]:
+        """
+        Inserimento più economico di una località dopo l'autista.
+        Restituisce (delta costo, posizione); località già presente -> (0, None).
+        """
+        if loc in self.tappe:
+            return 0.0, None
+
+        # Senza archi validi si accoda prima della destinazione a costo infinito
+        migliore, posizione = float("inf"), len(self.tappe)
+        for k, tappa in enumerate(self.tappe):
+            successiva = self._successiva(k)
+            esistente = self._arco(tappa, successiva)
+            if esistente == float("inf"):
+                continue  # Tratto non valutabile
+            delta = self._arco(tappa, loc) + self._arco(loc, successiva) - esistente
+            if delta < migliore:
+                migliore, posizione = delta, k + 1
+        return migliore, posizione
+
+    def costi_inserimento(self, localita: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Delta dell'inserimento più economico per ogni località del kernel
+        (o solo per gli id in `localita`), con un'operazione vettoriale per
+        tratto: O(lunghezza del percorso).
+        Stessi valori di costo_inserimento (0 per le località già presenti).
+        """
+        kernel = self.kernel
+        indice: Union[slice, np.ndarray]
+        if localita is None:
+            indice = slice(None)
+            migliore = np.full(len(kernel.localita), np.inf)
+        else:
+            indice = localita
+            migliore = np.full(len(localita), np.inf)
+        for k, tappa in enumerate(self.tappe):
+            successiva = self._successiva(k)
+            esistente = self._arco(tappa, successiva)
+            if esistente == float("inf"):
+                continue
+            if successiva == DESTINAZIONE:
+                verso_successiva = kernel.durata_dest[indice]
+            else:
+                verso_successiva = kernel.durate[indice, successiva]
+            np.minimum(
+                migliore,
+                kernel.durate[tappa, indice] + verso_successiva - esistente,
+                out=migliore,
+            )
+        if localita is None:
+            migliore[self.tappe] = 0.0
+        else:
+            migliore[(localita[:, None] == self.tappe).any(axis=1)] = 0.0
+        return migliore
+
+    def inserisci(self, loc: int) -> float:
+        """Inserisce la località nella posizione più economica; restituisce il delta"""
+        delta, posizione = self.costo_inserimento(loc)
+        if posizione is not None:
+            self.tappe.insert(posizione, loc)
+            self.costo += delta
+        return delta
+
+    def costo_rimozione(self, loc: int) -> float:
+        """
+        Delta di costo togliendo la tappa. Se è quella dell'autista
+        il percorso riparte dalla tappa successiva (nuovo autista).
+        """
+        k = self.tappe.index(loc)
+        successiva = self._successiva(k)
+        if k == 0:
+            if successiva == DESTINAZIONE:
+                return -self.costo
+            return -self._arco(loc, successiva)
+
+        precedente = self.tappe[k - 1]
+        return (
+            self._arco(precedente, successiva)
+            - self._arco(precedente, loc)
+            - self._arco(loc, successiva)
+        )
+
+    def rimuovi(self, loc: int) -> float:
+        """Rimuove la tappa; restituisce il delta di costo"""
+        delta = self.costo_rimozione(loc)
+        self.tappe.remove(loc)
+        self.costo = self.costo + delta if self.tappe else 0.0
+        return delta
+
+    def copia(self) -> "CarRoute":
+        """Copia indipendente del percorso (stesso kernel)"""
+        nuova = CarRoute.__new__(CarRoute)
+        nuova.kernel = self.kernel
+        nuova.tappe = list(self.tappe)
+        nuova.costo = self.costo
+        return nuova
@@ -0,0 +1,90 @@
+from dataclasses import dataclass
+from typing import List, Optional
+import numpy as np
+from .student_buckets import StudentBuckets
+from src.data.models.studente import Studente
+from src.data.models.duration_matrix import DurationMatrix
+
+
+@dataclass
+class ClusterKernel:
+    """
+    Precalcoli NumPy di un singolo cluster per lo scoring vettoriale.
+    Gli studenti sono ordinati dal più lontano al più vicino alla destinazione:
+    la posizione nell'ordinamento è l'id usato da tutti i vettori.
+    """
+
+    studenti: List[Studente]  # Studenti in ordine di durata decrescente
+    localita: List[str]  # Id locale -> chiave località
+    loc: np.ndarray  # loc[p] = id locale della località dello studente p
+    corso: np.ndarray  # corso[p] = id intero del corso dello studente p
+    n_corsi: int  # Numero di corsi distinti nel cluster
+    durata_dest: np.ndarray  # durata_dest[l] verso destinazione (inf se mancante)
+    durate: np.ndarray  # durate[a, b] tra località del cluster (inf se mancante)
+    deviazione: np.ndarray  # deviazione[a, b] = d(a,b) + d(b,dest) - d(a,dest)
+    gruppi: StudentBuckets  # Studenti aggregati per (località, corso)
+    coordinate: Optional[np.ndarray] = None  # (lat, lon) per località, se note a tutti
+
+    @property
+    def n_studenti(self) -> int:
+        """Numero di studenti nel cluster"""
+        return len(self.studenti)
+
+    @classmethod
+    def build(
+        cls, cluster: List[Studente], matrice: DurationMatrix, destinazione: str
+    ) -> "ClusterKernel":
+        """
+        Costruisce i vettori del cluster a partire dalla matrice durate.
+        Coppie mancanti -> deviazione infinita; stessa località -> deviazione 0.
+        """
+        id_localita: dict = {}
+        id_corsi: dict = {}
+        loc = np.array(
+            [id_localita.setdefault(s.localita, len(id_localita)) for s in cluster],
+            dtype=np.intp,
+        )
+        corso = np.array(
+            [id_corsi.setdefault(s.corso, len(id_corsi)) for s in cluster],
+            dtype=np.intp,
+        )
+        localita = list(id_localita)
+        n_loc = len(localita)
+
+        # Sotto-matrice sulle località del cluster + destinazione in coda
+        sotto = matrice.sottomatrice_durate(localita + [destinazione])
+        verso_dest = sotto[:n_loc, n_loc]
+
+        # NaN si propaga su ogni termine mancante, poi diventa +inf
+        deviazione = sotto[:n_loc, :n_loc] + verso_dest[None, :] - verso_dest[:, None]
+        deviazione[np.isnan(deviazione)] = np.inf
+        np.fill_diagonal(deviazione, 0.0)
+
+        durata_dest = np.where(np.isnan(verso_dest), np.inf, verso_dest)
+        durate = sotto[:n_loc, :n_loc]
+        durate[np.isnan(durate)] = np.inf
+
+        # Coordinate per località (tutti gli studenti di una località le condividono)
+        coordinate = None
+        if cluster and all(isinstance(s.coordinate, tuple) for s in cluster):
+            coordinate = np.zeros((n_loc, 2))
+            coordinate[loc] = [s.coordinate for s in cluster]
+
+        # Ordinamento stabile: dal più lontano al più vicino
+        ordine = np.argsort(-durata_dest[loc], kind="stable")
+
+        loc = loc[ordine]
+        corso = corso[ordine]
+
+        return cls(
+            studenti=[cluster[i] for i in ordine],
+            localita=localita,
+            loc=loc,
+            corso=corso,
+            n_corsi=len(id_corsi),
+            durata_dest=durata_dest,
+            durate=durate,
+            deviazione=deviazione,
+            gruppi=StudentBuckets.build(loc, corso),
+            coordinate=coordinate,
+        )
@@ -0,0 +1,191 @@
+from typing import Dict, FrozenSet, List, Optional, Set, Tuple
+import numpy as np
+from sklearn.neighbors import KDTree
+from .spatial_index import proietta_km
+from .stop_order import StopOrderSolver
+from src.data.models.studente import Studente
+from src.data.models.equipaggio import Equipaggio
+from src.data.models.duration_matrix import DurationMatrix
+
+
+class CrossClusterRebalancer:
+    """
+    Post-pass sulla flotta intera: fonde auto non piene di cluster diversi.
+    I confini del clustering lasciano spesso autisti soli ai due lati di
+    un bordo. I membri delle auto non piene sono indicizzati in un KD-tree
+    (coordinate proiettate in km) e si valutano solo le coppie di auto con
+    membri entro un raggio: max_deviazione_sec alla velocità in linea
+    d'aria data. Ogni fusione è validata con la matrice durate
+    (percorso ottimo e deviazione dell'autista).
+    Le durate tra località di cluster diversi esistono solo se popola ha
+    scaricato le coppie di confine entro raggio_km (PopulateOrchestrator
+    con raggio_confine_km): senza, ogni fusione resta non valutabile.
+    """
+
+    def __init__(
+        self,
+        capacita_auto: int,
+        max_deviazione_sec: int,
+        velocita_kmh: float = 50.0,
+        comune_destinazione: str = "DALMINE",
+        ordinatore: Optional[StopOrderSolver] = None,
+    ):
+        self.capacita_auto = capacita_auto
+        self.max_deviazione = max_deviazione_sec
+        self.raggio_km = max_deviazione_sec / 3600 * velocita_kmh
+        self.destinazione = comune_destinazione
+        self.ordinatore = ordinatore or StopOrderSolver(comune_destinazione)
+
+    def ribilancia(
+        self, risultati: List[List[Equipaggio]], matrice: DurationMatrix
+    ) -> List[Equipaggio]:
+        """
+        Flotta unica dai risultati per cluster, con le fusioni applicate.
+        Si ripete finché un giro non trova fusioni: un'auto fusa ancora
+        non piena può fondersi di nuovo.
+        """
+        flotta: List[Optional[Equipaggio]] = []
+        cluster_di: List[FrozenSet[int]] = []
+        for i, equipaggi in enumerate(risultati):
+            flotta.extend(equipaggi)
+            cluster_di.extend(frozenset([i]) for _ in equipaggi)
+
+        auto_iniziali = len(flotta)
+        fusioni = 0
+        while True:
+            fatte = self._giro(flotta, cluster_di, matrice)
+            if not fatte:
+                break
+            fusioni += fatte
+
+        risultato = [e for e in flotta if e is not None]
+        print(
+            f"Ribilanciamento tra cluster: {fusioni} fusioni "
+            f"({auto_iniziali} -> {len(risultato)} auto)"
+        )
+        return risultato
+
+    def _giro(
+        self,
+        flotta: List[Optional[Equipaggio]],
+        cluster_di: List[FrozenSet[int]],
+        matrice: DurationMatrix,
+    ) -> int:
+        """
+        Un giro di fusioni: coppie candidate dal KD-tree, valutate e
+        applicate per risparmio decrescente. Ogni auto si fonde al più
+        una volta per giro. Restituisce il numero di fusioni.
+        """
+        candidate = self._coppie_vicine(flotta, cluster_di)
+
+        valutate = []
+        for a, b in candidate:
+            auto_a, auto_b = flotta[a], flotta[b]
+            if auto_a is None or auto_b is None:
+                continue
+            fusione = self._valuta(auto_a, auto_b, matrice)
+            if fusione is not None:
+                valutate.append((fusione[1], a, b, fusione[0]))
+        valutate.sort(key=lambda v: (v[0], v[1], v[2]))
+
+        usate: Set[int] = set()
+        for _, a, b, fusa in valutate:
+            if a in usate or b in usate:
+                continue
+            usate.update((a, b))
+            flotta[a], flotta[b] = fusa, None
+            cluster_di[a] = cluster_di[a] | cluster_di[b]
+        return len(usate) // 2
+
+    def _coppie_vicine(
+        self, flotta: List[Optional[Equipaggio]], cluster_di: List[FrozenSet[int]]
+    ) -> List[Tuple[int, int]]:
+        """
+        Coppie (a, b) di auto non piene, di cluster diversi e con posti
+        sufficienti, che hanno almeno due membri entro il raggio.
+        """
+        punti, auto_del_punto = [], []
+        occupati: Dict[int, int] = {}  # Posti occupati delle auto non piene
+        for a, equipaggio in enumerate(flotta):
+            if equipaggio is None or equipaggio.capacita_utilizzata >= self.capacita_auto:
+                continue
+            occupati[a] = equipaggio.capacita_utilizzata
+            for membro in equipaggio.membri:
+                if membro.coordinate is not None:
+                    punti.append(membro.coordinate)
+                    auto_del_punto.append(a)
+        if not punti:
+            return []
+
+        xy = proietta_km(np.asarray(punti, dtype=float))
+        vicini = KDTree(xy).query_radius(xy, r=self.raggio_km)
+
+        coppie = set()
+        for i, indici in enumerate(vicini):
+            a = auto_del_punto[i]
+            for j in indici:
+                b = auto_del_punto[j]
+                if (
+                    a < b
+                    and not cluster_di[a] & cluster_di[b]
+                    and occupati[a] + occupati[b] <= self.capacita_auto
+                ):
+                    coppie.add((a, b))
+        return sorted(coppie)
+
+    def _valuta(
+        self, a: Equipaggio, b: Equipaggio, matrice: DurationMatrix
+    ) -> Optional[Tuple[Equipaggio, float]]:
+        """
+        Miglior equipaggio fuso (autista scelto tra le località presenti)
+        e variazione di durata rispetto alle due auto separate; None se
+        nessun autista resta entro la deviazione.
+        """
+        durata_a, durata_b = self._durata(a, matrice), self._durata(b, matrice)
+        if durata_a is None or durata_b is None:
+            return None
+
+        membri = a.membri + b.membri
+        localita = frozenset(s.localita for s in membri)
+        ordine_migliore: Optional[List[str]] = None
+        durata_migliore = float("inf")
+        for partenza in sorted(localita):
+            ordine, durata = self.ordinatore.percorso(partenza, localita, matrice)
+            diretto = self.ordinatore.percorso(partenza, frozenset(), matrice)[1]
+            if durata is None or diretto is None:
+                continue
+            if durata - diretto > self.max_deviazione:
+                continue
+            if durata < durata_migliore:
+                ordine_migliore, durata_migliore = ordine, durata
+        if ordine_migliore is None:
+            return None
+
+        fusa = self._crea_equipaggio(a, b, ordine_migliore, durata_migliore)
+        return fusa, durata_migliore - durata_a - durata_b
+
+    def _durata(self, equipaggio: Equipaggio, matrice: DurationMatrix) -> Optional[float]:
+        """Durata del percorso ottimo dell'auto così com'è"""
+        da_visitare = frozenset(p.localita for p in equipaggio.passeggeri)
+        return self.ordinatore.percorso(equipaggio.autista.localita, da_visitare, matrice)[1]
+
+    def _crea_equipaggio(
+        self, a: Equipaggio, b: Equipaggio, ordine: List[str], durata: float
+    ) -> Equipaggio:
+        """
+        Equipaggio fuso: autista alla prima tappa (uno degli autisti
+        originali se possibile), membri in ordine di raccolta.
+        """
+        posizione: Dict[str, int] = {loc: k for k, loc in enumerate(ordine)}
+        originali = [a.autista, b.autista]
+        membri: List[Studente] = sorted(
+            a.membri + b.membri,
+            key=lambda s: (posizione[s.localita], s not in originali),
+        )
+        return Equipaggio(
+            id=a.id,
+            autista=membri[0],
+            passeggeri=membri[1:],
+            percorso_tappe=[s.localita for s in membri] + [self.destinazione],
+            durata_percorso_sec=durata,
+        )
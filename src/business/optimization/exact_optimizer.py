@@ -0,0 +1,280 @@
+import math
+import time
+from dataclasses import dataclass
+from itertools import combinations
+from typing import Dict, Iterator, List, Optional, Tuple
+from .base import OptimizationStrategy
+from .cluster_kernel import ClusterKernel
+from .stop_order import StopOrderSolver
+from src.data.models.studente import Studente
+from src.data.models.equipaggio import Equipaggio
+from src.data.models.duration_matrix import DurationMatrix
+
+
+@dataclass(frozen=True)
+class _TipoEquipaggio:
+    """Insieme di località servibile da una sola auto entro la deviazione"""
+
+    tappe: Tuple[int, ...]  # Id locali in ordine di percorso, autista in testa
+    durata: float  # Durata totale del percorso fino a destinazione
+
+
+class ExactOptimizer(OptimizationStrategy):
+    """
+    Set partitioning esatto per cluster piccoli: minimo numero di auto.
+    Enumera le combinazioni di località servibili da un'auto
+    (autista + fino a capacita_auto-1 passeggeri entro la deviazione),
+    poi risolve la copertura con branch-and-bound e bound ceil(n/capacità).
+    Oltre la soglia di studenti, o se il tempo scade (anche durante
+    l'enumerazione) senza soluzioni migliori, restituisce la soluzione
+    dell'optimizer di fallback.
+    Il minimo è relativo ai tipi enumerati e alla dominanza del
+    riempimento: coincide con l'ottimo solo se le durate rispettano la
+    disuguaglianza triangolare, che le durate stradali in cache non
+    garantiscono. Solo il limite inferiore ceil(n/capacità) è sempre valido.
+    """
+
+    def __init__(
+        self,
+        capacita_auto: int,
+        max_deviazione_sec: int,
+        fallback: OptimizationStrategy,
+        soglia_studenti: int = 40,
+        tempo_limite_sec: float = 5.0,
+        comune_destinazione: str = "DALMINE",
+    ):
+        self.capacita_auto = capacita_auto
+        self.max_deviazione = max_deviazione_sec
+        self.fallback = fallback
+        self.soglia_studenti = soglia_studenti
+        self.tempo_limite = tempo_limite_sec
+        self.destinazione = comune_destinazione
+
+    def optimize_cluster(
+        self, cluster: List[Studente], matrice: DurationMatrix
+    ) -> List[Equipaggio]:
+        """
+        Soluzione del fallback come incumbent, poi ricerca esatta.
+        Stampa il numero di auto e il gap dal limite inferiore.
+        """
+        soluzione_fallback = self.fallback.optimize_cluster(cluster, matrice)
+        if not cluster or len(cluster) > self.soglia_studenti:
+            return soluzione_fallback
+
+        kernel = ClusterKernel.build(cluster, matrice, self.destinazione)
+        conteggi = tuple(
+            int((kernel.loc == loc).sum()) for loc in range(len(kernel.localita))
+        )
+        limite_inferiore = math.ceil(len(cluster) / self.capacita_auto)
+        scadenza = time.perf_counter() + self.tempo_limite
+
+        tipi = self._enumera_tipi(kernel, matrice, scadenza)
+        if tipi is None:
+            equipaggi, completa = soluzione_fallback, False
+        else:
+            ricerca = _BranchAndBound(
+                tipi,
+                self.capacita_auto,
+                incumbent=len(soluzione_fallback),
+                scadenza=scadenza,
+            )
+            scelte = ricerca.risolvi(conteggi)
+            if scelte is None:
+                equipaggi = soluzione_fallback
+            else:
+                equipaggi = self._crea_equipaggi(kernel, scelte)
+            completa = ricerca.completa
+
+        gap = len(equipaggi) - limite_inferiore
+        if gap == 0:
+            stato = "ottimo dimostrato"
+        elif completa:
+            stato = "minimo sui tipi di equipaggio enumerati"
+        else:
+            stato = f"gap dimostrato ≤ {gap} auto"
+        if tipi is None:
+            stato += ", tempo scaduto nell'enumerazione"
+        print(f"  Ottimizzazione esatta: {len(equipaggi)} auto ({stato})")
+        return equipaggi
+
+    def _enumera_tipi(
+        self, kernel: ClusterKernel, matrice: DurationMatrix, scadenza: float
+    ) -> Optional[List[_TipoEquipaggio]]:
+        """
+        Tutti gli insiemi di località (al più capacita_auto) con almeno un
+        autista il cui percorso ottimo resta entro la deviazione.
+        La matrice deviazione pota i candidati per ogni autista.
+        None se la scadenza arriva prima della fine.
+        """
+        ordinatore = StopOrderSolver(self.destinazione)
+        tipi: Dict[frozenset, _TipoEquipaggio] = {}
+        indice = {loc: i for i, loc in enumerate(kernel.localita)}
+
+        for autista in range(len(kernel.localita)):
+            compatibili = [
+                loc
+                for loc in range(len(kernel.localita))
+                if loc != autista
+                and kernel.deviazione[autista, loc] <= self.max_deviazione
+            ]
+            diretto = float(kernel.durata_dest[autista])
+
+            for k in range(self.capacita_auto):
+                for altre in combinations(compatibili, k):
+                    if time.perf_counter() > scadenza:
+                        return None
+                    insieme = frozenset((autista,) + altre)
+                    ordine, durata = ordinatore.percorso(
+                        kernel.localita[autista],
+                        frozenset(kernel.localita[loc] for loc in altre),
+                        matrice,
+                    )
+                    if durata is None or durata - diretto > self.max_deviazione:
+                        continue
+                    # A parità di insieme tiene l'autista col percorso più breve
+                    if insieme not in tipi or durata < tipi[insieme].durata:
+                        tipi[insieme] = _TipoEquipaggio(
+                            tappe=tuple(indice[loc] for loc in ordine),
+                            durata=durata,
+                        )
+        return list(tipi.values())
+
+    def _crea_equipaggi(
+        self, kernel: ClusterKernel, scelte: List[Tuple[_TipoEquipaggio, Dict[int, int]]]
+    ) -> List[Equipaggio]:
+        """Assegna gli studenti alle auto scelte, località per località"""
+        code: Dict[int, List[Studente]] = {}
+        for p, studente in enumerate(kernel.studenti):
+            code.setdefault(int(kernel.loc[p]), []).append(studente)
+
+        equipaggi = []
+        for equipaggio_id, (tipo, quanti) in enumerate(scelte, 1):
+            membri: List[Studente] = []
+            for loc in tipo.tappe:
+                membri.extend(code[loc].pop(0) for _ in range(quanti[loc]))
+
+            equipaggi.append(
+                Equipaggio(
+                    id=equipaggio_id,
+                    autista=membri[0],
+                    passeggeri=membri[1:],
+                    percorso_tappe=[s.localita for s in membri] + [self.destinazione],
+                    durata_percorso_sec=tipo.durata,
+                )
+            )
+        return equipaggi
+
+
+class _BranchAndBound:
+    """
+    Copertura esatta del vettore di studenti per località con il minimo
+    numero di auto. Si ramifica sulla località più vincolata; ogni auto
+    è riempita al massimo sulle proprie località (dominanza valida
+    perché spostare uno studente in un'auto con posti liberi e la sua
+    località tra le tappe non peggiora nessun percorso).
+    """
+
+    def __init__(
+        self,
+        tipi: List[_TipoEquipaggio],
+        capacita_auto: int,
+        incumbent: int,
+        scadenza: float,
+    ):
+        self.capacita_auto = capacita_auto
+        self.scadenza = scadenza
+        self.migliore = incumbent  # Auto della miglior soluzione nota
+        self.soluzione: Optional[List[Tuple[_TipoEquipaggio, Dict[int, int]]]] = None
+        self.completa = True  # False se interrotta dal tempo limite
+        self._ordine: List[int] = []  # Località in ordine di ramificazione
+
+        self._per_localita: Dict[int, List[_TipoEquipaggio]] = {}
+        for tipo in tipi:
+            for loc in tipo.tappe:
+                self._per_localita.setdefault(loc, []).append(tipo)
+        self._visti: Dict[Tuple[int, ...], int] = {}
+
+    def risolvi(
+        self, conteggi: Tuple[int, ...]
+    ) -> Optional[List[Tuple[_TipoEquipaggio, Dict[int, int]]]]:
+        """Soluzione strettamente migliore dell'incumbent, o None"""
+        # Località senza alcun tipo (durate mancanti): nulla da dimostrare
+        if any(n and loc not in self._per_localita for loc, n in enumerate(conteggi)):
+            self.completa = False
+            return None
+
+        # Ordine di ramificazione: prima le località con meno alternative
+        self._ordine = sorted(
+            range(len(conteggi)), key=lambda loc: len(self._per_localita[loc])
+        )
+        if math.ceil(sum(conteggi) / self.capacita_auto) < self.migliore:
+            self._ricerca(conteggi, 0, [])
+        return self.soluzione
+
+    def _ricerca(
+        self,
+        rimanenti: Tuple[int, ...],
+        auto: int,
+        scelte: List[Tuple[_TipoEquipaggio, Dict[int, int]]],
+    ) -> None:
+        if time.perf_counter() > self.scadenza:
+            self.completa = False
+            return
+
+        n_rimanenti = sum(rimanenti)
+        if n_rimanenti == 0:
+            self.migliore = auto
+            self.soluzione = list(scelte)
+            return
+
+        # Bound: servono almeno ceil(rimanenti / capacità) altre auto
+        if auto + math.ceil(n_rimanenti / self.capacita_auto) >= self.migliore:
+            return
+        if self._visti.get(rimanenti, math.inf) <= auto:
+            return
+        self._visti[rimanenti] = auto
+
+        loc = next(loc for loc in self._ordine if rimanenti[loc])
+        for tipo, quanti in self._riempimenti(rimanenti, loc):
+            nuovi = list(rimanenti)
+            for l, n in quanti.items():
+                nuovi[l] -= n
+            scelte.append((tipo, quanti))
+            self._ricerca(tuple(nuovi), auto + 1, scelte)
+            scelte.pop()
+            if not self.completa:
+                return
+
+    def _riempimenti(
+        self, rimanenti: Tuple[int, ...], loc: int
+    ) -> Iterator[Tuple[_TipoEquipaggio, Dict[int, int]]]:
+        """
+        Auto che servono loc: per ogni tipo disponibile, tutte le
+        ripartizioni che la riempiono al massimo. Prima le auto più piene.
+        """
+        candidati = []
+        for tipo in self._per_localita[loc]:
+            if any(rimanenti[l] == 0 for l in tipo.tappe):
+                continue
+            totale = min(self.capacita_auto, sum(rimanenti[l] for l in tipo.tappe))
+            candidati.append((totale, tipo))
+        candidati.sort(key=lambda c: -c[0])
+
+        for totale, tipo in candidati:
+            extra = totale - len(tipo.tappe)
+            limiti = [rimanenti[l] - 1 for l in tipo.tappe]
+            for aggiunte in _ripartizioni(extra, limiti):
+                yield tipo, {l: 1 + a for l, a in zip(tipo.tappe, aggiunte)}
+
+
+def _ripartizioni(totale: int, limiti: List[int]) -> Iterator[Tuple[int, ...]]:
+    """Tutti i vettori a con 0 <= a[i] <= limiti[i] e somma totale"""
+    if not limiti:
+        if totale == 0:
+            yield ()
+        return
+    for primo in range(min(totale, limiti[0]), -1, -1):
+        if totale - primo > sum(limiti[1:]):
+            break
+        for resto in _ripartizioni(totale - primo, limiti[1:]):
+            yield (primo,) + resto
@@ -0,0 +1,187 @@
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures import TimeoutError as FuturesTimeoutError
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from .base import OptimizationStrategy
+from .cluster_kernel import ClusterKernel
+from .greedy_optimizer import GreedyOptimizer
+from src.data.models.studente import Studente
+from src.data.models.equipaggio import Equipaggio
+from src.data.models.duration_matrix import DurationMatrix
+
+
+# Soluzione compatta: (posizioni dei membri nel kernel, tappe) per ogni auto
+Soluzione = List[Tuple[List[int], List[str]]]
+
+# Stato dei processi worker: kernel del cluster inviato una sola volta
+_greedy_worker: Optional[GreedyOptimizer] = None
+_kernel_worker: Optional[ClusterKernel] = None
+_k_worker: int = 1
+# Scadenza in time.time(): perf_counter non è confrontabile tra processi
+_scadenza_worker: Optional[float] = None
+
+
+def _inizializza_worker(
+    greedy: GreedyOptimizer, kernel: ClusterKernel, k: int, scadenza: Optional[float]
+) -> None:
+    """Initializer del process pool: greedy e kernel restano nel worker"""
+    global _greedy_worker, _kernel_worker, _k_worker, _scadenza_worker
+    _greedy_worker, _kernel_worker, _k_worker = greedy, kernel, k
+    _scadenza_worker = scadenza
+
+
+def _iterazione_worker(seme: np.random.SeedSequence) -> Optional[Soluzione]:
+    """
+    Task eseguito nel worker: una costruzione randomizzata, o None se il
+    tempo è già scaduto (task già in coda, che cancel_futures non ferma).
+    """
+    assert _greedy_worker is not None and _kernel_worker is not None
+    if _scadenza_worker is not None and time.time() >= _scadenza_worker:
+        return None
+    return _iterazione(_greedy_worker, _kernel_worker, _k_worker, seme)
+
+
+def _iterazione(
+    greedy: GreedyOptimizer,
+    kernel: ClusterKernel,
+    k: int,
+    seme: Optional[np.random.SeedSequence],
+) -> Soluzione:
+    """
+    Una costruzione greedy (deterministica se seme è None).
+    Restituisce posizioni e tappe: gli studenti non viaggiano tra processi.
+    """
+    rng = None if seme is None else np.random.default_rng(seme)
+    posizioni = {id(s): p for p, s in enumerate(kernel.studenti)}
+    equipaggi = greedy.costruisci(kernel, rng, k)
+    return [([posizioni[id(m)] for m in e.membri], e.percorso_tappe) for e in equipaggi]
+
+
+class GraspOptimizer(OptimizationStrategy):
+    """
+    GRASP multi-start sul GreedyOptimizer: molte costruzioni randomizzate
+    (autista e passeggeri estratti tra i k migliori), si tiene la soluzione
+    con meno auto e poi auto più piene (somma dei quadrati delle occupazioni).
+    Ogni iterazione ha un seme derivato dal seme principale con
+    SeedSequence.spawn: a parità di iterazioni il risultato non dipende
+    dal numero di worker. Con il tempo limite le iterazioni completate
+    possono variare tra un'esecuzione e l'altra.
+    """
+
+    def __init__(
+        self,
+        greedy: GreedyOptimizer,
+        iterazioni: int = 50,
+        tempo_limite_sec: float = 0.0,
+        k_candidati: int = 3,
+        seed: int = 42,
+        numero_worker: int = 1,
+    ):
+        self.greedy = greedy
+        self.iterazioni = iterazioni
+        self.tempo_limite = tempo_limite_sec
+        self.k_candidati = k_candidati
+        self.seed = seed
+        self.numero_worker = numero_worker
+
+    def optimize_cluster(
+        self, cluster: List[Studente], matrice: DurationMatrix
+    ) -> List[Equipaggio]:
+        """
+        Iterazione 0 = greedy deterministico, poi le varianti casuali:
+        il risultato non è mai peggiore del greedy.
+        """
+        kernel = ClusterKernel.build(cluster, matrice, self.greedy.destinazione)
+        semi = np.random.SeedSequence(self.seed).spawn(self.iterazioni)
+        scadenza = (
+            time.perf_counter() + self.tempo_limite if self.tempo_limite > 0 else None
+        )
+
+        soluzioni = {0: _iterazione(self.greedy, kernel, 1, None)}
+        if self.numero_worker > 1 and len(semi) > 1:
+            soluzioni.update(self._esegui_parallelo(kernel, semi, scadenza))
+        else:
+            soluzioni.update(self._esegui_sequenziale(kernel, semi, scadenza))
+
+        indice = min(soluzioni, key=lambda i: self._valuta(soluzioni[i], i))
+        migliore = soluzioni[indice]
+        print(
+            f"  GRASP: {len(soluzioni)} iterazioni, {len(migliore)} auto "
+            f"(greedy: {len(soluzioni[0])})"
+        )
+        return self._crea_equipaggi(kernel, migliore)
+
+    @staticmethod
+    def _valuta(soluzione: Soluzione, indice: int) -> Tuple[int, int, int]:
+        """Meno auto, poi auto più piene, poi indice più basso (riproducibile)"""
+        occupazione = sum(len(membri) ** 2 for membri, _ in soluzione)
+        return len(soluzione), -occupazione, indice
+
+    def _esegui_sequenziale(
+        self,
+        kernel: ClusterKernel,
+        semi: List[np.random.SeedSequence],
+        scadenza: Optional[float],
+    ) -> Dict[int, Soluzione]:
+        """Iterazioni nel processo corrente, fino a esaurimento o scadenza"""
+        soluzioni = {}
+        for i, seme in enumerate(semi, 1):
+            if scadenza is not None and time.perf_counter() >= scadenza:
+                break
+            soluzioni[i] = _iterazione(self.greedy, kernel, self.k_candidati, seme)
+        return soluzioni
+
+    def _esegui_parallelo(
+        self,
+        kernel: ClusterKernel,
+        semi: List[np.random.SeedSequence],
+        scadenza: Optional[float],
+    ) -> Dict[int, Soluzione]:
+        """
+        Iterazioni su un process pool: il kernel viaggia una volta per worker,
+        ogni task riceve solo il proprio seme. Allo scadere si attendono le
+        costruzioni in corso: il tempo limite può essere superato al più di
+        un'iterazione per worker.
+        """
+        soluzioni: Dict[int, Soluzione] = {}
+        scadenza_worker = (
+            None if scadenza is None else time.time() + scadenza - time.perf_counter()
+        )
+        executor = ProcessPoolExecutor(
+            max_workers=min(self.numero_worker, len(semi)),
+            initializer=_inizializza_worker,
+            initargs=(self.greedy, kernel, self.k_candidati, scadenza_worker),
+        )
+        try:
+            futures = {
+                executor.submit(_iterazione_worker, seme): i
+                for i, seme in enumerate(semi, 1)
+            }
+            attesa = None if scadenza is None else max(scadenza - time.perf_counter(), 0)
+            try:
+                for future in as_completed(futures, timeout=attesa):
+                    soluzione = future.result()
+                    if soluzione is not None:
+                        soluzioni[futures[future]] = soluzione
+            except FuturesTimeoutError:
+                # Tempo scaduto: si tengono le iterazioni completate. Su Python
+                # 3.10 non è ancora un alias del TimeoutError builtin
+                pass
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+        return soluzioni
+
+    def _crea_equipaggi(
+        self, kernel: ClusterKernel, soluzione: Soluzione
+    ) -> List[Equipaggio]:
+        """Ricostruisce gli equipaggi con gli studenti del cluster originale"""
+        return [
+            Equipaggio(
+                id=equipaggio_id,
+                autista=kernel.studenti[membri[0]],
+                passeggeri=[kernel.studenti[p] for p in membri[1:]],
+                percorso_tappe=list(tappe),
+            )
+            for equipaggio_id, (membri, tappe) in enumerate(soluzione, 1)
+        ]
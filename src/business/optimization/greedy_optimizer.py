@@ -1,14 +1,27 @@
-from typing import List, Dict, Optional
+from typing import List, Optional
+import numpy as np
 from .base import OptimizationStrategy
+from .car_route import CarRoute
+from .cluster_kernel import ClusterKernel
+from .spatial_index import vicinati_localita
+from .unassigned_pool import UnassignedPool
 from src.data.models.studente import Studente
 from src.data.models.equipaggio import Equipaggio
-from src.data.models.percorso import Percorso
+from src.data.models.duration_matrix import DurationMatrix
 
 
 class GreedyOptimizer(OptimizationStrategy):
     """
     Algoritmo greedy per formazione equipaggi.
-    Logica: autista = più lontano, passeggeri = minima deviazione con bonus corso.
+    Logica: autista = più lontano, passeggeri = minimo costo di inserimento
+    nel percorso dell'auto con bonus corso. La deviazione cumulata
+    dell'intero percorso resta entro max_deviazione_sec.
+    Con k_localita_vicine > 0 (e coordinate note) i passeggeri si cercano
+    solo tra le località con cui popola ha scaricato i percorsi
+    dell'autista: l'unione dei vicinati (località e k più vicine) che lo
+    contengono. Costo per ricerca indipendente dalla dimensione del
+    cluster, così anche un unico cluster globale resta quasi lineare, e
+    nessun candidato senza durate in matrice.
     """
 
     def __init__(
@@ -17,121 +30,195 @@ class GreedyOptimizer(OptimizationStrategy):
         bonus_corso_laurea: int,
         max_deviazione_sec: int,
         comune_destinazione: str = "DALMINE",
+        k_localita_vicine: int = 0,
     ):
         self.capacita_auto = capacita_auto
         self.bonus_corso = bonus_corso_laurea
         self.max_deviazione = max_deviazione_sec
         self.destinazione = comune_destinazione
+        self.k_localita_vicine = k_localita_vicine
 
     def optimize_cluster(
-        self, cluster: List[Studente], percorsi: Dict[str, Percorso]
+        self, cluster: List[Studente], matrice: DurationMatrix
     ) -> List[Equipaggio]:
         """
         Implementazione algoritmo greedy.
+        Gli studenti sono identificati dalla posizione nel ClusterKernel.
+        """
+        kernel = ClusterKernel.build(cluster, matrice, self.destinazione)
+        return self.costruisci(kernel)
+
+    def costruisci(
+        self,
+        kernel: ClusterKernel,
+        rng: Optional[np.random.Generator] = None,
+        k_candidati: int = 1,
+    ) -> List[Equipaggio]:
+        """
+        Ciclo greedy sul kernel. Con un generatore e k_candidati > 1
+        autisti e passeggeri sono estratti a caso tra i k migliori (GRASP).
         """
         equipaggi = []
-        non_assegnati = self._ordina_per_distanza(cluster, percorsi)
+        non_assegnati = UnassignedPool(kernel.gruppi)
+        casuale = rng is not None and k_candidati > 1
         equipaggio_id = 1
+        vicinato = self._vicinato(kernel)
 
         while non_assegnati:
             # Autista = più lontano
-            autista = non_assegnati.pop(0)
+            if casuale:
+                assert rng is not None
+                autista = non_assegnati.estrai_tra_i_piu_lontani(k_candidati, rng)
+            else:
+                autista = non_assegnati.estrai_piu_lontano()
             membri = [autista]
+            rotta = CarRoute(kernel, int(kernel.loc[autista]))
+            ultimo_gruppo = int(kernel.gruppi.gruppo[autista])
+            candidati = None
+            if vicinato is not None:
+                candidati = vicinato.candidati(rotta)
 
-            # Riempi auto
+            # Riempi auto, un gruppo (località, corso) alla volta
             while len(membri) < self.capacita_auto and non_assegnati:
-                candidato = self._trova_miglior_passeggero(
-                    membri, non_assegnati, percorsi
+                gruppo = self._trova_miglior_passeggero(
+                    kernel,
+                    membri,
+                    rotta,
+                    non_assegnati,
+                    rng if casuale else None,
+                    k_candidati,
+                    candidati,
                 )
 
-                if candidato:
-                    membri.append(candidato)
-                    non_assegnati.remove(candidato)
-                else:
+                if gruppo is None:
                     break  # Nessuno compatibile
 
+                # Se vince di nuovo il gruppo dell'ultimo membro lo stato
+                # (percorso, corsi presenti) non cambia: resterà il
+                # migliore, quindi si riempiono i posti in un solo passo
+                posti = self.capacita_auto - len(membri)
+                quanti = posti if gruppo == ultimo_gruppo else 1
+                membri.extend(non_assegnati.preleva(gruppo, quanti))
+                rotta.inserisci(int(kernel.gruppi.loc[gruppo]))
+                ultimo_gruppo = gruppo
+
             # Crea equipaggio
             equipaggio = Equipaggio(
                 id=equipaggio_id,
-                autista=autista,
-                passeggeri=membri[1:],
-                percorso_tappe=self._calcola_tappe(membri, percorsi),
+                autista=kernel.studenti[autista],
+                passeggeri=[kernel.studenti[p] for p in membri[1:]],
+                percorso_tappe=self._calcola_tappe(kernel, membri, rotta),
             )
             equipaggi.append(equipaggio)
             equipaggio_id += 1
 
         return equipaggi
 
-    def _ordina_per_distanza(self, cluster, percorsi) -> List[Studente]:
-        """Ordina studenti dal più lontano al più vicino da destinazione"""
-        return sorted(
-            cluster, key=lambda s: self._get_durata_a_dest(s, percorsi), reverse=True
-        )
-
-    def _get_durata_a_dest(self, studente: Studente, percorsi: Dict) -> float:
-        """Helper per ottenere durata verso destinazione"""
-        key = f"{studente.localita}-{self.destinazione}"
-        percorso = percorsi.get(key)
-        return percorso.durata_sec if percorso else float("inf")
-
     def _trova_miglior_passeggero(
-        self, membri_attuali: List[Studente], candidati: List[Studente], percorsi: Dict
-    ) -> Optional[Studente]:
-        """
-        Trova candidato con minima deviazione pesata dal bonus corso.
-        Implementa la formula: Score = Deviazione - Bonus.
-        """
-        ultimo = membri_attuali[-1]
-        corsi_presenti = {m.corso for m in membri_attuali}
-
-        miglior_candidato = None
-        miglior_score = float("inf")
-
-        for candidato in candidati:
-            # Caso speciale: stessa località
-            if ultimo.localita == candidato.localita:
-                deviazione = 0
-            else:
-                deviazione = self._calcola_deviazione(
-                    ultimo.localita, candidato.localita, percorsi
-                )
-
-            # Filtro tolleranza
-            if deviazione > self.max_deviazione:
-                continue
-
-            # Bonus se stesso corso
-            bonus = self.bonus_corso if candidato.corso in corsi_presenti else 0
-            score = deviazione - bonus
-
-            if score < miglior_score:
-                miglior_score = score
-                miglior_candidato = candidato
-
-        return miglior_candidato
-
-    def _calcola_deviazione(self, loc_a: str, loc_b: str, percorsi: Dict) -> float:
+        self,
+        kernel: ClusterKernel,
+        membri_attuali: List[int],
+        rotta: CarRoute,
+        non_assegnati: UnassignedPool,
+        rng: Optional[np.random.Generator] = None,
+        k_candidati: int = 1,
+        candidati: Optional[np.ndarray] = None,
+    ) -> Optional[int]:
         """
-        Calcola deviazione temporale: (A->B->Dest) - (A->Dest).
-        
+        Trova il gruppo (località, corso) con minimo inserimento pesato dal bonus.
+        Implementa la formula: Score = Costo inserimento - Bonus,
+        come un unico argmin mascherato sui gruppi invece che sugli studenti.
+        Il costo è il delta del percorso completo dell'auto, non solo
+        rispetto all'ultimo membro.
+        A parità di score vince il gruppo dell'ultimo membro salito, poi lo studente
+        più lontano (stesso tie-break del ciclo scalare per posizione).
+        Con un generatore si sceglie a caso tra i k_candidati migliori.
+        `candidati` limita la ricerca a un sottoinsieme di gruppi.
         """
-        p_ab = percorsi.get(f"{loc_a}-{loc_b}")
-        p_b_dest = percorsi.get(f"{loc_b}-{self.destinazione}")
-        p_a_dest = percorsi.get(f"{loc_a}-{self.destinazione}")
-
-        if not (p_ab and p_b_dest and p_a_dest):
-            return float("inf")  # Dati mancanti
+        gruppi = kernel.gruppi
+        ultimo_gruppo = int(gruppi.gruppo[membri_attuali[-1]])
+        if candidati is None:
+            candidati = np.arange(gruppi.n_gruppi)
+            inserimento = rotta.costi_inserimento()[gruppi.loc]
+        else:
+            inserimento = rotta.costi_inserimento(gruppi.loc[candidati])
+
+        # Bonus se stesso corso
+        corsi_presenti = np.zeros(kernel.n_corsi, dtype=bool)
+        corsi_presenti[kernel.corso[membri_attuali]] = True
+        score = inserimento - self.bonus_corso * corsi_presenti[gruppi.corso[candidati]]
+
+        # Filtro disponibilità e tolleranza sulla deviazione cumulata
+        disponibili = non_assegnati.gruppi_disponibili[candidati]
+        fuori_soglia = rotta.deviazione + inserimento > self.max_deviazione
+        score[~disponibili | fuori_soglia] = np.inf
+
+        if rng is not None:
+            ammessi = np.flatnonzero(np.isfinite(score))
+            if len(ammessi) == 0:
+                return None
+            if len(ammessi) > k_candidati:
+                migliori = np.argpartition(score[ammessi], k_candidati - 1)
+                ammessi = ammessi[migliori[:k_candidati]]
+            return int(candidati[rng.choice(ammessi)])
+
+        minimo = score.min() if len(score) else np.inf
+        if not np.isfinite(minimo):
+            return None
+        pari = candidati[score == minimo]
+        if ultimo_gruppo in pari:
+            return ultimo_gruppo
+        if len(pari) == 1:
+            return int(pari[0])
+        return int(min(pari, key=non_assegnati.testa))
+
+    def _vicinato(self, kernel: ClusterKernel) -> Optional["_Vicinato"]:
+        """Indice delle località per la ricerca ristretta, se attiva"""
+        if self.k_localita_vicine <= 0 or kernel.coordinate is None:
+            return None
+        if len(kernel.localita) <= self.k_localita_vicine + 1:
+            return None  # Il vicinato è già l'intero cluster
+        return _Vicinato(kernel, self.k_localita_vicine)
+
+    def _calcola_tappe(
+        self, kernel: ClusterKernel, membri: List[int], rotta: CarRoute
+    ) -> List[str]:
+        """Ordina i membri secondo le tappe del percorso costruito"""
+        ordine = {loc: k for k, loc in enumerate(rotta.tappe)}
+        tappe_ordinate = sorted(membri, key=lambda p: ordine[int(kernel.loc[p])])
+        localita = [kernel.studenti[p].localita for p in tappe_ordinate]
+        localita.append(self.destinazione)
+        return localita
 
-        tempo_con_deviazione = p_ab.durata_sec + p_b_dest.durata_sec
-        tempo_diretto = p_a_dest.durata_sec
 
-        return tempo_con_deviazione - tempo_diretto
+class _Vicinato:
+    """
+    Per ogni località del cluster, le località raggiungibili: l'unione
+    dei vicinati di popola (località e k più vicine) che la contengono.
+    I candidati di un'auto sono i loro gruppi; la disponibilità la filtra
+    il pool.
+    """
 
-    def _calcola_tappe(self, membri: List[Studente], percorsi: Dict) -> List[str]:
-        """Ordina tappe per durata decrescente verso destinazione"""
-        tappe_ordinate = sorted(
-            membri, key=lambda s: self._get_durata_a_dest(s, percorsi), reverse=True
-        )
-        localita = [s.localita for s in tappe_ordinate]
-        localita.append(self.destinazione)
-        return localita
\ No newline at end of file
+    def __init__(self, kernel: ClusterKernel, k: int):
+        gruppi = kernel.gruppi
+        ordine = np.argsort(gruppi.loc, kind="stable")
+        tagli = np.cumsum(np.bincount(gruppi.loc, minlength=len(kernel.localita)))[:-1]
+        gruppi_di = np.split(ordine, tagli)
+
+        # Località raggiungibili da ognuna: unione dei vicinati che la contengono
+        id_localita = {loc: i for i, loc in enumerate(kernel.localita)}
+        raggiungibili: List[set] = [set() for _ in kernel.localita]
+        assert kernel.coordinate is not None
+        vicinati = vicinati_localita(kernel.localita, kernel.coordinate, k + 1)
+        for vicine in vicinati.values():
+            ids = [id_localita[v] for v in vicine]
+            for i in ids:
+                raggiungibili[i].update(ids)
+        self.candidati_di = [
+            np.concatenate([gruppi_di[j] for j in sorted(vicine)])
+            for vicine in raggiungibili
+        ]
+
+    def candidati(self, rotta: CarRoute) -> np.ndarray:
+        """Gruppi delle località raggiungibili dall'autista"""
+        return self.candidati_di[rotta.tappe[0]]
@@ -0,0 +1,33 @@
+from typing import List
+from .base import ImprovementStrategy, OptimizationStrategy
+from src.data.models.studente import Studente
+from src.data.models.equipaggio import Equipaggio
+from src.data.models.duration_matrix import DurationMatrix
+
+
+class ImprovedOptimizer(OptimizationStrategy):
+    """
+    Decorator: esegue un optimizer e applica in cascata le fasi di
+    miglioramento agli equipaggi del cluster.
+    """
+
+    def __init__(
+        self,
+        optimizer: OptimizationStrategy,
+        miglioramenti: List[ImprovementStrategy],
+    ):
+        self.optimizer = optimizer
+        self.miglioramenti = miglioramenti
+
+    def optimize_cluster(
+        self, cluster: List[Studente], matrice: DurationMatrix
+    ) -> List[Equipaggio]:
+        """Soluzione dell'optimizer base, poi ogni fase di miglioramento"""
+        equipaggi = self.optimizer.optimize_cluster(cluster, matrice)
+        for miglioramento in self.miglioramenti:
+            equipaggi = miglioramento.migliora(equipaggi, matrice)
+
+        # Id progressivi per cluster, come l'optimizer base
+        for equipaggio_id, equipaggio in enumerate(equipaggi, 1):
+            equipaggio.id = equipaggio_id
+        return equipaggi
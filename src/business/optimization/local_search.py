@@ -0,0 +1,256 @@
+import time
+from typing import List, Optional
+import numpy as np
+from .base import ImprovementStrategy
+from .car_route import CarRoute
+from .cluster_kernel import ClusterKernel
+from src.data.models.equipaggio import Equipaggio
+from src.data.models.duration_matrix import DurationMatrix
+
+
+EPSILON = 1e-9  # Miglioramento minimo di costo per accettare uno scambio
+
+
+class _Auto:
+    """Stato mutabile di un'auto durante la ricerca locale"""
+
+    def __init__(self, kernel: ClusterKernel, membri: List[int]):
+        self.membri = membri  # Posizioni nel kernel, autista in testa
+        self.rotta = CarRoute(kernel, int(kernel.loc[membri[0]]))
+        for p in membri[1:]:
+            self.rotta.inserisci(int(kernel.loc[p]))
+
+    def occupanti(self, kernel: ClusterKernel, loc: int) -> int:
+        """Membri dell'auto che salgono nella località"""
+        return sum(1 for p in self.membri if kernel.loc[p] == loc)
+
+
+class LocalSearchImprover(ImprovementStrategy):
+    """
+    Ricerca locale sugli equipaggi di un cluster con mosse merge,
+    relocate e swap. Obiettivo lessicografico: meno auto, auto più piene
+    (somma dei quadrati delle occupazioni), percorsi più brevi.
+    Ogni mossa è valutata in modo incrementale sui CarRoute coinvolti
+    e accettata solo se rispetta capacità e deviazione massima.
+    """
+
+    def __init__(
+        self,
+        capacita_auto: int,
+        max_deviazione_sec: int,
+        tempo_limite_sec: float,
+        comune_destinazione: str = "DALMINE",
+        candidati_scambio: int = 5,
+    ):
+        self.capacita_auto = capacita_auto
+        self.max_deviazione = max_deviazione_sec
+        self.tempo_limite = tempo_limite_sec
+        self.destinazione = comune_destinazione
+        self.candidati_scambio = candidati_scambio
+
+    def migliora(
+        self, equipaggi: List[Equipaggio], matrice: DurationMatrix
+    ) -> List[Equipaggio]:
+        """
+        Applica mosse migliorative finché ce ne sono o finché
+        non scade il tempo limite (la soluzione resta sempre valida).
+        """
+        if len(equipaggi) < 2:
+            return equipaggi
+
+        studenti = [membro for equipaggio in equipaggi for membro in equipaggio.membri]
+        kernel = ClusterKernel.build(studenti, matrice, self.destinazione)
+        posizioni = {id(s): p for p, s in enumerate(kernel.studenti)}
+        auto = [
+            _Auto(kernel, [posizioni[id(m)] for m in equipaggio.membri])
+            for equipaggio in equipaggi
+        ]
+
+        ricerca = _RicercaLocale(self, kernel, auto)
+        ricerca.esegui(time.perf_counter() + self.tempo_limite)
+        return ricerca.crea_equipaggi()
+
+
+class _RicercaLocale:
+    """Stato di una singola esecuzione della ricerca locale su un cluster"""
+
+    def __init__(
+        self, parametri: LocalSearchImprover, kernel: ClusterKernel, auto: List[_Auto]
+    ):
+        self.capacita_auto = parametri.capacita_auto
+        self.max_deviazione = parametri.max_deviazione
+        self.destinazione = parametri.destinazione
+        self.candidati_scambio = parametri.candidati_scambio
+        self._kernel = kernel
+        self._auto = auto
+        self._dimensioni = np.array([len(a.membri) for a in auto])
+        self._autisti_loc = np.array([a.rotta.tappe[0] for a in auto])
+
+    def esegui(self, scadenza: float) -> None:
+        """Applica mosse migliorative finché ce ne sono o fino alla scadenza"""
+        migliorato = True
+        while migliorato and time.perf_counter() < scadenza:
+            migliorato = False
+            # Prima le auto meno piene: sono quelle da svuotare
+            for a in np.argsort(self._dimensioni, kind="stable"):
+                if time.perf_counter() >= scadenza:
+                    break
+                if self._dimensioni[a] == 0:
+                    continue
+                if (
+                    self._prova_fusione(a)
+                    or self._prova_spostamento(a)
+                    or self._prova_scambio(a)
+                ):
+                    migliorato = True
+
+    def _candidati(self, a: int, loc: int, posti: int) -> np.ndarray:
+        """
+        Auto diverse da a con almeno `posti` liberi e deviazione
+        autista -> loc entro soglia (condizione necessaria per l'inserimento).
+        """
+        compatibili = (
+            (self._dimensioni > 0)
+            & (self._dimensioni + posti <= self.capacita_auto)
+            & (self._kernel.deviazione[self._autisti_loc, loc] <= self.max_deviazione)
+        )
+        compatibili[a] = False
+        return np.flatnonzero(compatibili)
+
+    def _aggiorna(
+        self, i: int, membri: List[int], rotta: Optional[CarRoute]
+    ) -> None:
+        """Applica il nuovo stato dell'auto i"""
+        auto = self._auto[i]
+        auto.membri = membri
+        self._dimensioni[i] = len(membri)
+        if rotta is not None:
+            auto.rotta = rotta
+            self._autisti_loc[i] = rotta.tappe[0]
+
+    def _senza(self, a: int, p: int) -> CarRoute:
+        """Percorso dell'auto a dopo l'uscita del membro p"""
+        auto = self._auto[a]
+        loc = int(self._kernel.loc[p])
+        rotta = auto.rotta.copia()
+        if auto.occupanti(self._kernel, loc) == 1:
+            rotta.rimuovi(loc)
+        return rotta
+
+    def _prova_fusione(self, a: int) -> bool:
+        """Merge: tutti i membri di a in un'unica altra auto (un'auto in meno)"""
+        sorgente = self._auto[a]
+        candidati = self._candidati(
+            a, sorgente.rotta.tappe[0], int(self._dimensioni[a])
+        )
+        # Preferisce le auto più piene
+        for b in candidati[np.argsort(-self._dimensioni[candidati], kind="stable")]:
+            rotta = self._auto[b].rotta.copia()
+            for loc in sorgente.rotta.tappe:
+                rotta.inserisci(loc)
+            if rotta.deviazione <= self.max_deviazione:
+                self._aggiorna(b, self._auto[b].membri + sorgente.membri, rotta)
+                self._aggiorna(a, [], None)
+                return True
+        return False
+
+    def _prova_spostamento(self, a: int) -> bool:
+        """
+        Relocate: un membro di a verso un'auto almeno altrettanto piena,
+        così le auto piccole si svuotano per le fusioni successive. Anche
+        l'auto di partenza deve restare entro la deviazione massima.
+        """
+        sorgente = self._auto[a]
+        if len(sorgente.membri) < 2:
+            return False
+
+        for p in sorgente.membri:
+            rotta_a = self._senza(a, p)
+            if rotta_a.deviazione > self.max_deviazione:
+                continue
+
+            loc = int(self._kernel.loc[p])
+            candidati = self._candidati(a, loc, 1)
+            candidati = candidati[self._dimensioni[candidati] >= self._dimensioni[a]]
+
+            migliore, b_migliore = float("inf"), None
+            for b in candidati:
+                rotta_b = self._auto[b].rotta
+                delta, _ = rotta_b.costo_inserimento(loc)
+                if rotta_b.deviazione + delta <= self.max_deviazione and delta < migliore:
+                    migliore, b_migliore = delta, int(b)
+
+            if b_migliore is not None:
+                rotta_b = self._auto[b_migliore].rotta.copia()
+                rotta_b.inserisci(loc)
+                self._aggiorna(a, [m for m in sorgente.membri if m != p], rotta_a)
+                self._aggiorna(b_migliore, self._auto[b_migliore].membri + [p], rotta_b)
+                return True
+        return False
+
+    def _prova_scambio(self, a: int) -> bool:
+        """
+        Swap: scambia un membro di a con uno di un'auto vicina
+        se il costo totale dei due percorsi diminuisce.
+        """
+        kernel = self._kernel
+        sorgente = self._auto[a]
+        for p in sorgente.membri:
+            loc_p = int(kernel.loc[p])
+            candidati = self._candidati(a, loc_p, 0)
+            vicini = candidati[
+                np.argsort(kernel.deviazione[self._autisti_loc[candidati], loc_p])
+            ][: self.candidati_scambio]
+
+            for b in vicini:
+                destinatario = self._auto[b]
+                costo_prima = sorgente.rotta.costo + destinatario.rotta.costo
+                for q in destinatario.membri:
+                    loc_q = int(kernel.loc[q])
+                    if loc_q == loc_p:
+                        continue
+
+                    rotta_a = self._scambia(a, p, loc_q)
+                    rotta_b = self._scambia(b, q, loc_p)
+                    if (
+                        rotta_a.costo + rotta_b.costo < costo_prima - EPSILON
+                        and rotta_a.deviazione <= self.max_deviazione
+                        and rotta_b.deviazione <= self.max_deviazione
+                    ):
+                        self._aggiorna(
+                            a, [q if m == p else m for m in sorgente.membri], rotta_a
+                        )
+                        self._aggiorna(
+                            b, [p if m == q else m for m in destinatario.membri], rotta_b
+                        )
+                        return True
+        return False
+
+    def _scambia(self, a: int, uscente: int, loc_entrante: int) -> CarRoute:
+        """Percorso dell'auto a con il membro uscente sostituito"""
+        rotta = self._senza(a, uscente)
+        if not rotta.tappe:
+            return CarRoute(self._kernel, loc_entrante)
+        rotta.inserisci(loc_entrante)
+        return rotta
+
+    def crea_equipaggi(self) -> List[Equipaggio]:
+        """Equipaggi finali: autista nella prima tappa, membri in ordine di percorso"""
+        kernel = self._kernel
+        equipaggi: List[Equipaggio] = []
+        for auto in self._auto:
+            if not auto.membri:
+                continue
+
+            ordine = {loc: k for k, loc in enumerate(auto.rotta.tappe)}
+            membri = sorted(auto.membri, key=lambda p: ordine[int(kernel.loc[p])])
+            equipaggi.append(
+                Equipaggio(
+                    id=len(equipaggi) + 1,
+                    autista=kernel.studenti[membri[0]],
+                    passeggeri=[kernel.studenti[p] for p in membri[1:]],
+                    percorso_tappe=[kernel.studenti[p].localita for p in membri]
+                    + [self.destinazione],
+                )
+            )
+        return equipaggi
@@ -0,0 +1,201 @@
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+import numpy as np
+from .base import OptimizationStrategy
+from .car_route import CarRoute
+from .cluster_kernel import ClusterKernel
+from .unassigned_pool import UnassignedPool
+from src.data.models.studente import Studente
+from src.data.models.equipaggio import Equipaggio
+from src.data.models.duration_matrix import DurationMatrix
+
+
+@dataclass
+class _AutoAperta:
+    """Auto in costruzione: membri, percorso e corsi presenti"""
+
+    membri: List[int]
+    rotta: CarRoute
+    corsi: np.ndarray = field(repr=False)
+
+
+class RegretOptimizer(OptimizationStrategy):
+    """
+    Inserimento a regret-k: per ogni gruppo (località, corso) non assegnato
+    si confronta il miglior inserimento con il k-esimo tra le auto aperte
+    e si inserisce per primo il gruppo col regret più alto, cioè quello
+    che perderebbe di più aspettando.
+    Quando nessun inserimento è ammissibile si aprono in parallelo più auto,
+    una per località tra loro incompatibili (nessuna delle due può
+    raccogliere l'altra entro la deviazione): sotto disuguaglianza
+    triangolare quegli studenti non possono comunque viaggiare insieme.
+    I costi sono una matrice gruppi × auto aperte: dopo ogni inserimento
+    si ricalcola solo la colonna dell'auto modificata.
+    """
+
+    def __init__(
+        self,
+        capacita_auto: int,
+        bonus_corso_laurea: int,
+        max_deviazione_sec: int,
+        k_regret: int = 3,
+        comune_destinazione: str = "DALMINE",
+    ):
+        self.capacita_auto = capacita_auto
+        self.bonus_corso = bonus_corso_laurea
+        self.max_deviazione = max_deviazione_sec
+        self.k_regret = k_regret
+        self.destinazione = comune_destinazione
+
+    def optimize_cluster(
+        self, cluster: List[Studente], matrice: DurationMatrix
+    ) -> List[Equipaggio]:
+        """Inserimenti per regret decrescente, poi equipaggi in ordine di apertura"""
+        kernel = ClusterKernel.build(cluster, matrice, self.destinazione)
+        non_assegnati = UnassignedPool(kernel.gruppi)
+        incompatibili = (kernel.deviazione > self.max_deviazione) & (
+            kernel.deviazione.T > self.max_deviazione
+        )
+
+        # Costo di un'auto nuova: più alto di qualunque inserimento ammissibile
+        costo_nuova = float(self.max_deviazione + self.bonus_corso + 1)
+
+        flotta: List[_AutoAperta] = []
+        aperte: List[_AutoAperta] = []  # aperte[c] corrisponde a costi[:, c]
+        costi = np.empty((kernel.gruppi.n_gruppi, 0))
+
+        while non_assegnati:
+            gruppi = np.flatnonzero(non_assegnati.gruppi_disponibili)
+            scelta = self._scegli(non_assegnati, gruppi, costi, costo_nuova)
+
+            if scelta is None:
+                # Le auto aperte non accettano più nessuno: nuove auto
+                aperte = [
+                    self._apri(kernel, non_assegnati, loc)
+                    for loc in self._semi(kernel, non_assegnati, incompatibili)
+                ]
+                flotta.extend(aperte)
+                costi = np.column_stack([self._colonna(kernel, a) for a in aperte])
+                continue
+
+            gruppo, c = scelta
+            auto = aperte[c]
+            self._inserisci(kernel, auto, non_assegnati.preleva(gruppo, 1)[0])
+
+            if len(auto.membri) < self.capacita_auto:
+                costi[:, c] = self._colonna(kernel, auto)
+            else:
+                # Auto piena: la sua colonna prende il posto dell'ultima
+                costi[:, c] = costi[:, -1]
+                costi = costi[:, :-1]
+                aperte[c] = aperte[-1]
+                aperte.pop()
+
+        return self._crea_equipaggi(kernel, flotta)
+
+    def _semi(
+        self,
+        kernel: ClusterKernel,
+        non_assegnati: UnassignedPool,
+        incompatibili: np.ndarray,
+    ) -> List[int]:
+        """
+        Località con studenti non assegnati, dalla più lontana, tenute se
+        incompatibili con tutte quelle già scelte. La prima è sempre quella
+        dello studente più lontano, come l'autista del GreedyOptimizer.
+        """
+        gruppi = kernel.gruppi
+        rimaste = np.unique(gruppi.loc[non_assegnati.gruppi_disponibili])
+        rimaste = rimaste[np.argsort(-kernel.durata_dest[rimaste], kind="stable")]
+
+        semi: List[int] = []
+        for loc in rimaste.tolist():
+            if all(incompatibili[loc, s] for s in semi):
+                semi.append(loc)
+        return semi
+
+    def _scegli(
+        self,
+        non_assegnati: UnassignedPool,
+        gruppi: np.ndarray,
+        costi: np.ndarray,
+        costo_nuova: float,
+    ) -> Optional[Tuple[int, int]]:
+        """
+        Gruppo col regret più alto e auto in cui inserirlo, o None.
+        Regret = k-esimo costo - miglior costo, dove le alternative mancanti
+        valgono come un'auto nuova. A parità vince il costo minore, poi
+        lo studente più lontano.
+        """
+        if costi.shape[1] == 0:
+            return None
+        righe = costi[gruppi]
+        migliore = righe.min(axis=1)
+        ammessi = np.isfinite(migliore)
+        if not ammessi.any():
+            return None
+
+        k = min(self.k_regret, righe.shape[1] + 1)
+        if k <= righe.shape[1]:
+            k_esimo = np.partition(righe, k - 1, axis=1)[:, k - 1]
+        else:
+            k_esimo = np.full(len(gruppi), np.inf)
+        regret = np.minimum(k_esimo, costo_nuova) - migliore
+        regret[~ammessi] = -np.inf
+
+        pari = np.flatnonzero(regret == regret.max())
+        if len(pari) > 1:
+            pari = pari[migliore[pari] == migliore[pari].min()]
+        i = int(min(pari, key=lambda i: non_assegnati.testa(int(gruppi[i]))))
+        return int(gruppi[i]), int(np.argmin(righe[i]))
+
+    def _apri(
+        self, kernel: ClusterKernel, non_assegnati: UnassignedPool, loc: int
+    ) -> _AutoAperta:
+        """Auto nuova guidata dallo studente più lontano della località"""
+        gruppi = np.flatnonzero(
+            non_assegnati.gruppi_disponibili & (kernel.gruppi.loc == loc)
+        )
+        gruppo = min(gruppi.tolist(), key=non_assegnati.testa)
+        autista = non_assegnati.preleva(gruppo, 1)[0]
+
+        corsi = np.zeros(kernel.n_corsi, dtype=bool)
+        corsi[kernel.corso[autista]] = True
+        return _AutoAperta([autista], CarRoute(kernel, loc), corsi)
+
+    def _inserisci(self, kernel: ClusterKernel, auto: _AutoAperta, p: int) -> None:
+        auto.membri.append(p)
+        auto.rotta.inserisci(int(kernel.loc[p]))
+        auto.corsi[kernel.corso[p]] = True
+
+    def _colonna(self, kernel: ClusterKernel, auto: _AutoAperta) -> np.ndarray:
+        """
+        Costo di inserimento di ogni gruppo nell'auto, col bonus corso;
+        infinito se la deviazione cumulata supera il massimo.
+        """
+        gruppi = kernel.gruppi
+        if len(auto.membri) >= self.capacita_auto:
+            return np.full(gruppi.n_gruppi, np.inf)
+        inserimento = auto.rotta.costi_inserimento()[gruppi.loc]
+        costo: np.ndarray = inserimento - self.bonus_corso * auto.corsi[gruppi.corso]
+        costo[auto.rotta.deviazione + inserimento > self.max_deviazione] = np.inf
+        return costo
+
+    def _crea_equipaggi(
+        self, kernel: ClusterKernel, flotta: List[_AutoAperta]
+    ) -> List[Equipaggio]:
+        """Equipaggi con i membri nell'ordine delle tappe del percorso"""
+        equipaggi = []
+        for equipaggio_id, auto in enumerate(flotta, 1):
+            ordine = {loc: k for k, loc in enumerate(auto.rotta.tappe)}
+            membri = sorted(auto.membri, key=lambda p: ordine[int(kernel.loc[p])])
+            equipaggi.append(
+                Equipaggio(
+                    id=equipaggio_id,
+                    autista=kernel.studenti[membri[0]],
+                    passeggeri=[kernel.studenti[p] for p in membri[1:]],
+                    percorso_tappe=[kernel.studenti[p].localita for p in membri]
+                    + [self.destinazione],
+                )
+            )
+        return equipaggi
@@ -0,0 +1,152 @@
+import bisect
+import heapq
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from .base import OptimizationStrategy
+from .cluster_kernel import ClusterKernel
+from src.data.models.studente import Studente
+from src.data.models.equipaggio import Equipaggio
+from src.data.models.duration_matrix import DurationMatrix
+
+
+@dataclass
+class _Rotta:
+    """Catena di studenti che termina alla destinazione"""
+
+    membri: List[int]  # Posizioni nel kernel, autista in testa
+    costo: float  # Durata totale fino alla destinazione
+
+
+def _aggiungi(ordinate: List[int], rotta: int) -> None:
+    bisect.insort(ordinate, rotta)
+
+
+def _togli(ordinate: List[int], rotta: int) -> None:
+    del ordinate[bisect.bisect_left(ordinate, rotta)]
+
+
+class SavingsOptimizer(OptimizationStrategy):
+    """
+    Algoritmo dei risparmi (Clarke-Wright) adattato alla destinazione unica.
+    Ogni studente parte con la propria auto; accodare la catena che inizia
+    in b a quella che termina in a risparmia d(a,dest) - d(a,b).
+    Le fusioni seguono i risparmi decrescenti finché capacità e
+    deviazione massima lo consentono. Il bonus corso non è considerato.
+    """
+
+    def __init__(
+        self,
+        capacita_auto: int,
+        max_deviazione_sec: int,
+        comune_destinazione: str = "DALMINE",
+    ):
+        self.capacita_auto = capacita_auto
+        self.max_deviazione = max_deviazione_sec
+        self.destinazione = comune_destinazione
+
+    def optimize_cluster(
+        self, cluster: List[Studente], matrice: DurationMatrix
+    ) -> List[Equipaggio]:
+        """
+        Risparmi calcolati una volta sulle coppie di località (NumPy),
+        fusioni estratte da un heap: O(L² log L) sulle località del cluster.
+        Code e teste per località restano ordinate per id e contengono solo
+        rotte con posti liberi: le auto piene non vengono più riesaminate.
+        """
+        kernel = ClusterKernel.build(cluster, matrice, self.destinazione)
+
+        rotte: Dict[int, _Rotta] = {}
+        code: Dict[int, List[int]] = {}  # loc -> rotte non piene che terminano lì
+        teste: Dict[int, List[int]] = {}  # loc -> rotte non piene che iniziano lì
+        for p in range(kernel.n_studenti):
+            loc = int(kernel.loc[p])
+            rotte[p] = _Rotta(membri=[p], costo=float(kernel.durata_dest[loc]))
+            code.setdefault(loc, []).append(p)
+            teste.setdefault(loc, []).append(p)
+
+        heap = self._heap_risparmi(kernel)
+        while heap:
+            delta, a, b = heapq.heappop(heap)
+            fusione = self._trova_fusione(kernel, rotte, code[a], teste[b], a, b)
+            if fusione is None:
+                continue
+
+            # Accoda la rotta j alla rotta i
+            i, j = fusione
+            prima, dopo = rotte[i], rotte.pop(j)
+            prima.costo += dopo.costo + delta
+            prima.membri.extend(dopo.membri)
+
+            _togli(code[a], i)
+            _togli(teste[b], j)
+            fine = int(kernel.loc[dopo.membri[-1]])
+            _togli(code[fine], j)
+            if len(prima.membri) < self.capacita_auto:
+                _aggiungi(code[fine], i)
+            else:
+                _togli(teste[int(kernel.loc[prima.membri[0]])], i)
+
+            # La stessa coppia di località può servire altre fusioni
+            heapq.heappush(heap, (delta, a, b))
+
+        return self._crea_equipaggi(kernel, rotte)
+
+    def _heap_risparmi(self, kernel: ClusterKernel) -> list:
+        """
+        Heap dei risparmi sulle coppie (a, b) ammissibili.
+        Si memorizza -risparmio = d(a,b) - d(a,dest): heapq è un min-heap
+        e lo stesso valore è il delta di costo della fusione.
+        """
+        delta = kernel.durate - kernel.durata_dest[:, None]
+        ammissibili = np.isfinite(delta) & (kernel.deviazione <= self.max_deviazione)
+        a, b = np.nonzero(ammissibili)
+        heap = list(zip(delta[a, b].tolist(), a.tolist(), b.tolist()))
+        heapq.heapify(heap)
+        return heap
+
+    def _trova_fusione(
+        self,
+        kernel: ClusterKernel,
+        rotte: Dict[int, _Rotta],
+        code_a: List[int],
+        teste_b: List[int],
+        a: int,
+        b: int,
+    ) -> Optional[Tuple[int, int]]:
+        """
+        Prima coppia (i, j) di rotte distinte, i che termina in a e
+        j che inizia in b, unibile senza violare capacità e deviazione.
+        """
+        delta = float(kernel.durate[a, b] - kernel.durata_dest[a])
+        for i in code_a:
+            prima = rotte[i]
+            posti = self.capacita_auto - len(prima.membri)
+            diretto = kernel.durata_dest[kernel.loc[prima.membri[0]]]
+            for j in teste_b:
+                dopo = rotte[j]
+                if j == i or len(dopo.membri) > posti:
+                    continue
+                costo = prima.costo + dopo.costo + delta
+                if costo - diretto <= self.max_deviazione:
+                    return i, j
+        return None
+
+    def _crea_equipaggi(
+        self, kernel: ClusterKernel, rotte: Dict[int, _Rotta]
+    ) -> List[Equipaggio]:
+        """Una rotta per auto: l'autista è in testa, tappe in ordine di catena"""
+        equipaggi = []
+        for equipaggio_id, rotta in enumerate(
+            sorted(rotte.values(), key=lambda r: r.membri[0]), 1
+        ):
+            membri = [kernel.studenti[p] for p in rotta.membri]
+            equipaggi.append(
+                Equipaggio(
+                    id=equipaggio_id,
+                    autista=membri[0],
+                    passeggeri=membri[1:],
+                    percorso_tappe=[s.localita for s in membri] + [self.destinazione],
+                )
+            )
+        return equipaggi
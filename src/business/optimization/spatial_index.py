@@ -0,0 +1,37 @@
+import math
+from typing import Dict, List
+import numpy as np
+from sklearn.neighbors import KDTree
+
+
+KM_PER_GRADO = 111.32  # Km per grado di latitudine (e di longitudine all'equatore)
+
+
+def proietta_km(coordinate: np.ndarray) -> np.ndarray:
+    """(lat, lon) -> km su un piano equirettangolare locale"""
+    coordinate = np.asarray(coordinate, dtype=float)
+    lat0 = math.radians(float(coordinate[:, 0].mean()))
+    return np.column_stack(
+        (
+            coordinate[:, 0] * KM_PER_GRADO,
+            coordinate[:, 1] * KM_PER_GRADO * math.cos(lat0),
+        )
+    )
+
+
+def vicinati_localita(
+    localita: List[str], coordinate: np.ndarray, k: int
+) -> Dict[str, List[str]]:
+    """
+    Per ogni località le k più vicine in linea d'aria, se stessa compresa.
+    Le località si indicizzano in ordine di nome: stesso insieme, stessi
+    vicinati qualunque sia l'ordine di partenza. Popola scarica le coppie
+    dentro questi vicinati e il greedy vi cerca i passeggeri.
+    """
+    if not localita:
+        return {}
+    ordine = sorted(range(len(localita)), key=localita.__getitem__)
+    nomi = [localita[i] for i in ordine]
+    punti = proietta_km(np.asarray(coordinate, dtype=float)[ordine])
+    vicini = KDTree(punti).query(punti, k=min(k, len(nomi)), return_distance=False)
+    return {nome: [nomi[j] for j in riga] for nome, riga in zip(nomi, vicini.tolist())}
@@ -0,0 +1,113 @@
+from typing import Dict, FrozenSet, List, Optional, Tuple
+import numpy as np
+from src.data.models.equipaggio import Equipaggio
+from src.data.models.duration_matrix import DurationMatrix
+
+
+class StopOrderSolver:
+    """
+    Ordine ottimo delle tappe di un equipaggio (Held-Karp su bitmask).
+    L'autista parte da casa, raccoglie ogni località e arriva a destinazione.
+    Le soluzioni sono memoizzate per (località autista, località da visitare):
+    equipaggi identici, anche in cluster diversi, sono risolti una volta.
+    """
+
+    def __init__(self, comune_destinazione: str = "DALMINE"):
+        self.destinazione = comune_destinazione
+        self._memo: Dict[
+            Tuple[str, FrozenSet[str]], Tuple[List[str], Optional[float]]
+        ] = {}
+
+    @property
+    def percorsi_risolti(self) -> int:
+        """Numero di percorsi distinti calcolati finora"""
+        return len(self._memo)
+
+    def ordina_flotta(self, flotta: List[Equipaggio], matrice: DurationMatrix) -> None:
+        """Riordina tappe e passeggeri di ogni equipaggio della flotta"""
+        for equipaggio in flotta:
+            self.ordina_equipaggio(equipaggio, matrice)
+
+    def ordina_equipaggio(
+        self, equipaggio: Equipaggio, matrice: DurationMatrix
+    ) -> None:
+        """
+        Imposta percorso_tappe (una voce per membro, come prima),
+        passeggeri in ordine di raccolta e durata totale del percorso.
+        """
+        partenza = equipaggio.autista.localita
+        da_visitare = frozenset(p.localita for p in equipaggio.passeggeri)
+        ordine_localita, durata = self.percorso(partenza, da_visitare, matrice)
+
+        posizione = {loc: k for k, loc in enumerate(ordine_localita)}
+        equipaggio.passeggeri = sorted(
+            equipaggio.passeggeri, key=lambda s: posizione[s.localita]
+        )
+        equipaggio.percorso_tappe = [s.localita for s in equipaggio.membri] + [
+            self.destinazione
+        ]
+        equipaggio.durata_percorso_sec = durata
+
+    def percorso(
+        self, partenza: str, da_visitare: FrozenSet[str], matrice: DurationMatrix
+    ) -> Tuple[List[str], Optional[float]]:
+        """
+        Ordine ottimo delle località (partenza in testa) e durata totale
+        fino a destinazione; None se il percorso usa durate mancanti.
+        """
+        chiave = (partenza, da_visitare - {partenza})
+        if chiave not in self._memo:
+            self._memo[chiave] = self._risolvi(partenza, sorted(chiave[1]), matrice)
+        return self._memo[chiave]
+
+    def _risolvi(
+        self, partenza: str, intermedie: List[str], matrice: DurationMatrix
+    ) -> Tuple[List[str], Optional[float]]:
+        """
+        Programmazione dinamica sui sottoinsiemi di tappe intermedie:
+        costo[mask][j] = percorso minimo da partenza che visita mask e finisce in j.
+        Senza alcun percorso completo si ripiega sull'ordine per durata
+        decrescente e la durata resta sconosciuta (None).
+        """
+        n = len(intermedie)
+        durate = matrice.sottomatrice_durate([partenza] + intermedie + [self.destinazione])
+        durate = np.where(np.isnan(durate), np.inf, durate).tolist()
+        dest = n + 1
+
+        if n == 0:
+            diretto = durate[0][dest]
+            return [partenza], diretto if diretto < float("inf") else None
+
+        costo = [[float("inf")] * n for _ in range(1 << n)]
+        padre = [[-1] * n for _ in range(1 << n)]
+        for j in range(n):
+            costo[1 << j][j] = durate[0][j + 1]
+
+        for mask in range(1, 1 << n):
+            for j in range(n):
+                base = costo[mask][j]
+                if base == float("inf"):
+                    continue
+                for k in range(n):
+                    if mask & (1 << k):
+                        continue
+                    nuovo = base + durate[j + 1][k + 1]
+                    successivo = mask | (1 << k)
+                    if nuovo < costo[successivo][k]:
+                        costo[successivo][k] = nuovo
+                        padre[successivo][k] = j
+
+        completo = (1 << n) - 1
+        finali = [costo[completo][j] + durate[j + 1][dest] for j in range(n)]
+        ultimo = min(range(n), key=finali.__getitem__)
+        if finali[ultimo] == float("inf"):
+            indici = sorted(range(n), key=lambda j: durate[j + 1][dest], reverse=True)
+            return [partenza] + [intermedie[j] for j in indici], None
+
+        # Ricostruzione a ritroso
+        ordine: List[str] = []
+        mask, j = completo, ultimo
+        while j != -1:
+            ordine.append(intermedie[j])
+            mask, j = mask & ~(1 << j), padre[mask][j]
+        return [partenza] + ordine[::-1], finali[ultimo]
@@ -0,0 +1,56 @@
+from dataclasses import dataclass
+from typing import List
+import numpy as np
+
+
+@dataclass
+class StudentBuckets:
+    """
+    Aggregazione degli studenti di un cluster per (località, corso).
+    Studenti dello stesso gruppo hanno deviazione reciproca nulla e lo stesso
+    bonus: l'ottimizzatore li valuta una sola volta e li assegna in blocco.
+    """
+
+    gruppo: np.ndarray  # gruppo[p] = id gruppo dello studente in posizione p
+    posizioni: List[np.ndarray]  # Posizioni crescenti degli studenti di ogni gruppo
+    loc: np.ndarray  # loc[g] = id locale della località del gruppo
+    corso: np.ndarray  # corso[g] = id intero del corso del gruppo
+
+    @property
+    def n_gruppi(self) -> int:
+        """Numero di gruppi distinti"""
+        return len(self.posizioni)
+
+    @property
+    def conteggi(self) -> np.ndarray:
+        """Numero di studenti per gruppo"""
+        return np.array([len(p) for p in self.posizioni], dtype=np.intp)
+
+    @classmethod
+    def build(cls, loc: np.ndarray, corso: np.ndarray) -> "StudentBuckets":
+        """
+        Raggruppa per coppia (loc, corso) i vettori per-studente del kernel.
+        I gruppi sono numerati per prima apparizione nell'ordinamento.
+        """
+        if not len(loc):
+            vuoto = np.zeros(0, dtype=np.intp)
+            return cls(gruppo=vuoto, posizioni=[], loc=vuoto, corso=vuoto)
+
+        chiave = loc * (int(corso.max()) + 1) + corso
+        _, primo, inverso = np.unique(chiave, return_index=True, return_inverse=True)
+
+        # Rinumera i gruppi nell'ordine della loro prima posizione
+        ordine = np.argsort(primo, kind="stable")
+        rango = np.empty_like(ordine)
+        rango[ordine] = np.arange(len(ordine))
+        gruppo = rango[inverso.ravel()]
+
+        per_gruppo = np.argsort(gruppo, kind="stable")
+        tagli = np.cumsum(np.bincount(gruppo))[:-1]
+
+        return cls(
+            gruppo=gruppo,
+            posizioni=np.split(per_gruppo, tagli),
+            loc=loc[primo[ordine]],
+            corso=corso[primo[ordine]],
+        )
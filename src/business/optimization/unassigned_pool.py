@@ -0,0 +1,86 @@
+from typing import List
+import numpy as np
+from .student_buckets import StudentBuckets
+
+
+class UnassignedPool:
+    """
+    Insieme degli studenti non ancora assegnati di un cluster.
+    Lavora sulle posizioni del ClusterKernel (ordinate per distanza decrescente):
+    maschera booleana per rimozioni O(1) e cursore per estrarre il più lontano.
+    Gli studenti di ogni gruppo (località, corso) escono sempre in ordine di
+    posizione, quindi ogni gruppo si riduce a un contatore e a una testa.
+    """
+
+    def __init__(self, gruppi: StudentBuckets):
+        self.gruppi = gruppi
+        self.disponibili = np.ones(len(gruppi.gruppo), dtype=bool)
+        self.rimanenti_gruppo = gruppi.conteggi
+        self.gruppi_disponibili = self.rimanenti_gruppo > 0
+        self._prelevati = np.zeros(gruppi.n_gruppi, dtype=np.intp)
+        self._cursore = 0
+        self._rimanenti = len(gruppi.gruppo)
+
+    def __len__(self) -> int:
+        return self._rimanenti
+
+    @property
+    def cursore(self) -> int:
+        """Prima posizione che può essere ancora disponibile"""
+        return self._cursore
+
+    def testa(self, gruppo: int) -> int:
+        """Posizione del prossimo studente del gruppo (più lontano tra i rimasti)"""
+        return int(self.gruppi.posizioni[gruppo][self._prelevati[gruppo]])
+
+    def preleva(self, gruppo: int, quanti: int) -> List[int]:
+        """
+        Assegna in un colpo fino a `quanti` studenti del gruppo.
+        Restituisce le posizioni prelevate, in ordine.
+        """
+        quanti = min(quanti, int(self.rimanenti_gruppo[gruppo]))
+        inizio = self._prelevati[gruppo]
+        posizioni = self.gruppi.posizioni[gruppo][inizio : inizio + quanti]
+
+        self.disponibili[posizioni] = False
+        self._prelevati[gruppo] += quanti
+        self.rimanenti_gruppo[gruppo] -= quanti
+        self.gruppi_disponibili[gruppo] = self.rimanenti_gruppo[gruppo] > 0
+        self._rimanenti -= quanti
+        prelevate: List[int] = posizioni.tolist()
+        return prelevate
+
+    def estrai_piu_lontano(self) -> int:
+        """
+        Estrae lo studente disponibile più lontano dalla destinazione.
+        Il cursore avanza solo in avanti: costo ammortizzato O(1).
+        """
+        if not self._rimanenti:
+            raise IndexError("Pool vuoto")
+
+        while not self.disponibili[self._cursore]:
+            self._cursore += 1
+
+        # Il più lontano rimasto è sempre la testa del proprio gruppo
+        return self.preleva(int(self.gruppi.gruppo[self._cursore]), 1)[0]
+
+    def estrai_tra_i_piu_lontani(self, k: int, rng: np.random.Generator) -> int:
+        """
+        Variante randomizzata: estrae la testa di uno tra i k gruppi
+        disponibili più lontani, scelto in modo uniforme.
+        """
+        if not self._rimanenti:
+            raise IndexError("Pool vuoto")
+
+        while not self.disponibili[self._cursore]:
+            self._cursore += 1
+
+        gruppi: List[int] = []
+        posizione = self._cursore
+        while len(gruppi) < k and posizione < len(self.disponibili):
+            gruppo = int(self.gruppi.gruppo[posizione])
+            if self.disponibili[posizione] and gruppo not in gruppi:
+                gruppi.append(gruppo)
+            posizione += 1
+
+        return self.preleva(gruppi[int(rng.integers(len(gruppi)))], 1)[0]
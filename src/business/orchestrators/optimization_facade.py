@@ -1,9 +1,42 @@
-from typing import List, Dict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing.shared_memory import SharedMemory
+from typing import List, Optional
 from ..clustering.base import ClusteringStrategy
 from ..optimization.base import OptimizationStrategy
+from ..optimization.cross_cluster_rebalancer import CrossClusterRebalancer
+from ..optimization.stop_order import StopOrderSolver
 from src.data.models.studente import Studente
 from src.data.models.equipaggio import Equipaggio
-from src.data.models.percorso import Percorso
+from src.data.models.duration_matrix import DurationMatrix
+from src.data.models.shared_duration_matrix import (
+    SharedDurationMatrix,
+    SharedMatrixDescriptor,
+)
+
+
+# Stato dei processi worker: impostato una sola volta dall'initializer,
+# così optimizer e matrice non viaggiano con ogni cluster
+_optimizer_worker: Optional[OptimizationStrategy] = None
+_matrice_worker: Optional[DurationMatrix] = None
+_segmenti_worker: List[SharedMemory] = []
+
+
+def _inizializza_worker(
+    optimizer: OptimizationStrategy, descrittore: SharedMatrixDescriptor
+) -> None:
+    """
+    Initializer del process pool: riceve l'optimizer e si collega alla
+    matrice in shared memory, senza copiarla nel worker.
+    """
+    global _optimizer_worker, _matrice_worker, _segmenti_worker
+    _optimizer_worker = optimizer
+    _matrice_worker, _segmenti_worker = SharedDurationMatrix.collega(descrittore)
+
+
+def _ottimizza_cluster_worker(cluster: List[Studente]) -> List[Equipaggio]:
+    """Task eseguito nel worker: ottimizza un singolo cluster"""
+    assert _optimizer_worker is not None and _matrice_worker is not None
+    return _optimizer_worker.optimize_cluster(cluster, _matrice_worker)
 
 
 class OptimizationFacade:
@@ -12,28 +45,110 @@ class OptimizationFacade:
     API semplificata per l'orchestrator principale.
     """
 
-    def __init__(self, clustering: ClusteringStrategy, optimizer: OptimizationStrategy):
+    def __init__(
+        self,
+        clustering: ClusteringStrategy,
+        optimizer: OptimizationStrategy,
+        numero_worker: int = 1,
+        ordinatore_tappe: Optional[StopOrderSolver] = None,
+        ribilanciatore: Optional[CrossClusterRebalancer] = None,
+    ):
         self.clustering = clustering
         self.optimizer = optimizer
+        self.numero_worker = numero_worker
+        self.ordinatore_tappe = ordinatore_tappe
+        self.ribilanciatore = ribilanciatore
 
     def optimize_full(
-        self, studenti: List[Studente], percorsi: Dict[str, Percorso]
+        self, studenti: List[Studente], matrice: DurationMatrix
     ) -> List[Equipaggio]:
         """
         Pipeline completo: clustering + ottimizzazione multi-cluster.
+        I cluster sono indipendenti: con numero_worker > 1 vengono
+        distribuiti su un process pool.
         """
         # 1. Clustering geografico
         clusters = self.clustering.cluster_studenti(studenti)
         print(f"Creati {len(clusters)} cluster")
 
         # 2. Ottimizzazione per cluster
-        flotta = []
+        if self.numero_worker > 1 and len(clusters) > 1:
+            risultati = self._ottimizza_parallelo(clusters, matrice)
+        else:
+            risultati = self._ottimizza_sequenziale(clusters, matrice)
+
+        # 3. Fusione di auto non piene ai confini tra cluster
+        if self.ribilanciatore is not None:
+            flotta = self.ribilanciatore.ribilancia(risultati, matrice)
+        else:
+            flotta = [equipaggio for equipaggi in risultati for equipaggio in equipaggi]
+        self._rinumera_equipaggi(flotta)
+
+        # 4. Ordine ottimo delle tappe, condiviso tra i cluster
+        if self.ordinatore_tappe is not None:
+            self.ordinatore_tappe.ordina_flotta(flotta, matrice)
+            print(
+                f"Ordine tappe calcolato: {self.ordinatore_tappe.percorsi_risolti} "
+                f"percorsi distinti per {len(flotta)} auto"
+            )
+        return flotta
+
+    def _ottimizza_sequenziale(
+        self, clusters: List[List[Studente]], matrice: DurationMatrix
+    ) -> List[List[Equipaggio]]:
+        """Ottimizza i cluster uno dopo l'altro nel processo corrente"""
+        risultati = []
         for i, cluster in enumerate(clusters, 1):
             print(
                 f"Ottimizzazione cluster {i}/{len(clusters)} "
                 f"({len(cluster)} studenti)..."
             )
-            equipaggi = self.optimizer.optimize_cluster(cluster, percorsi)
-            flotta.extend(equipaggi)
+            risultati.append(self.optimizer.optimize_cluster(cluster, matrice))
+        return risultati
+
+    def _ottimizza_parallelo(
+        self, clusters: List[List[Studente]], matrice: DurationMatrix
+    ) -> List[List[Equipaggio]]:
+        """
+        Distribuisce i cluster sui worker, dal più grande al più piccolo
+        per bilanciare il carico. I risultati tornano nell'ordine dei cluster.
+        La matrice è pubblicata una volta in shared memory: aggiungere worker
+        non ne moltiplica la memoria residente.
+        """
+        numero_worker = min(self.numero_worker, len(clusters))
+        print(
+            f"Ottimizzazione parallela di {len(clusters)} cluster "
+            f"su {numero_worker} worker..."
+        )
 
-        return flotta
\ No newline at end of file
+        risultati: List[List[Equipaggio]] = [[] for _ in clusters]
+        ordine = sorted(range(len(clusters)), key=lambda i: -len(clusters[i]))
+
+        # Il padre possiede i segmenti: rilasciati dopo la chiusura del pool
+        with SharedDurationMatrix(matrice) as condivisa, ProcessPoolExecutor(
+            max_workers=numero_worker,
+            initializer=_inizializza_worker,
+            initargs=(self.optimizer, condivisa.descrittore),
+        ) as executor:
+            futures = {
+                executor.submit(_ottimizza_cluster_worker, clusters[i]): i
+                for i in ordine
+            }
+            for completati, future in enumerate(as_completed(futures), 1):
+                i = futures[future]
+                risultati[i] = future.result()
+                print(
+                    f"  Cluster {i + 1} completato ({len(clusters[i])} studenti) "
+                    f"[{completati}/{len(clusters)}]"
+                )
+
+        return risultati
+
+    @staticmethod
+    def _rinumera_equipaggi(flotta: List[Equipaggio]) -> None:
+        """
+        Assegna id progressivi sull'intera flotta, nell'ordine dei cluster.
+        Ogni cluster numera da 1: senza rinumerazione gli id si ripetono.
+        """
+        for equipaggio_id, equipaggio in enumerate(flotta, 1):
+            equipaggio.id = equipaggio_id
@@ -4,7 +4,7 @@ from src.data.repositories import CacheRepository
 from ..validators.data_validator import DataValidator
 from .optimization_facade import OptimizationFacade
 from src.data.models import Equipaggio
-from src.data.models import Percorso
+from src.data.models import DurationMatrix
 
 
 class OptimizeOrchestrator:
@@ -54,17 +54,14 @@ class OptimizeOrchestrator:
             s.coordinate = self.cache.coordinate_cache.get(s.localita)
 
         # Fase 3: Ottimizzazione
-        # Converti cache percorsi in dizionario per lookup veloce
-        percorsi_dict = self._build_percorsi_dict()
+        # Converti cache percorsi in matrice densa (costruita una sola volta)
+        matrice = self._build_duration_matrix()
 
-        flotta = self.optimization.optimize_full(studenti, percorsi_dict)
+        flotta = self.optimization.optimize_full(studenti, matrice)
 
         print(f"\n✓ Ottimizzazione completata: {len(flotta)} auto")
         return flotta
 
-    def _build_percorsi_dict(self) -> dict:
-        """Converte cache percorsi in dict per accesso O(1)"""
-        percorsi = {}
-        for key, data in self.cache.percorsi_cache.data.items():
-            percorsi[key] = Percorso.from_cache_dict(key, data)
-        return percorsi
+    def _build_duration_matrix(self) -> DurationMatrix:
+        """Converte cache percorsi in matrice indicizzata per id località"""
+        return self.cache.percorsi_cache.to_duration_matrix()
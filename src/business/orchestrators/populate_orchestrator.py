@@ -3,11 +3,14 @@ Orchestratore per modalità 'popola'.
 Coordina download dati da API esterne e popolamento cache.
 """
 
-from typing import List, Set
+from typing import Dict, List, Set
 from itertools import permutations
+import numpy as np
+from sklearn.neighbors import KDTree
 from src.data.repositories.studenti_repository import StudentiRepository
 from src.services.external_api_facade import ExternalAPIFacade
 from src.business.clustering.base import ClusteringStrategy
+from src.business.optimization.spatial_index import proietta_km, vicinati_localita
 from src.data.models.studente import Studente
 
 
@@ -22,12 +25,16 @@ class PopulateOrchestrator:
         api_facade: ExternalAPIFacade,
         clustering: ClusteringStrategy,
         comune_destinazione: str = "DALMINE",
+        k_localita_vicine: int = 0,
+        raggio_confine_km: float = 0.0,
     ):
         self.studenti_repo = studenti_repo
         self.api_facade = api_facade
         self.clustering = clustering
         self.cache = api_facade.cache
         self.destinazione = comune_destinazione
+        self.k_localita_vicine = k_localita_vicine
+        self.raggio_confine_km = raggio_confine_km  # Coppie tra cluster (0 = nessuna)
 
     def execute(self, batch_size: int = 1000):
         """
@@ -67,25 +74,89 @@ class PopulateOrchestrator:
 
         for loc in localita:
             coords = self.api_facade.get_coordinate_with_cache(loc)
+            geocodificati = []
             for s in studenti:
                 if s.localita == loc:
                     s.coordinate = coords
+                    geocodificati.append(s)
+            if coords:
+                # Strategie incrementali: centroidi aggiornati durante il caricamento
+                self.clustering.partial_fit(geocodificati)
 
     def _identifica_percorsi_necessari(self, studenti: List[Studente]) -> Set[tuple]:
         """
         Usa clustering per identificare solo i percorsi realmente necessari.
+        Con k_localita_vicine > 0 servono solo le coppie dentro i vicinati
+        usati dall'ottimizzatore: ogni località con le sue k più vicine,
+        quindi O(località * k²) percorsi anche con un unico cluster globale.
+        Con raggio_confine_km > 0 si aggiungono le coppie di confine tra
+        cluster, necessarie al ribilanciamento tra cluster.
         """
         clusters = self.clustering.cluster_studenti(studenti)
 
         percorsi_set = set()
         for cluster in clusters:
-            localita = {s.localita for s in cluster} | {self.destinazione}
-            # Tutte le coppie ordinate (permutazioni)
-            for loc_a, loc_b in permutations(localita, 2):
-                percorsi_set.add((loc_a, loc_b))
+            for gruppo in self._gruppi_localita(cluster):
+                localita = gruppo | {self.destinazione}
+                # Tutte le coppie ordinate (permutazioni)
+                for loc_a, loc_b in permutations(localita, 2):
+                    percorsi_set.add((loc_a, loc_b))
+
+        if self.raggio_confine_km > 0:
+            percorsi_set |= self._coppie_di_confine(clusters)
 
         return percorsi_set
 
+    def _gruppi_localita(self, cluster: List[Studente]) -> List[Set[str]]:
+        """
+        Intero cluster, oppure il vicinato di ogni sua località: se stessa
+        e le k più vicine, gli stessi insiemi in cui il greedy cerca i
+        passeggeri di un autista.
+        """
+        coordinate = {s.localita: s.coordinate for s in cluster}
+        localita = sorted(coordinate)
+        if self.k_localita_vicine <= 0 or len(localita) <= self.k_localita_vicine + 1:
+            return [set(localita)]
+
+        vicinati = vicinati_localita(
+            localita,
+            np.array([coordinate[loc] for loc in localita]),
+            self.k_localita_vicine + 1,
+        )
+        return [set(vicine) for vicine in vicinati.values()]
+
+    def _coppie_di_confine(self, clusters: List[List[Studente]]) -> Set[tuple]:
+        """
+        Coppie ordinate di località di cluster diversi entro
+        raggio_confine_km in linea d'aria: le durate con cui il
+        ribilanciamento valuta le fusioni tra auto ai due lati di un bordo.
+        """
+        cluster_di: Dict[str, Set[int]] = {}
+        coordinate = {}
+        for i, cluster in enumerate(clusters):
+            for s in cluster:
+                cluster_di.setdefault(s.localita, set()).add(i)
+                coordinate[s.localita] = s.coordinate
+        localita = sorted(coordinate)
+        if len(localita) < 2:
+            return set()
+
+        punti = proietta_km(np.array([coordinate[loc] for loc in localita]))
+        vicini = KDTree(punti).query_radius(punti, r=self.raggio_confine_km)
+
+        coppie = set()
+        for i, indici in enumerate(vicini):
+            loc_a = localita[i]
+            for j in indici:
+                if j == i:
+                    continue  # Nessun percorso da una località a se stessa
+                loc_b = localita[j]
+                # Entrambe nello stesso unico cluster: coppia già interna
+                if len(cluster_di[loc_a] | cluster_di[loc_b]) > 1:
+                    coppie.add((loc_a, loc_b))
+        print(f"Coppie di confine tra cluster: {len(coppie)}")
+        return coppie
+
     def _download_percorsi_batch(self, percorsi: Set[tuple], batch_size: int):
         """
         Download percorsi in batch con salvataggio incrementale.
@@ -140,11 +140,36 @@ class AppConfig:
     bonus_corso_laurea: int = 180  # secondi (3 minuti)
     max_deviazione_sec: int = 900  # 15 minuti
     numero_cluster: int = 7
+    strategia_clustering: str = "kmeans"  # kmeans, minibatch, kmedoids, auto, sweep, globale
+    numero_cluster_max: int = 0  # "auto": k candidati da numero_cluster a questo
+    tolleranza_flotta_auto: float = 0.02  # "auto": flotta ammessa oltre la migliore
+    k_localita_vicine: int = 0  # Ricerca passeggeri sulle k località più vicine (0 = tutte)
+    max_studenti_cluster: int = 0  # Oltre si suddivide il cluster (0 = nessun limite)
+    max_localita_cluster: int = 0  # Oltre si suddivide il cluster (0 = nessun limite)
+    max_spostamento_bilanciamento_km: float = 0.0  # Bilanciamento dimensioni (0 = off)
+    cella_aggregazione_km: float = 0.0  # Celle di pre-aggregazione (0 = off)
+    usa_cache_clustering: bool = True  # Cluster salvati in data/cache e riusati
     comune_destinazione: str = "DALMINE"
+    strategia_ottimizzazione: str = "greedy"  # greedy, savings, regret, grasp, annealing
+    k_regret: int = 3  # Alternative confrontate dalla strategia "regret"
+    soglia_ottimo_esatto: int = 0  # Max studenti per la ricerca esatta (0 = off)
+    tempo_ottimo_esatto_sec: float = 5.0  # Budget ricerca esatta per cluster
+    iterazioni_grasp: int = 50  # Costruzioni randomizzate per cluster
+    tempo_grasp_sec: float = 0.0  # Budget GRASP per cluster (0 = solo iterazioni)
+    seed_grasp: int = 42  # Seme principale: risultati riproducibili
+    numero_worker_grasp: int = 1  # Processi per le iterazioni GRASP
+    isole_annealing: int = 4  # Isole indipendenti di simulated annealing
+    epoche_annealing: int = 10  # Epoche, con migrazione tra isole dopo ognuna
+    mosse_epoca_annealing: int = 20000  # Mosse tentate per isola e epoca
+    seed_annealing: int = 42  # Seme principale: risultati riproducibili
+    numero_worker_annealing: int = 1  # Processi per le isole
 
     # === PROCESSING ===
     batch_size_chiamate: int = 100
     jitter_factor: float = 0.0003  # ~30 metri
+    numero_worker: int = 1  # Processi per ottimizzare i cluster (1 = sequenziale)
+    tempo_local_search_sec: float = 0.0  # Budget ricerca locale per cluster (0 = off)
+    velocita_ribilanciamento_kmh: float = 0.0  # Raggio fusioni tra cluster (0 = off)
 
     # === LOGGING ===
     log_level: str = "INFO"
@@ -183,9 +208,54 @@ class AppConfig:
             bonus_corso_laurea=int(config_from_file.get("bonus_corso_laurea", 180)),
             max_deviazione_sec=int(config_from_file.get("max_deviazione_sec", 900)),
             numero_cluster=int(config_from_file.get("numero_cluster", 7)),
+            strategia_clustering=config_from_file.get("strategia_clustering", "kmeans"),
+            numero_cluster_max=int(config_from_file.get("numero_cluster_max", 0)),
+            tolleranza_flotta_auto=float(
+                config_from_file.get("tolleranza_flotta_auto", 0.02)
+            ),
+            k_localita_vicine=int(config_from_file.get("k_localita_vicine", 0)),
+            max_studenti_cluster=int(config_from_file.get("max_studenti_cluster", 0)),
+            max_localita_cluster=int(config_from_file.get("max_localita_cluster", 0)),
+            max_spostamento_bilanciamento_km=float(
+                config_from_file.get("max_spostamento_bilanciamento_km", 0.0)
+            ),
+            cella_aggregazione_km=float(
+                config_from_file.get("cella_aggregazione_km", 0.0)
+            ),
+            usa_cache_clustering=bool(
+                config_from_file.get("usa_cache_clustering", True)
+            ),
             comune_destinazione=config_from_file.get("comune_destinazione", "DALMINE"),
+            strategia_ottimizzazione=config_from_file.get(
+                "strategia_ottimizzazione", "greedy"
+            ),
+            k_regret=int(config_from_file.get("k_regret", 3)),
+            soglia_ottimo_esatto=int(config_from_file.get("soglia_ottimo_esatto", 0)),
+            tempo_ottimo_esatto_sec=float(
+                config_from_file.get("tempo_ottimo_esatto_sec", 5.0)
+            ),
+            iterazioni_grasp=int(config_from_file.get("iterazioni_grasp", 50)),
+            tempo_grasp_sec=float(config_from_file.get("tempo_grasp_sec", 0.0)),
+            seed_grasp=int(config_from_file.get("seed_grasp", 42)),
+            numero_worker_grasp=int(config_from_file.get("numero_worker_grasp", 1)),
+            isole_annealing=int(config_from_file.get("isole_annealing", 4)),
+            epoche_annealing=int(config_from_file.get("epoche_annealing", 10)),
+            mosse_epoca_annealing=int(
+                config_from_file.get("mosse_epoca_annealing", 20000)
+            ),
+            seed_annealing=int(config_from_file.get("seed_annealing", 42)),
+            numero_worker_annealing=int(
+                config_from_file.get("numero_worker_annealing", 1)
+            ),
             batch_size_chiamate=int(config_from_file.get("batch_size_chiamate", 100)),
             jitter_factor=float(config_from_file.get("jitter_factor", 0.0003)),
+            numero_worker=int(config_from_file.get("numero_worker", 1)),
+            tempo_local_search_sec=float(
+                config_from_file.get("tempo_local_search_sec", 0.0)
+            ),
+            velocita_ribilanciamento_kmh=float(
+                config_from_file.get("velocita_ribilanciamento_kmh", 0.0)
+            ),
             log_level=config_from_file.get("log_level", "INFO"),
             environment=config_from_file.get("environment", "development"),
         )
@@ -199,9 +269,34 @@ class AppConfig:
             "bonus_corso_laurea": self.bonus_corso_laurea,
             "max_deviazione_sec": self.max_deviazione_sec,
             "numero_cluster": self.numero_cluster,
+            "strategia_clustering": self.strategia_clustering,
+            "numero_cluster_max": self.numero_cluster_max,
+            "tolleranza_flotta_auto": self.tolleranza_flotta_auto,
+            "k_localita_vicine": self.k_localita_vicine,
+            "max_studenti_cluster": self.max_studenti_cluster,
+            "max_localita_cluster": self.max_localita_cluster,
+            "max_spostamento_bilanciamento_km": self.max_spostamento_bilanciamento_km,
+            "cella_aggregazione_km": self.cella_aggregazione_km,
+            "usa_cache_clustering": self.usa_cache_clustering,
             "comune_destinazione": self.comune_destinazione,
+            "strategia_ottimizzazione": self.strategia_ottimizzazione,
+            "k_regret": self.k_regret,
+            "soglia_ottimo_esatto": self.soglia_ottimo_esatto,
+            "tempo_ottimo_esatto_sec": self.tempo_ottimo_esatto_sec,
+            "iterazioni_grasp": self.iterazioni_grasp,
+            "tempo_grasp_sec": self.tempo_grasp_sec,
+            "seed_grasp": self.seed_grasp,
+            "numero_worker_grasp": self.numero_worker_grasp,
+            "isole_annealing": self.isole_annealing,
+            "epoche_annealing": self.epoche_annealing,
+            "mosse_epoca_annealing": self.mosse_epoca_annealing,
+            "seed_annealing": self.seed_annealing,
+            "numero_worker_annealing": self.numero_worker_annealing,
             "batch_size_chiamate": self.batch_size_chiamate,
             "jitter_factor": self.jitter_factor,
+            "numero_worker": self.numero_worker,
+            "tempo_local_search_sec": self.tempo_local_search_sec,
+            "velocita_ribilanciamento_kmh": self.velocita_ribilanciamento_kmh,
             "log_level": self.log_level,
             "environment": self.environment,
         }
@@ -212,6 +307,22 @@ class AppConfig:
         print(f"Ambiente:              {self.environment}")
         print(f"Capacità auto:         {self.capacita_macchina} persone")
         print(f"Numero cluster:        {self.numero_cluster}")
+        print(f"Clustering:            {self.strategia_clustering}")
+        if self.strategia_clustering == "auto":
+            print(
+                f"Cluster candidati:     "
+                f"{self.numero_cluster}-{self.numero_cluster_max} "
+                f"(tolleranza flotta {self.tolleranza_flotta_auto:.0%})"
+            )
+        print(f"Località vicine:       {self.k_localita_vicine or 'tutte'}")
+        print(
+            f"Max per cluster:       {self.max_studenti_cluster or '-'} studenti, "
+            f"{self.max_localita_cluster or '-'} località"
+        )
+        bilanciamento = self.max_spostamento_bilanciamento_km or "off"
+        print(f"Bilanciamento:         {bilanciamento} km")
+        print(f"Celle aggregazione:    {self.cella_aggregazione_km or 'off'} km")
+        print(f"Cache clustering:      {'sì' if self.usa_cache_clustering else 'no'}")
         print(
             f"Bonus corso laurea:    {self.bonus_corso_laurea} sec ({self.bonus_corso_laurea / 60:.1f} min)"
         )
@@ -219,6 +330,27 @@ class AppConfig:
             f"Max deviazione:        {self.max_deviazione_sec} sec ({self.max_deviazione_sec / 60:.1f} min)"
         )
         print(f"Destinazione:          {self.comune_destinazione}")
+        print(f"Strategia:             {self.strategia_ottimizzazione}")
+        if self.strategia_ottimizzazione == "regret":
+            print(f"Regret:                k = {self.k_regret}")
+        if self.strategia_ottimizzazione == "grasp":
+            print(
+                f"GRASP:                 {self.iterazioni_grasp} iterazioni, "
+                f"seed {self.seed_grasp}, {self.numero_worker_grasp} worker"
+            )
+        if self.strategia_ottimizzazione == "annealing":
+            print(
+                f"Annealing:             {self.isole_annealing} isole x "
+                f"{self.epoche_annealing} epoche x {self.mosse_epoca_annealing} mosse, "
+                f"seed {self.seed_annealing}, {self.numero_worker_annealing} worker"
+            )
+        print(
+            f"Ottimo esatto:         fino a {self.soglia_ottimo_esatto} studenti "
+            f"({self.tempo_ottimo_esatto_sec} sec/cluster)"
+        )
         print(f"Batch size API:        {self.batch_size_chiamate}")
+        print(f"Worker ottimizzazione: {self.numero_worker}")
+        print(f"Local search:          {self.tempo_local_search_sec} sec/cluster")
+        print(f"Ribilanciamento:       {self.velocita_ribilanciamento_kmh} km/h")
         print(f"Log level:             {self.log_level}")
         print()
\ No newline at end of file
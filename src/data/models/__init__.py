@@ -1,5 +1,14 @@
 from .studente import Studente
 from .equipaggio import Equipaggio
 from .percorso import Percorso
+from .duration_matrix import DurationMatrix
+from .shared_duration_matrix import SharedDurationMatrix, SharedMatrixDescriptor
 
-__all__ = ["Studente", "Equipaggio", "Percorso"]
+__all__ = [
+    "Studente",
+    "Equipaggio",
+    "Percorso",
+    "DurationMatrix",
+    "SharedDurationMatrix",
+    "SharedMatrixDescriptor",
+]
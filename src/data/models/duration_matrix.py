@@ -0,0 +1,94 @@
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional
+import numpy as np
+
+
+@dataclass
+class DurationMatrix:
+    """
+    Matrice densa di durate e distanze tra località.
+    Ogni località è internata in un id intero: i lookup diventano
+    indicizzazioni di array NumPy invece di chiavi stringa "A-B".
+    """
+
+    localita: List[str]  # Id intero -> chiave località
+    durate: np.ndarray  # durate[i, j] in secondi, NaN se percorso mancante
+    distanze: np.ndarray  # distanze[i, j] in metri, NaN se percorso mancante
+    indici: Dict[str, int] = field(init=False, repr=False)  # Chiave -> id intero
+
+    def __post_init__(self) -> None:
+        """Costruisce l'indice inverso località -> id"""
+        self.indici = {loc: i for i, loc in enumerate(self.localita)}
+
+    @property
+    def n_localita(self) -> int:
+        """Numero di località internate"""
+        return len(self.localita)
+
+    def indice(self, localita_key: str) -> Optional[int]:
+        """Id intero della località (None se sconosciuta)"""
+        return self.indici.get(localita_key)
+
+    def indici_di(self, localita_keys: Iterable[str]) -> np.ndarray:
+        """Vettore di id per più località (-1 per quelle sconosciute)"""
+        return np.array(
+            [self.indici.get(loc, -1) for loc in localita_keys], dtype=np.intp
+        )
+
+    def durata(self, partenza: str, destinazione: str) -> float:
+        """Durata in secondi tra due località (NaN se non disponibile)"""
+        i = self.indici.get(partenza)
+        j = self.indici.get(destinazione)
+        if i is None or j is None:
+            return float("nan") if partenza != destinazione else 0.0
+        return float(self.durate[i, j])
+
+    def distanza(self, partenza: str, destinazione: str) -> float:
+        """Distanza in metri tra due località (NaN se non disponibile)"""
+        i = self.indici.get(partenza)
+        j = self.indici.get(destinazione)
+        if i is None or j is None:
+            return float("nan") if partenza != destinazione else 0.0
+        return float(self.distanze[i, j])
+
+    def sottomatrice_durate(self, localita_keys: List[str]) -> np.ndarray:
+        """
+        Estrae la sotto-matrice delle durate per un elenco di località.
+        Le località sconosciute producono righe/colonne NaN; la diagonale è 0.
+        """
+        idx = self.indici_di(localita_keys)
+        noti = np.flatnonzero(idx >= 0)
+
+        sotto = np.full((len(idx), len(idx)), np.nan)
+        sotto[np.ix_(noti, noti)] = self.durate[np.ix_(idx[noti], idx[noti])]
+        np.fill_diagonal(sotto, 0.0)
+        return sotto
+
+    @classmethod
+    def from_cache_dict(cls, data: Dict[str, dict]) -> "DurationMatrix":
+        """
+        Factory method per creare la matrice dal formato cache JSON.
+        Chiavi formato: "PARTENZA-DESTINAZIONE"
+        """
+        voci = []
+        indici: Dict[str, int] = {}
+        for key, valori in data.items():
+            durata = valori.get("durata_sec")
+            if durata is None:
+                continue
+            partenza, destinazione = key.split("-")
+            i = indici.setdefault(partenza, len(indici))
+            j = indici.setdefault(destinazione, len(indici))
+            voci.append((i, j, durata, valori.get("distanza_m")))
+
+        n = len(indici)
+        durate = np.full((n, n), np.nan)
+        distanze = np.full((n, n), np.nan)
+        np.fill_diagonal(durate, 0.0)
+        np.fill_diagonal(distanze, 0.0)
+
+        for i, j, durata, distanza in voci:
+            durate[i, j] = durata
+            distanze[i, j] = np.nan if distanza is None else distanza
+
+        return cls(localita=list(indici), durate=durate, distanze=distanze)
@@ -1,5 +1,5 @@
 from dataclasses import dataclass, field
-from typing import List
+from typing import List, Optional
 from .studente import Studente
 
 
@@ -11,6 +11,7 @@ class Equipaggio:
     autista: Studente  # Primo della lista, più lontano
     passeggeri: List[Studente]  # Passeggeri caricati
     percorso_tappe: List[str] = field(default_factory=list)  # Ordine località
+    durata_percorso_sec: Optional[float] = None  # Durata totale del percorso
 
     @property
     def membri(self) -> List[Studente]:
@@ -0,0 +1,88 @@
+from dataclasses import dataclass
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, List, Tuple
+import numpy as np
+from .duration_matrix import DurationMatrix
+
+
+@dataclass(frozen=True)
+class SharedMatrixDescriptor:
+    """
+    Descrittore picklabile di una DurationMatrix in shared memory.
+    Viaggia verso i worker al posto degli array.
+    """
+
+    localita: Tuple[str, ...]  # Id intero -> chiave località
+    nome_durate: str  # Nome segmento shared memory delle durate
+    nome_distanze: str  # Nome segmento shared memory delle distanze
+
+
+class SharedDurationMatrix:
+    """
+    Pubblica una DurationMatrix in shared memory per i processi worker.
+    Il processo padre possiede i segmenti e li rilascia alla chiusura;
+    i worker si collegano in sola lettura senza copiare i dati.
+    """
+
+    def __init__(self, matrice: DurationMatrix):
+        self._segmenti: List[SharedMemory] = []
+        try:
+            nome_durate = self._pubblica(matrice.durate)
+            nome_distanze = self._pubblica(matrice.distanze)
+        except Exception:
+            self.close()
+            raise
+
+        self.descrittore = SharedMatrixDescriptor(
+            localita=tuple(matrice.localita),
+            nome_durate=nome_durate,
+            nome_distanze=nome_distanze,
+        )
+
+    def _pubblica(self, array: np.ndarray) -> str:
+        """Copia un array float64 in un nuovo segmento e ne restituisce il nome"""
+        # Un segmento non può avere dimensione 0 (matrice vuota)
+        segmento = SharedMemory(create=True, size=max(array.nbytes, 1))
+        self._segmenti.append(segmento)
+
+        vista = np.ndarray(array.shape, dtype=np.float64, buffer=segmento.buf)
+        vista[...] = array
+        return segmento.name
+
+    def close(self) -> None:
+        """Chiude e rimuove i segmenti (idempotente)"""
+        while self._segmenti:
+            segmento = self._segmenti.pop()
+            segmento.close()
+            segmento.unlink()
+
+    def __enter__(self) -> "SharedDurationMatrix":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    @staticmethod
+    def collega(
+        descrittore: SharedMatrixDescriptor,
+    ) -> Tuple[DurationMatrix, List[SharedMemory]]:
+        """
+        Lato worker: ricostruisce la matrice come vista read-only sui segmenti.
+        I segmenti restituiti vanno tenuti vivi finché si usa la matrice.
+        """
+        n = len(descrittore.localita)
+        segmenti = [
+            SharedMemory(name=descrittore.nome_durate),
+            SharedMemory(name=descrittore.nome_distanze),
+        ]
+
+        viste = []
+        for segmento in segmenti:
+            vista = np.ndarray((n, n), dtype=np.float64, buffer=segmento.buf)
+            vista.flags.writeable = False
+            viste.append(vista)
+
+        matrice = DurationMatrix(
+            localita=list(descrittore.localita), durate=viste[0], distanze=viste[1]
+        )
+        return matrice, segmenti
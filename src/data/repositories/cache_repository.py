@@ -1,26 +1,32 @@
 from pathlib import Path
 import json
-from typing import Optional, Dict, Tuple
-from ..models import Percorso
+from typing import List, Optional, Dict, Tuple
+from ..models import Percorso, DurationMatrix
 
 
 class CacheRepository:
     """
     Repository principale per gestione cache.
-    Coordina CoordinateCache e PercorsiCache.
+    Coordina CoordinateCache, PercorsiCache, ClusteringCache e CentroidiCache.
     """
 
     def __init__(self, cache_dir: Path):
         coord_file = cache_dir / "cache_coordinate.json"
         percorsi_file = cache_dir / "cache_percorsi.json"
+        clustering_file = cache_dir / "cache_clustering.json"
+        centroidi_file = cache_dir / "cache_centroidi.json"
 
         self.coordinate_cache = CoordinateCache(coord_file)
         self.percorsi_cache = PercorsiCache(percorsi_file)
+        self.clustering_cache = ClusteringCache(clustering_file)
+        self.centroidi_cache = CentroidiCache(centroidi_file)
 
     def save_all(self):
-        """Salva entrambe le cache su disco"""
+        """Salva tutte le cache su disco"""
         self.coordinate_cache.save()
         self.percorsi_cache.save()
+        self.clustering_cache.save()
+        self.centroidi_cache.save()
         print("Cache salvate su disco")
 
 
@@ -110,3 +116,78 @@ class PercorsiCache:
         """Verifica se percorso è in cache E ha la geometria completa"""
         key = f"{partenza}-{destinazione}"
         return key in self.data and "geometria" in self.data[key]
+
+    def to_duration_matrix(self) -> DurationMatrix:
+        """Converte l'intera cache in matrice densa per l'ottimizzazione"""
+        return DurationMatrix.from_cache_dict(self.data)
+
+
+class ClusteringCache:
+    """
+    Cache delle assegnazioni ai cluster, condivisa da popola e ottimizza.
+    Struttura: {"CHIAVE": {"LOCALITA": [cluster di ogni studente]}}
+    La chiave è un hash degli input del clustering: se cambiano, la voce
+    vecchia non viene più trovata. Si tengono solo le ultime MAX_VOCI.
+    """
+
+    MAX_VOCI = 20
+
+    def __init__(self, file_path: Path):
+        self.file_path = file_path
+        self.data: Dict[str, Dict[str, List[int]]] = self._load()
+
+    def _load(self) -> Dict[str, Dict[str, List[int]]]:
+        if self.file_path.exists():
+            with open(self.file_path, "r", encoding="utf-8") as f:
+                data: Dict[str, Dict[str, List[int]]] = json.load(f)
+                return data
+        return {}
+
+    def save(self) -> None:
+        self.file_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.file_path, "w", encoding="utf-8") as f:
+            json.dump(self.data, f, ensure_ascii=False)
+
+    def get(self, chiave: str) -> Optional[Dict[str, List[int]]]:
+        """Assegnazioni per località, o None se la chiave non è in cache"""
+        return self.data.get(chiave)
+
+    def set(self, chiave: str, assegnazioni: Dict[str, List[int]]) -> None:
+        """Salva le assegnazioni come voce più recente"""
+        self.data.pop(chiave, None)
+        self.data[chiave] = assegnazioni
+        while len(self.data) > self.MAX_VOCI:
+            del self.data[next(iter(self.data))]
+
+
+class CentroidiCache:
+    """
+    Centroidi dell'ultimo clustering, per ripartire da lì (warm start).
+    Struttura: {"CHIAVE": [[lat, lon], ...]}
+    """
+
+    def __init__(self, file_path: Path):
+        self.file_path = file_path
+        self.data: Dict[str, List[List[float]]] = self._load()
+
+    def _load(self) -> Dict[str, List[List[float]]]:
+        if self.file_path.exists():
+            with open(self.file_path, "r", encoding="utf-8") as f:
+                data: Dict[str, List[List[float]]] = json.load(f)
+                return data
+        return {}
+
+    def save(self) -> None:
+        self.file_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.file_path, "w", encoding="utf-8") as f:
+            json.dump(self.data, f, ensure_ascii=False)
+
+    def get(self, chiave: str) -> Optional[List[Tuple[float, float]]]:
+        """Centroidi salvati, o None"""
+        centroidi = self.data.get(chiave)
+        if centroidi is None:
+            return None
+        return [(lat, lon) for lat, lon in centroidi]
+
+    def set(self, chiave: str, centroidi: List[Tuple[float, float]]) -> None:
+        self.data[chiave] = [list(c) for c in centroidi]
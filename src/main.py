@@ -1,10 +1,37 @@
 import sys
 import traceback
 import time
+from functools import partial
+from typing import Optional
 
 from data.repositories import ConfigRepository, CacheRepository, StudentiRepository
-from business.clustering import KMeansClusteringService
-from business.optimization import GreedyOptimizer
+from business.clustering import (
+    AutoKClustering,
+    CachedClusteringStrategy,
+    CapacityBalancedClustering,
+    ClusteringStrategy,
+    GlobalClustering,
+    GridAggregationClustering,
+    KMeansClusteringService,
+    KMedoidsClusteringService,
+    MiniBatchKMeansClusteringService,
+    RecursiveSplittingClustering,
+    SweepClustering,
+)
+from business.optimization import (
+    AnnealingOptimizer,
+    CrossClusterRebalancer,
+    ExactOptimizer,
+    GraspOptimizer,
+    GreedyOptimizer,
+    ImprovedOptimizer,
+    LocalSearchImprover,
+    OptimizationStrategy,
+    ParametriAnnealing,
+    RegretOptimizer,
+    SavingsOptimizer,
+    StopOrderSolver,
+)
 from business.orchestrators import (
     OptimizationFacade,
     PopulateOrchestrator,
@@ -54,6 +81,226 @@ def initialize_layer2_services(app_config: AppConfig, config_repo, cache_repo):
     return api_facade
 
 
+def _cache_obbligatoria(
+    cache_repo: Optional[CacheRepository], strategia: str
+) -> CacheRepository:
+    """Il repository cache, senza il quale la strategia non ha i suoi dati"""
+    if cache_repo is None:
+        raise ValueError(
+            f"La strategia di clustering '{strategia}' richiede il repository cache"
+        )
+    return cache_repo
+
+
+def initialize_clustering(
+    app_config: AppConfig, cache_repo: Optional[CacheRepository] = None
+) -> ClusteringStrategy:
+    """
+    Crea la strategia di clustering scelta in configurazione
+
+    Args:
+        app_config: Configurazione applicazione
+        cache_repo: Repository cache, fonte delle durate per "kmedoids",
+            delle coordinate della destinazione per "auto" e "sweep", dei
+            centroidi per "minibatch" (con la cache dei cluster attiva) e
+            dei cluster salvati; obbligatorio per "kmedoids", "auto" e "sweep"
+
+    Returns:
+        ClusteringStrategy: KMeans (k fisso o scelto in automatico),
+        MiniBatchKMeans a caldo, k-medoids sui tempi stradali, settori
+        angolari attorno alla destinazione o cluster unico globale, con
+        suddivisione dei cluster troppo grandi e bilanciamento delle
+        dimensioni se configurati, su celle di griglia se richiesto;
+        risultato riusato dalla cache se abilitata
+    """
+    if app_config.strategia_clustering == "kmeans":
+        clustering = KMeansClusteringService(n_clusters=app_config.numero_cluster)
+    elif app_config.strategia_clustering == "minibatch":
+        # Centroidi a caldo solo con la cache dei cluster: senza, popola li
+        # aggiornerebbe e ottimizza ripartirebbe da centroidi diversi
+        archivio = None
+        if app_config.usa_cache_clustering and cache_repo is not None:
+            archivio = cache_repo.centroidi_cache
+        clustering = MiniBatchKMeansClusteringService(
+            n_clusters=app_config.numero_cluster, archivio=archivio
+        )
+    elif app_config.strategia_clustering == "kmedoids":
+        clustering = KMedoidsClusteringService(
+            n_clusters=app_config.numero_cluster,
+            fornitore_matrice=_cache_obbligatoria(
+                cache_repo, "kmedoids"
+            ).percorsi_cache.to_duration_matrix,
+        )
+    elif app_config.strategia_clustering == "auto":
+        coordinate_cache = _cache_obbligatoria(cache_repo, "auto").coordinate_cache
+        clustering = AutoKClustering(
+            candidati_k=list(
+                range(
+                    app_config.numero_cluster,
+                    max(app_config.numero_cluster_max, app_config.numero_cluster) + 1,
+                )
+            ),
+            stimatore=GreedyOptimizer(
+                capacita_auto=app_config.capacita_macchina,
+                bonus_corso_laurea=app_config.bonus_corso_laurea,
+                max_deviazione_sec=app_config.max_deviazione_sec,
+                comune_destinazione=app_config.comune_destinazione,
+            ),
+            coordinate_destinazione=partial(
+                coordinate_cache.get, app_config.comune_destinazione
+            ),
+            comune_destinazione=app_config.comune_destinazione,
+            tolleranza_flotta=app_config.tolleranza_flotta_auto,
+            numero_worker=app_config.numero_worker,
+        )
+    elif app_config.strategia_clustering == "sweep":
+        coordinate_cache = _cache_obbligatoria(cache_repo, "sweep").coordinate_cache
+        clustering = SweepClustering(
+            n_clusters=app_config.numero_cluster,
+            coordinate_destinazione=partial(
+                coordinate_cache.get, app_config.comune_destinazione
+            ),
+            capacita_auto=app_config.capacita_macchina,
+            comune_destinazione=app_config.comune_destinazione,
+        )
+    elif app_config.strategia_clustering == "globale":
+        clustering = GlobalClustering()
+    else:
+        raise ValueError(
+            f"Strategia di clustering sconosciuta: {app_config.strategia_clustering}"
+        )
+
+    if app_config.max_studenti_cluster > 0 or app_config.max_localita_cluster > 0:
+        clustering = RecursiveSplittingClustering(
+            clustering,
+            max_studenti=app_config.max_studenti_cluster,
+            max_localita=app_config.max_localita_cluster,
+        )
+    if app_config.max_spostamento_bilanciamento_km > 0:
+        clustering = CapacityBalancedClustering(
+            clustering,
+            capacita_auto=app_config.capacita_macchina,
+            max_spostamento_km=app_config.max_spostamento_bilanciamento_km,
+        )
+    if app_config.cella_aggregazione_km > 0:
+        # Esterno agli altri stadi: suddivisione e bilanciamento vedono le celle
+        clustering = GridAggregationClustering(
+            clustering, cella_km=app_config.cella_aggregazione_km
+        )
+    if app_config.usa_cache_clustering and cache_repo is not None:
+        # Tutto ciò che può cambiare i cluster entra nella chiave della cache
+        parametri = {
+            nome: getattr(app_config, nome)
+            for nome in (
+                "strategia_clustering",
+                "numero_cluster",
+                "numero_cluster_max",
+                "tolleranza_flotta_auto",
+                "max_studenti_cluster",
+                "max_localita_cluster",
+                "max_spostamento_bilanciamento_km",
+                "cella_aggregazione_km",
+                "capacita_macchina",
+                "bonus_corso_laurea",
+                "max_deviazione_sec",
+                "comune_destinazione",
+            )
+        }
+        clustering = CachedClusteringStrategy(
+            clustering, cache_repo.clustering_cache, parametri
+        )
+    return clustering
+
+
+def initialize_optimizer(app_config: AppConfig) -> OptimizationStrategy:
+    """
+    Crea la strategia di ottimizzazione scelta in configurazione
+
+    Args:
+        app_config: Configurazione applicazione
+
+    Returns:
+        OptimizationStrategy: Optimizer, eventualmente con ricerca esatta e locale
+    """
+
+    if app_config.strategia_ottimizzazione in ("greedy", "grasp", "annealing"):
+        optimizer = GreedyOptimizer(
+            capacita_auto=app_config.capacita_macchina,
+            bonus_corso_laurea=app_config.bonus_corso_laurea,
+            max_deviazione_sec=app_config.max_deviazione_sec,
+            comune_destinazione=app_config.comune_destinazione,
+            k_localita_vicine=app_config.k_localita_vicine,
+        )
+        if app_config.strategia_ottimizzazione == "grasp":
+            optimizer = GraspOptimizer(
+                optimizer,
+                iterazioni=app_config.iterazioni_grasp,
+                tempo_limite_sec=app_config.tempo_grasp_sec,
+                seed=app_config.seed_grasp,
+                numero_worker=app_config.numero_worker_grasp,
+            )
+        elif app_config.strategia_ottimizzazione == "annealing":
+            optimizer = AnnealingOptimizer(
+                optimizer,
+                capacita_auto=app_config.capacita_macchina,
+                max_deviazione_sec=app_config.max_deviazione_sec,
+                parametri=ParametriAnnealing(
+                    isole=app_config.isole_annealing,
+                    epoche=app_config.epoche_annealing,
+                    mosse_per_epoca=app_config.mosse_epoca_annealing,
+                    seed=app_config.seed_annealing,
+                    numero_worker=app_config.numero_worker_annealing,
+                ),
+                comune_destinazione=app_config.comune_destinazione,
+            )
+    elif app_config.strategia_ottimizzazione == "savings":
+        optimizer = SavingsOptimizer(
+            capacita_auto=app_config.capacita_macchina,
+            max_deviazione_sec=app_config.max_deviazione_sec,
+            comune_destinazione=app_config.comune_destinazione,
+        )
+    elif app_config.strategia_ottimizzazione == "regret":
+        optimizer = RegretOptimizer(
+            capacita_auto=app_config.capacita_macchina,
+            bonus_corso_laurea=app_config.bonus_corso_laurea,
+            max_deviazione_sec=app_config.max_deviazione_sec,
+            k_regret=app_config.k_regret,
+            comune_destinazione=app_config.comune_destinazione,
+        )
+    else:
+        raise ValueError(
+            f"Strategia di ottimizzazione sconosciuta: "
+            f"{app_config.strategia_ottimizzazione}"
+        )
+
+    # Ricerca esatta sui cluster piccoli, con la strategia scelta come fallback
+    if app_config.soglia_ottimo_esatto > 0:
+        optimizer = ExactOptimizer(
+            capacita_auto=app_config.capacita_macchina,
+            max_deviazione_sec=app_config.max_deviazione_sec,
+            fallback=optimizer,
+            soglia_studenti=app_config.soglia_ottimo_esatto,
+            tempo_limite_sec=app_config.tempo_ottimo_esatto_sec,
+            comune_destinazione=app_config.comune_destinazione,
+        )
+
+    # Ricerca locale opzionale dopo la formazione degli equipaggi
+    if app_config.tempo_local_search_sec > 0:
+        optimizer = ImprovedOptimizer(
+            optimizer,
+            [
+                LocalSearchImprover(
+                    capacita_auto=app_config.capacita_macchina,
+                    max_deviazione_sec=app_config.max_deviazione_sec,
+                    tempo_limite_sec=app_config.tempo_local_search_sec,
+                    comune_destinazione=app_config.comune_destinazione,
+                )
+            ],
+        )
+
+    return optimizer
+
+
 def initialize_layer3_business(
     app_config: AppConfig, studenti_repo, cache_repo, api_facade
 ):
@@ -71,21 +318,40 @@ def initialize_layer3_business(
     """
 
     # Componenti algoritmici
-    clustering = KMeansClusteringService(n_clusters=app_config.numero_cluster)
-
-    optimizer = GreedyOptimizer(
-        capacita_auto=app_config.capacita_macchina,
-        bonus_corso_laurea=app_config.bonus_corso_laurea,
-        max_deviazione_sec=app_config.max_deviazione_sec,
-        comune_destinazione=app_config.comune_destinazione,
-    )
+    clustering = initialize_clustering(app_config, cache_repo)
+
+    optimizer = initialize_optimizer(app_config)
+
+    # Ordine tappe condiviso: le fusioni tra cluster riusano i percorsi già risolti
+    ordinatore_tappe = StopOrderSolver(app_config.comune_destinazione)
+    ribilanciatore = None
+    if app_config.velocita_ribilanciamento_kmh > 0:
+        ribilanciatore = CrossClusterRebalancer(
+            capacita_auto=app_config.capacita_macchina,
+            max_deviazione_sec=app_config.max_deviazione_sec,
+            velocita_kmh=app_config.velocita_ribilanciamento_kmh,
+            comune_destinazione=app_config.comune_destinazione,
+            ordinatore=ordinatore_tappe,
+        )
 
     # Facade che coordina clustering + optimization
-    optimization_facade = OptimizationFacade(clustering, optimizer)
+    optimization_facade = OptimizationFacade(
+        clustering,
+        optimizer,
+        numero_worker=app_config.numero_worker,
+        ordinatore_tappe=ordinatore_tappe,
+        ribilanciatore=ribilanciatore,
+    )
 
     # Orchestratori per le due modalità
     populate_orch = PopulateOrchestrator(
-        studenti_repo, api_facade, clustering, app_config.comune_destinazione
+        studenti_repo,
+        api_facade,
+        clustering,
+        app_config.comune_destinazione,
+        k_localita_vicine=app_config.k_localita_vicine,
+        # Durate tra cluster diversi per le fusioni del ribilanciamento
+        raggio_confine_km=ribilanciatore.raggio_km if ribilanciatore else 0.0,
     )
 
     optimize_orch = OptimizeOrchestrator(
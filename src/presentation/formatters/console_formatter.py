@@ -37,6 +37,11 @@ class ConsoleFormatter:
                     f"  - {membro.email} | Da: {loc_display} | Corso: {membro.corso}"
                 )
 
+            if equipaggio.durata_percorso_sec is not None:
+                lines.append(
+                    f"  Durata percorso: {equipaggio.durata_percorso_sec / 60:.1f} min"
+                )
+
             lines.append("-" * len(header))
             lines.append("")
 
@@ -74,9 +74,34 @@ class TestAppConfig:
         assert cfg.bonus_corso_laurea == 180
         assert cfg.max_deviazione_sec == 900
         assert cfg.numero_cluster == 7
+        assert cfg.strategia_clustering == "kmeans"
+        assert cfg.numero_cluster_max == 0
+        assert cfg.tolleranza_flotta_auto == pytest.approx(0.02)
+        assert cfg.k_localita_vicine == 0
+        assert cfg.max_studenti_cluster == 0
+        assert cfg.max_localita_cluster == 0
+        assert cfg.max_spostamento_bilanciamento_km == pytest.approx(0.0)
+        assert cfg.cella_aggregazione_km == pytest.approx(0.0)
+        assert cfg.usa_cache_clustering is True
         assert cfg.comune_destinazione == "DALMINE"
+        assert cfg.strategia_ottimizzazione == "greedy"
+        assert cfg.k_regret == 3
+        assert cfg.soglia_ottimo_esatto == 0
+        assert cfg.tempo_ottimo_esatto_sec == pytest.approx(5.0)
+        assert cfg.iterazioni_grasp == 50
+        assert cfg.tempo_grasp_sec == pytest.approx(0.0)
+        assert cfg.seed_grasp == 42
+        assert cfg.numero_worker_grasp == 1
+        assert cfg.isole_annealing == 4
+        assert cfg.epoche_annealing == 10
+        assert cfg.mosse_epoca_annealing == 20000
+        assert cfg.seed_annealing == 42
+        assert cfg.numero_worker_annealing == 1
         assert cfg.batch_size_chiamate == 100
         assert cfg.jitter_factor == pytest.approx(0.0003)
+        assert cfg.numero_worker == 1
+        assert cfg.tempo_local_search_sec == pytest.approx(0.0)
+        assert cfg.velocita_ribilanciamento_kmh == pytest.approx(0.0)
         assert cfg.log_level == "INFO"
         assert cfg.environment == "development"
 
@@ -93,9 +118,34 @@ class TestAppConfig:
             "bonus_corso_laurea": 200,
             "max_deviazione_sec": 600,
             "numero_cluster": 5,
+            "strategia_clustering": "globale",
+            "numero_cluster_max": 12,
+            "tolleranza_flotta_auto": 0.05,
+            "k_localita_vicine": 15,
+            "max_studenti_cluster": 2000,
+            "max_localita_cluster": 150,
+            "max_spostamento_bilanciamento_km": 4.0,
+            "cella_aggregazione_km": 1.5,
+            "usa_cache_clustering": False,
             "comune_destinazione": "BERGAMO",
+            "strategia_ottimizzazione": "savings",
+            "k_regret": 2,
+            "soglia_ottimo_esatto": 30,
+            "tempo_ottimo_esatto_sec": 2.5,
+            "iterazioni_grasp": 200,
+            "tempo_grasp_sec": 3.0,
+            "seed_grasp": 7,
+            "numero_worker_grasp": 4,
+            "isole_annealing": 8,
+            "epoche_annealing": 20,
+            "mosse_epoca_annealing": 50000,
+            "seed_annealing": 11,
+            "numero_worker_annealing": 8,
             "batch_size_chiamate": 50,
             "jitter_factor": 0.001,
+            "numero_worker": 8,
+            "tempo_local_search_sec": 1.5,
+            "velocita_ribilanciamento_kmh": 40.0,
             "log_level": "DEBUG",
             "environment": "production",
         }
@@ -115,9 +165,34 @@ class TestAppConfig:
         assert cfg.bonus_corso_laurea == 200
         assert cfg.max_deviazione_sec == 600
         assert cfg.numero_cluster == 5
+        assert cfg.strategia_clustering == "globale"
+        assert cfg.numero_cluster_max == 12
+        assert cfg.tolleranza_flotta_auto == pytest.approx(0.05)
+        assert cfg.k_localita_vicine == 15
+        assert cfg.max_studenti_cluster == 2000
+        assert cfg.max_localita_cluster == 150
+        assert cfg.max_spostamento_bilanciamento_km == pytest.approx(4.0)
+        assert cfg.cella_aggregazione_km == pytest.approx(1.5)
+        assert cfg.usa_cache_clustering is False
         assert cfg.comune_destinazione == "BERGAMO"
+        assert cfg.strategia_ottimizzazione == "savings"
+        assert cfg.k_regret == 2
+        assert cfg.soglia_ottimo_esatto == 30
+        assert cfg.tempo_ottimo_esatto_sec == pytest.approx(2.5)
+        assert cfg.iterazioni_grasp == 200
+        assert cfg.tempo_grasp_sec == pytest.approx(3.0)
+        assert cfg.seed_grasp == 7
+        assert cfg.numero_worker_grasp == 4
+        assert cfg.isole_annealing == 8
+        assert cfg.epoche_annealing == 20
+        assert cfg.mosse_epoca_annealing == 50000
+        assert cfg.seed_annealing == 11
+        assert cfg.numero_worker_annealing == 8
         assert cfg.batch_size_chiamate == 50
         assert cfg.jitter_factor == pytest.approx(0.001)
+        assert cfg.numero_worker == 8
+        assert cfg.tempo_local_search_sec == pytest.approx(1.5)
+        assert cfg.velocita_ribilanciamento_kmh == pytest.approx(40.0)
         assert cfg.log_level == "DEBUG"
         assert cfg.environment == "production"
 
@@ -129,9 +204,34 @@ class TestAppConfig:
             bonus_corso_laurea=180,
             max_deviazione_sec=900,
             numero_cluster=7,
+            strategia_clustering="globale",
+            numero_cluster_max=15,
+            tolleranza_flotta_auto=0.01,
+            k_localita_vicine=10,
+            max_studenti_cluster=1500,
+            max_localita_cluster=0,
+            max_spostamento_bilanciamento_km=3.0,
+            cella_aggregazione_km=2.0,
+            usa_cache_clustering=True,
             comune_destinazione="DALMINE",
+            strategia_ottimizzazione="savings",
+            k_regret=4,
+            soglia_ottimo_esatto=40,
+            tempo_ottimo_esatto_sec=5.0,
+            iterazioni_grasp=20,
+            tempo_grasp_sec=1.0,
+            seed_grasp=3,
+            numero_worker_grasp=2,
+            isole_annealing=2,
+            epoche_annealing=5,
+            mosse_epoca_annealing=1000,
+            seed_annealing=9,
+            numero_worker_annealing=2,
             batch_size_chiamate=100,
             jitter_factor=0.0003,
+            numero_worker=4,
+            tempo_local_search_sec=2.0,
+            velocita_ribilanciamento_kmh=60.0,
             log_level="INFO",
             environment="dev",
         )
@@ -144,8 +244,33 @@ class TestAppConfig:
         assert d["bonus_corso_laurea"] == 180
         assert d["max_deviazione_sec"] == 900
         assert d["numero_cluster"] == 7
+        assert d["strategia_clustering"] == "globale"
+        assert d["numero_cluster_max"] == 15
+        assert d["tolleranza_flotta_auto"] == pytest.approx(0.01)
+        assert d["k_localita_vicine"] == 10
+        assert d["max_studenti_cluster"] == 1500
+        assert d["max_localita_cluster"] == 0
+        assert d["max_spostamento_bilanciamento_km"] == pytest.approx(3.0)
+        assert d["cella_aggregazione_km"] == pytest.approx(2.0)
+        assert d["usa_cache_clustering"] is True
         assert d["comune_destinazione"] == "DALMINE"
+        assert d["strategia_ottimizzazione"] == "savings"
+        assert d["k_regret"] == 4
+        assert d["soglia_ottimo_esatto"] == 40
+        assert d["tempo_ottimo_esatto_sec"] == pytest.approx(5.0)
+        assert d["iterazioni_grasp"] == 20
+        assert d["tempo_grasp_sec"] == pytest.approx(1.0)
+        assert d["seed_grasp"] == 3
+        assert d["numero_worker_grasp"] == 2
+        assert d["isole_annealing"] == 2
+        assert d["epoche_annealing"] == 5
+        assert d["mosse_epoca_annealing"] == 1000
+        assert d["seed_annealing"] == 9
+        assert d["numero_worker_annealing"] == 2
         assert d["batch_size_chiamate"] == 100
         assert d["jitter_factor"] == pytest.approx(0.0003)
+        assert d["numero_worker"] == 4
+        assert d["tempo_local_search_sec"] == pytest.approx(2.0)
+        assert d["velocita_ribilanciamento_kmh"] == pytest.approx(60.0)
         assert d["log_level"] == "INFO"
         assert d["environment"] == "dev"
\ No newline at end of file
@@ -1,6 +1,7 @@
 import pytest
 import sys
 from pathlib import Path
+from unittest.mock import MagicMock
 
 # Per testare main.py vogliamo simulare l'esecuzione
 # "python src/main.py", dove la directory src è in sys.path
@@ -102,26 +103,47 @@ class DummyClustering:
 
 class DummyOptimizer:
     def __init__(
-        self, capacita_auto, bonus_corso_laurea, max_deviazione_sec, comune_destinazione
+        self,
+        capacita_auto,
+        bonus_corso_laurea,
+        max_deviazione_sec,
+        comune_destinazione,
+        k_localita_vicine,
     ):
         self.capacita_auto = capacita_auto
         self.bonus_corso_laurea = bonus_corso_laurea
         self.max_deviazione_sec = max_deviazione_sec
         self.comune_destinazione = comune_destinazione
+        self.k_localita_vicine = k_localita_vicine
 
 
 class DummyOptimizationFacade:
-    def __init__(self, clustering, optimizer):
+    def __init__(
+        self, clustering, optimizer, numero_worker, ordinatore_tappe, ribilanciatore
+    ):
         self.clustering = clustering
         self.optimizer = optimizer
+        self.numero_worker = numero_worker
+        self.ordinatore_tappe = ordinatore_tappe
+        self.ribilanciatore = ribilanciatore
 
 
 class DummyPopulateOrchestrator:
-    def __init__(self, studenti_repo, api_facade, clustering, comune_destinazione):
+    def __init__(
+        self,
+        studenti_repo,
+        api_facade,
+        clustering,
+        comune_destinazione,
+        k_localita_vicine,
+        raggio_confine_km,
+    ):
         self.studenti_repo = studenti_repo
         self.api_facade = api_facade
         self.clustering = clustering
         self.comune_destinazione = comune_destinazione
+        self.k_localita_vicine = k_localita_vicine
+        self.raggio_confine_km = raggio_confine_km
 
 
 class DummyOptimizeOrchestrator:
@@ -142,10 +164,22 @@ def test_initialize_layer3_business_cablatura_correlata(monkeypatch):
     class SimpleAppConfig:
         def __init__(self):
             self.numero_cluster = 7
+            self.strategia_clustering = "kmeans"
+            self.k_localita_vicine = 0
+            self.max_studenti_cluster = 0
+            self.max_localita_cluster = 0
+            self.max_spostamento_bilanciamento_km = 0.0
+            self.cella_aggregazione_km = 0.0
+            self.usa_cache_clustering = False
             self.capacita_macchina = 4
             self.bonus_corso_laurea = 180
             self.max_deviazione_sec = 900
             self.comune_destinazione = "DALMINE"
+            self.strategia_ottimizzazione = "greedy"
+            self.soglia_ottimo_esatto = 0
+            self.numero_worker = 3
+            self.tempo_local_search_sec = 0.0
+            self.velocita_ribilanciamento_kmh = 0.0
 
     app_cfg = SimpleAppConfig()
     studenti_repo = object()
@@ -163,12 +197,341 @@ def test_initialize_layer3_business_cablatura_correlata(monkeypatch):
     opt_facade = optimize_orch.optimization_facade
     assert isinstance(opt_facade.clustering, DummyClustering)
     assert opt_facade.clustering.n_clusters == 7
+    assert opt_facade.numero_worker == 3
+    assert isinstance(opt_facade.ordinatore_tappe, main_mod.StopOrderSolver)
+    assert opt_facade.ordinatore_tappe.destinazione == "DALMINE"
+    assert opt_facade.ribilanciatore is None
 
     assert isinstance(opt_facade.optimizer, DummyOptimizer)
     assert opt_facade.optimizer.capacita_auto == 4
     assert opt_facade.optimizer.bonus_corso_laurea == 180
     assert opt_facade.optimizer.max_deviazione_sec == 900
     assert opt_facade.optimizer.comune_destinazione == "DALMINE"
+    assert opt_facade.optimizer.k_localita_vicine == 0
+    assert populate_orch.k_localita_vicine == 0
+    assert populate_orch.raggio_confine_km == 0.0
+
+
+def test_initialize_layer3_business_local_search_avvolge_optimizer(monkeypatch):
+    monkeypatch.setattr(main_mod, "KMeansClusteringService", DummyClustering)
+    monkeypatch.setattr(main_mod, "GreedyOptimizer", DummyOptimizer)
+    monkeypatch.setattr(main_mod, "OptimizationFacade", DummyOptimizationFacade)
+    monkeypatch.setattr(main_mod, "PopulateOrchestrator", DummyPopulateOrchestrator)
+    monkeypatch.setattr(main_mod, "OptimizeOrchestrator", DummyOptimizeOrchestrator)
+
+    class SimpleAppConfig:
+        def __init__(self):
+            self.numero_cluster = 7
+            self.strategia_clustering = "kmeans"
+            self.k_localita_vicine = 0
+            self.max_studenti_cluster = 0
+            self.max_localita_cluster = 0
+            self.max_spostamento_bilanciamento_km = 0.0
+            self.cella_aggregazione_km = 0.0
+            self.usa_cache_clustering = False
+            self.capacita_macchina = 4
+            self.bonus_corso_laurea = 180
+            self.max_deviazione_sec = 900
+            self.comune_destinazione = "DALMINE"
+            self.strategia_ottimizzazione = "greedy"
+            self.soglia_ottimo_esatto = 0
+            self.numero_worker = 1
+            self.tempo_local_search_sec = 2.0
+            self.velocita_ribilanciamento_kmh = 50.0
+
+    populate_orch, optimize_orch = main_mod.initialize_layer3_business(
+        SimpleAppConfig(), object(), object(), object()
+    )
+
+    optimizer = optimize_orch.optimization_facade.optimizer
+    assert isinstance(optimizer, main_mod.ImprovedOptimizer)
+    assert isinstance(optimizer.optimizer, DummyOptimizer)
+
+    (local_search,) = optimizer.miglioramenti
+    assert isinstance(local_search, main_mod.LocalSearchImprover)
+    assert local_search.capacita_auto == 4
+    assert local_search.max_deviazione == 900
+    assert local_search.tempo_limite == pytest.approx(2.0)
+
+    # Ribilanciamento attivo: condivide l'ordinatore tappe della facade
+    facade = optimize_orch.optimization_facade
+    assert isinstance(facade.ribilanciatore, main_mod.CrossClusterRebalancer)
+    assert facade.ribilanciatore.ordinatore is facade.ordinatore_tappe
+    assert facade.ribilanciatore.raggio_km == pytest.approx(900 / 3600 * 50.0)
+    # Popola scarica le coppie di confine entro lo stesso raggio
+    assert populate_orch.raggio_confine_km == pytest.approx(900 / 3600 * 50.0)
+
+
+class DummySavingsOptimizer:
+    def __init__(self, capacita_auto, max_deviazione_sec, comune_destinazione):
+        self.capacita_auto = capacita_auto
+        self.max_deviazione_sec = max_deviazione_sec
+        self.comune_destinazione = comune_destinazione
+
+
+def _make_optimizer_config(strategia: str):
+    class SimpleAppConfig:
+        def __init__(self):
+            self.capacita_macchina = 3
+            self.k_localita_vicine = 12
+            self.max_studenti_cluster = 0
+            self.max_localita_cluster = 0
+            self.max_spostamento_bilanciamento_km = 0.0
+            self.cella_aggregazione_km = 0.0
+            self.usa_cache_clustering = False
+            self.bonus_corso_laurea = 180
+            self.max_deviazione_sec = 600
+            self.comune_destinazione = "DALMINE"
+            self.strategia_ottimizzazione = strategia
+            self.k_regret = 2
+            self.soglia_ottimo_esatto = 0
+            self.tempo_ottimo_esatto_sec = 5.0
+            self.iterazioni_grasp = 10
+            self.tempo_grasp_sec = 0.0
+            self.seed_grasp = 7
+            self.numero_worker_grasp = 2
+            self.isole_annealing = 3
+            self.epoche_annealing = 4
+            self.mosse_epoca_annealing = 500
+            self.seed_annealing = 5
+            self.numero_worker_annealing = 3
+            self.tempo_local_search_sec = 0.0
+
+    return SimpleAppConfig()
+
+
+def test_initialize_optimizer_seleziona_savings(monkeypatch):
+    monkeypatch.setattr(main_mod, "SavingsOptimizer", DummySavingsOptimizer)
+
+    optimizer = main_mod.initialize_optimizer(_make_optimizer_config("savings"))
+
+    assert isinstance(optimizer, DummySavingsOptimizer)
+    assert optimizer.capacita_auto == 3
+    assert optimizer.max_deviazione_sec == 600
+    assert optimizer.comune_destinazione == "DALMINE"
+
+
+def test_initialize_optimizer_seleziona_regret():
+    optimizer = main_mod.initialize_optimizer(_make_optimizer_config("regret"))
+
+    assert isinstance(optimizer, main_mod.RegretOptimizer)
+    assert optimizer.k_regret == 2
+    assert optimizer.capacita_auto == 3
+    assert optimizer.max_deviazione == 600
+
+
+def test_initialize_optimizer_seleziona_grasp_sul_greedy(monkeypatch):
+    monkeypatch.setattr(main_mod, "GreedyOptimizer", DummyOptimizer)
+
+    optimizer = main_mod.initialize_optimizer(_make_optimizer_config("grasp"))
+
+    assert isinstance(optimizer, main_mod.GraspOptimizer)
+    assert isinstance(optimizer.greedy, DummyOptimizer)
+    assert optimizer.iterazioni == 10
+    assert optimizer.seed == 7
+    assert optimizer.numero_worker == 2
+
+
+def test_initialize_optimizer_seleziona_annealing_sul_greedy(monkeypatch):
+    monkeypatch.setattr(main_mod, "GreedyOptimizer", DummyOptimizer)
+
+    optimizer = main_mod.initialize_optimizer(_make_optimizer_config("annealing"))
+
+    assert isinstance(optimizer, main_mod.AnnealingOptimizer)
+    assert isinstance(optimizer.optimizer, DummyOptimizer)
+    assert optimizer.parametri == main_mod.ParametriAnnealing(
+        isole=3, epoche=4, mosse_per_epoca=500, seed=5, numero_worker=3
+    )
+
+
+def test_initialize_optimizer_ottimo_esatto_usa_strategia_come_fallback(monkeypatch):
+    monkeypatch.setattr(main_mod, "SavingsOptimizer", DummySavingsOptimizer)
+    app_cfg = _make_optimizer_config("savings")
+    app_cfg.soglia_ottimo_esatto = 30
+
+    optimizer = main_mod.initialize_optimizer(app_cfg)
+
+    assert isinstance(optimizer, main_mod.ExactOptimizer)
+    assert isinstance(optimizer.fallback, DummySavingsOptimizer)
+    assert optimizer.soglia_studenti == 30
+    assert optimizer.tempo_limite == pytest.approx(5.0)
+
+
+def test_initialize_clustering_globale_e_kmeans():
+    app_cfg = _make_optimizer_config("greedy")
+    app_cfg.numero_cluster = 5
+
+    app_cfg.strategia_clustering = "kmeans"
+    clustering = main_mod.initialize_clustering(app_cfg)
+    assert isinstance(clustering, main_mod.KMeansClusteringService)
+    assert clustering.n_clusters == 5
+
+    app_cfg.strategia_clustering = "globale"
+    clustering = main_mod.initialize_clustering(app_cfg)
+    assert isinstance(clustering, main_mod.GlobalClustering)
+    assert clustering.n_clusters == 1
+
+    app_cfg.strategia_clustering = "dbscan"
+    with pytest.raises(ValueError):
+        main_mod.initialize_clustering(app_cfg)
+
+
+def test_initialize_clustering_kmedoids_usa_le_durate_in_cache():
+    app_cfg = _make_optimizer_config("greedy")
+    app_cfg.numero_cluster = 4
+    app_cfg.strategia_clustering = "kmedoids"
+    cache_repo = MagicMock()
+
+    clustering = main_mod.initialize_clustering(app_cfg, cache_repo)
+    assert isinstance(clustering, main_mod.KMedoidsClusteringService)
+    assert clustering.n_clusters == 4
+    clustering.fornitore_matrice()
+    cache_repo.percorsi_cache.to_duration_matrix.assert_called_once()
+
+    with pytest.raises(ValueError, match="kmedoids"):
+        main_mod.initialize_clustering(app_cfg)
+
+
+def test_initialize_clustering_auto_candidati_e_destinazione_da_cache():
+    app_cfg = _make_optimizer_config("greedy")
+    app_cfg.numero_cluster = 5
+    app_cfg.numero_cluster_max = 9
+    app_cfg.tolleranza_flotta_auto = 0.03
+    app_cfg.numero_worker = 2
+    app_cfg.strategia_clustering = "auto"
+    cache_repo = MagicMock()
+    cache_repo.coordinate_cache.get.return_value = (45.65, 9.6)
+
+    clustering = main_mod.initialize_clustering(app_cfg, cache_repo)
+    assert isinstance(clustering, main_mod.AutoKClustering)
+    assert clustering.candidati_k == [5, 6, 7, 8, 9]
+    assert clustering.n_clusters == 5
+    assert clustering.tolleranza_flotta == pytest.approx(0.03)
+    assert clustering.numero_worker == 2
+    assert clustering.coordinate_destinazione() == (45.65, 9.6)
+    cache_repo.coordinate_cache.get.assert_called_once_with("DALMINE")
+
+    with pytest.raises(ValueError, match="auto"):
+        main_mod.initialize_clustering(app_cfg)
+
+
+def test_initialize_clustering_sweep_attorno_alla_destinazione():
+    app_cfg = _make_optimizer_config("greedy")
+    app_cfg.numero_cluster = 8
+    app_cfg.strategia_clustering = "sweep"
+    cache_repo = MagicMock()
+    cache_repo.coordinate_cache.get.return_value = (45.65, 9.6)
+
+    clustering = main_mod.initialize_clustering(app_cfg, cache_repo)
+    assert isinstance(clustering, main_mod.SweepClustering)
+    assert clustering.n_clusters == 8
+    assert clustering.capacita_auto == 3
+    assert clustering.coordinate_destinazione() == (45.65, 9.6)
+    cache_repo.coordinate_cache.get.assert_called_once_with("DALMINE")
+
+    with pytest.raises(ValueError, match="sweep"):
+        main_mod.initialize_clustering(app_cfg)
+
+
+def test_initialize_clustering_minibatch_usa_i_centroidi_in_cache():
+    app_cfg = _make_optimizer_config("greedy")
+    app_cfg.numero_cluster = 6
+    app_cfg.numero_cluster_max = 0
+    app_cfg.tolleranza_flotta_auto = 0.02
+    app_cfg.strategia_clustering = "minibatch"
+    app_cfg.usa_cache_clustering = True
+    cache_repo = MagicMock()
+
+    clustering = main_mod.initialize_clustering(app_cfg, cache_repo)
+    assert isinstance(clustering.base, main_mod.MiniBatchKMeansClusteringService)
+    assert clustering.base.n_clusters == 6
+    assert clustering.base.archivio is cache_repo.centroidi_cache
+
+
+def test_initialize_clustering_minibatch_da_zero_senza_cache_dei_cluster():
+    app_cfg = _make_optimizer_config("greedy")
+    app_cfg.numero_cluster = 6
+    app_cfg.strategia_clustering = "minibatch"
+
+    clustering = main_mod.initialize_clustering(app_cfg, MagicMock())
+    assert isinstance(clustering, main_mod.MiniBatchKMeansClusteringService)
+    assert clustering.archivio is None
+
+
+def test_initialize_clustering_suddivisione_se_limiti_impostati():
+    app_cfg = _make_optimizer_config("greedy")
+    app_cfg.numero_cluster = 5
+    app_cfg.strategia_clustering = "kmeans"
+    app_cfg.max_studenti_cluster = 1000
+
+    clustering = main_mod.initialize_clustering(app_cfg)
+    assert isinstance(clustering, main_mod.RecursiveSplittingClustering)
+    assert isinstance(clustering.base, main_mod.KMeansClusteringService)
+    assert clustering.max_studenti == 1000
+    assert clustering.max_localita == 0
+    assert clustering.n_clusters == 5
+
+
+def test_initialize_clustering_bilanciamento_dopo_la_suddivisione():
+    app_cfg = _make_optimizer_config("greedy")
+    app_cfg.numero_cluster = 5
+    app_cfg.strategia_clustering = "kmeans"
+    app_cfg.max_studenti_cluster = 1000
+    app_cfg.max_spostamento_bilanciamento_km = 4.0
+
+    clustering = main_mod.initialize_clustering(app_cfg)
+    assert isinstance(clustering, main_mod.CapacityBalancedClustering)
+    assert isinstance(clustering.base, main_mod.RecursiveSplittingClustering)
+    assert clustering.capacita_auto == 3
+    assert clustering.max_spostamento_km == pytest.approx(4.0)
+    assert clustering.n_clusters == 5
+
+
+def test_initialize_clustering_aggregazione_esterna_a_suddivisione():
+    app_cfg = _make_optimizer_config("greedy")
+    app_cfg.numero_cluster = 5
+    app_cfg.strategia_clustering = "kmeans"
+    app_cfg.max_studenti_cluster = 1000
+    app_cfg.cella_aggregazione_km = 2.5
+
+    clustering = main_mod.initialize_clustering(app_cfg)
+    assert isinstance(clustering, main_mod.GridAggregationClustering)
+    assert isinstance(clustering.base, main_mod.RecursiveSplittingClustering)
+    assert clustering.cella_km == pytest.approx(2.5)
+    assert clustering.n_clusters == 5
+
+
+def test_initialize_clustering_cache_avvolge_la_strategia():
+    app_cfg = _make_optimizer_config("greedy")
+    app_cfg.numero_cluster = 5
+    app_cfg.numero_cluster_max = 0
+    app_cfg.tolleranza_flotta_auto = 0.02
+    app_cfg.strategia_clustering = "kmeans"
+    app_cfg.usa_cache_clustering = True
+    cache_repo = MagicMock()
+
+    clustering = main_mod.initialize_clustering(app_cfg, cache_repo)
+    assert isinstance(clustering, main_mod.CachedClusteringStrategy)
+    assert isinstance(clustering.base, main_mod.KMeansClusteringService)
+    assert clustering.cache is cache_repo.clustering_cache
+    assert clustering.parametri["numero_cluster"] == 5
+    assert clustering.parametri["strategia_clustering"] == "kmeans"
+
+    # Senza repository (o con la cache disabilitata) nessun decoratore
+    clustering = main_mod.initialize_clustering(app_cfg)
+    assert isinstance(clustering, main_mod.KMeansClusteringService)
+
+
+def test_initialize_optimizer_greedy_riceve_k_localita_vicine():
+    optimizer = main_mod.initialize_optimizer(_make_optimizer_config("greedy"))
+
+    assert isinstance(optimizer, main_mod.GreedyOptimizer)
+    assert optimizer.k_localita_vicine == 12
+
+
+def test_initialize_optimizer_strategia_sconosciuta():
+    with pytest.raises(ValueError):
+        main_mod.initialize_optimizer(_make_optimizer_config("genetico"))
 
 
 class DummyCLIParser:
@@ -1,6 +1,25 @@
+import math
+import time
+import numpy as np
 import pytest
 from unittest.mock import MagicMock
 from src.business.clustering.kmeans_clustering import KMeansClusteringService
+from src.business.clustering.global_clustering import GlobalClustering
+from src.business.clustering.weighted_points import WeightedPoints
+from src.business.clustering.cached_clustering import CachedClusteringStrategy
+from src.business.clustering.minibatch_clustering import (
+    MiniBatchKMeansClusteringService,
+)
+from src.data.repositories.cache_repository import CentroidiCache, ClusteringCache
+from src.business.clustering.auto_k_clustering import AutoKClustering, ValutazioneK
+from src.business.clustering.kmedoids_clustering import KMedoidsClusteringService
+from src.business.clustering.recursive_splitting import RecursiveSplittingClustering
+from src.business.clustering.capacity_balanced import CapacityBalancedClustering
+from src.business.clustering.sweep_clustering import SweepClustering
+from src.business.clustering.grid_aggregation import GridAggregationClustering
+from src.business.optimization.greedy_optimizer import GreedyOptimizer
+from src.data.models.duration_matrix import DurationMatrix
+from src.data.models.studente import Studente
 
 
 def _make_studente(coordinate):
@@ -113,3 +132,591 @@ def test_clustering_con_n_clusters_variabile(n_clusters):
     assert len(result) <= n_clusters
     assert all(len(c) > 0 for c in result)
     assert sum(len(c) for c in result) == 6
+
+
+@pytest.mark.unit
+def test_globale_un_solo_cluster_senza_studenti_non_geocodificati(sei_studenti_validi):
+    studenti = sei_studenti_validi + [_make_studente(None)]
+    result = GlobalClustering().cluster_studenti(studenti)
+    assert result == [sei_studenti_validi]
+    assert GlobalClustering.n_clusters == 1
+
+
+@pytest.mark.unit
+def test_globale_nessun_cluster_se_nessuno_geocodificato():
+    assert GlobalClustering().cluster_studenti([_make_studente(None)]) == []
+
+
+def _make_studenti_griglia(n_localita, per_localita):
+    """Studenti su una griglia di località, per_localita studenti ciascuna"""
+    studenti = []
+    for i in range(n_localita):
+        for _ in range(per_localita):
+            s = _make_studente((45.0 + 0.05 * (i % 10), 9.0 + 0.05 * (i // 10)))
+            s.localita = f"L{i}"
+            studenti.append(s)
+    return studenti
+
+
+@pytest.mark.unit
+def test_suddivisione_rispetta_max_studenti_e_conserva_tutti():
+    studenti = _make_studenti_griglia(60, 5)
+    service = RecursiveSplittingClustering(GlobalClustering(), max_studenti=40)
+    result = service.cluster_studenti(studenti)
+
+    assert all(len(c) <= 40 for c in result)
+    assert sorted(map(id, (s for c in result for s in c))) == sorted(map(id, studenti))
+
+
+@pytest.mark.unit
+def test_suddivisione_rispetta_max_localita():
+    studenti = _make_studenti_griglia(60, 2)
+    service = RecursiveSplittingClustering(
+        KMeansClusteringService(n_clusters=2), max_localita=8
+    )
+    result = service.cluster_studenti(studenti)
+    assert all(len({s.localita for s in c}) <= 8 for c in result)
+
+
+@pytest.mark.unit
+def test_suddivisione_albero_padre_figli_coerente():
+    studenti = _make_studenti_griglia(60, 5)
+    service = RecursiveSplittingClustering(GlobalClustering(), max_studenti=40)
+    result = service.cluster_studenti(studenti)
+
+    albero = service.albero
+    assert albero[0].genitore is None and len(albero[0].studenti) == 300
+    assert [albero[i].studenti for i in service.foglie] == result
+    for i, nodo in enumerate(albero):
+        assert nodo.foglia == (i in service.foglie)
+        for figlio in nodo.figli:
+            assert albero[figlio].genitore == i
+        if nodo.figli:
+            figli = sum(len(albero[f].studenti) for f in nodo.figli)
+            assert figli == len(nodo.studenti)
+
+
+@pytest.mark.unit
+def test_suddivisione_non_divide_una_sola_localita():
+    studenti = _make_studenti_griglia(1, 50)
+    service = RecursiveSplittingClustering(GlobalClustering(), max_studenti=10)
+    assert service.cluster_studenti(studenti) == [studenti]
+
+
+@pytest.mark.unit
+def test_suddivisione_senza_limiti_restituisce_la_base(sei_studenti_validi):
+    base = KMeansClusteringService(n_clusters=2)
+    service = RecursiveSplittingClustering(base)
+    assert service.n_clusters == 2
+    assert service.cluster_studenti(sei_studenti_validi) == base.cluster_studenti(
+        sei_studenti_validi
+    )
+
+
+def _make_studente_in(localita, coordinate):
+    s = _make_studente(coordinate)
+    s.localita = localita
+    return s
+
+
+def _make_fornitore(durate: dict):
+    matrice = DurationMatrix.from_cache_dict(
+        {k: {"durata_sec": v, "distanza_m": 0} for k, v in durate.items()}
+    )
+    return lambda: matrice
+
+
+@pytest.mark.unit
+def test_kmedoids_segue_i_tempi_stradali_non_la_linea_d_aria():
+    # Località alternate sulle due sponde di un fiume: vicine in linea d'aria,
+    # lontane su strada tra sponde diverse
+    sponde = {"A1": "A", "B1": "B", "A2": "A", "B2": "B"}
+    studenti = [
+        _make_studente_in(loc, (45.0, 9.0 + 0.01 * i)) for i, loc in enumerate(sponde)
+    ]
+    durate = {
+        f"{a}-{b}": 120 if sponde[a] == sponde[b] else 2400
+        for a in sponde
+        for b in sponde
+        if a != b
+    }
+    service = KMedoidsClusteringService(2, _make_fornitore(durate))
+    result = service.cluster_studenti(studenti)
+
+    assert sorted(sorted(s.localita for s in c) for c in result) == [
+        ["A1", "A2"],
+        ["B1", "B2"],
+    ]
+
+
+@pytest.mark.unit
+def test_kmedoids_linea_d_aria_se_la_cache_e_vuota():
+    vicini_a = [_make_studente_in(f"A{i}", (45.0, 9.0 + 0.01 * i)) for i in range(3)]
+    vicini_b = [_make_studente_in(f"B{i}", (45.5, 9.5 + 0.01 * i)) for i in range(3)]
+    service = KMedoidsClusteringService(2, _make_fornitore({}))
+    result = service.cluster_studenti(vicini_a + vicini_b)
+    assert sorted(map(len, result)) == [3, 3]
+    assert any(c == vicini_a for c in result)
+
+
+@pytest.mark.unit
+def test_kmedoids_medoide_nella_localita_piu_popolata():
+    studenti = [_make_studente_in("Centro", (45.0, 9.0)) for _ in range(10)]
+    studenti += [_make_studente_in(f"P{i}", (45.0 + 0.01 * i, 9.0)) for i in (1, 2)]
+    service = KMedoidsClusteringService(1, _make_fornitore({}))
+    service.cluster_studenti(studenti)
+    assert service.medoidi == ["Centro"]
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("seed", range(5))
+def test_kmedoids_nessuno_scambio_migliorativo_al_termine(seed):
+    rng = np.random.default_rng(seed)
+    punti = rng.uniform(0, 100, size=(30, 2))
+    distanze = np.hypot(*(punti[:, None] - punti[None]).transpose(2, 0, 1))
+    pesi = rng.integers(1, 5, size=30).astype(float)
+    service = KMedoidsClusteringService(4, _make_fornitore({}))
+
+    medoidi = service._scambi(distanze, pesi, service._build(distanze, pesi, 4))
+    costo = distanze[medoidi].min(axis=0) @ pesi
+    for candidata in set(range(30)) - set(medoidi.tolist()):
+        for j in range(4):
+            scambio = medoidi.copy()
+            scambio[j] = candidata
+            assert distanze[scambio].min(axis=0) @ pesi >= costo - 1e-9
+
+
+@pytest.mark.unit
+def test_kmedoids_value_error_se_studenti_insufficienti():
+    service = KMedoidsClusteringService(3, _make_fornitore({}))
+    with pytest.raises(ValueError):
+        service.cluster_studenti([_make_studente_in("A", (45.0, 9.0))])
+
+
+def _make_base(clusters):
+    base = MagicMock()
+    base.n_clusters = len(clusters)
+    base.cluster_studenti.return_value = clusters
+    return base
+
+
+@pytest.mark.unit
+def test_bilanciamento_sposta_il_resto_verso_il_cluster_vicino(capsys):
+    # Capacità 4: 5 + 3 studenti richiedono 3 auto, 4 + 4 solo 2
+    ovest = [_make_studente((45.0, 9.0 + 0.001 * i)) for i in range(4)]
+    confine = _make_studente((45.0, 9.02))
+    est = [_make_studente((45.0, 9.03 + 0.001 * i)) for i in range(3)]
+    service = CapacityBalancedClustering(
+        _make_base([ovest + [confine], est]), capacita_auto=4, max_spostamento_km=5.0
+    )
+    result = service.cluster_studenti([])
+    assert result == [ovest, est + [confine]]
+    assert service.n_clusters == 2
+    assert "1 trasferimenti, auto minime 3 -> 2" in capsys.readouterr().out
+
+
+@pytest.mark.unit
+def test_bilanciamento_non_sposta_oltre_il_limite_di_km():
+    ovest = [_make_studente((45.0, 9.0)) for _ in range(5)]
+    est = [_make_studente((45.0, 10.0)) for _ in range(3)]
+    service = CapacityBalancedClustering(
+        _make_base([ovest, est]), capacita_auto=4, max_spostamento_km=5.0
+    )
+    assert service.cluster_studenti([]) == [ovest, est]
+
+
+@pytest.mark.unit
+def test_bilanciamento_non_riempie_cluster_gia_multipli_della_capacita():
+    # Il ricevente pieno (resto 0) avrebbe bisogno di un'auto in più
+    ovest = [_make_studente((45.0, 9.0)) for _ in range(5)]
+    est = [_make_studente((45.0, 9.01)) for _ in range(4)]
+    service = CapacityBalancedClustering(
+        _make_base([ovest, est]), capacita_auto=4, max_spostamento_km=5.0
+    )
+    assert service.cluster_studenti([]) == [ovest, est]
+
+
+def _make_auto_k(candidati, tolleranza=0.02):
+    return AutoKClustering(
+        candidati,
+        GreedyOptimizer(4, 180, 600),
+        lambda: (45.65, 9.6),
+        tolleranza_flotta=tolleranza,
+    )
+
+
+@pytest.mark.unit
+def test_auto_k_sceglie_meno_percorsi_entro_la_tolleranza():
+    valutazioni = [
+        ValutazioneK(3, 900, 100),
+        ValutazioneK(5, 500, 101),
+        ValutazioneK(7, 300, 104),
+    ]
+    assert _make_auto_k([3, 5, 7], tolleranza=0.02)._scegli(valutazioni) == 5
+    assert _make_auto_k([3, 5, 7], tolleranza=0.05)._scegli(valutazioni) == 7
+    assert _make_auto_k([3, 5, 7], tolleranza=0.0)._scegli(valutazioni) == 3
+
+
+@pytest.mark.unit
+def test_auto_k_percorsi_come_popola_e_tabella(capsys):
+    # Due gruppi lontani di 3 località: con k = 2 i percorsi sono 2 * 3 * 4
+    studenti = []
+    for base, nome in ((9.0, "O"), (10.0, "E")):
+        for i in range(3):
+            studenti.append(_make_studente_in(f"{nome}{i}", (45.6, base + 0.01 * i)))
+    service = _make_auto_k([1, 2])
+    result = service.cluster_studenti(studenti)
+
+    assert [(v.k, v.percorsi) for v in service.valutazioni] == [(1, 42), (2, 24)]
+    assert service.k_scelto == 2 and service.n_clusters == 2
+    assert sorted(map(len, result)) == [3, 3]
+    assert "Scelta automatica del numero di cluster" in capsys.readouterr().out
+
+
+@pytest.mark.unit
+def test_auto_k_value_error_senza_coordinate_destinazione():
+    service = AutoKClustering([2], GreedyOptimizer(4, 180, 600), lambda: None)
+    studenti = [_make_studente_in(f"L{i}", (45.0, 9.0 + 0.01 * i)) for i in range(4)]
+    with pytest.raises(ValueError):
+        service.cluster_studenti(studenti)
+
+
+@pytest.mark.unit
+def test_punti_pesati_deduplicano_le_coordinate():
+    studenti = [
+        _make_studente((45.0, 9.0)),
+        _make_studente((45.5, 9.5)),
+        _make_studente((45.0, 9.0)),
+    ]
+    punti = WeightedPoints.da_studenti(studenti)
+    assert punti.coordinate.tolist() == [[45.0, 9.0], [45.5, 9.5]]
+    assert punti.pesi.tolist() == [2, 1]
+    assert punti.indice.tolist() == [0, 1, 0]
+    assert punti.raggruppa(studenti, np.array([1, 0]), 3) == [
+        [studenti[1]],
+        [studenti[0], studenti[2]],
+    ]
+
+
+@pytest.mark.unit
+def test_kmeans_pesato_stessa_partizione_delle_righe_per_studente():
+    # Due gruppi ben separati, con molti studenti per località
+    studenti = [
+        _make_studente((45.0 + 0.01 * (i % 3), 9.0)) for i in range(30)
+    ] + [_make_studente((46.0 + 0.01 * (i % 4), 10.0)) for i in range(40)]
+    result = KMeansClusteringService(n_clusters=2).cluster_studenti(studenti)
+    assert sorted(map(len, result)) == [30, 40]
+    assert all(len({s.coordinate[0] >= 46 for s in c}) == 1 for c in result)
+
+
+@pytest.mark.unit
+def test_kmeans_piu_cluster_che_localita_distinte():
+    studenti = [_make_studente((45.0, 9.0)) for _ in range(5)] + [
+        _make_studente((45.5, 9.5)) for _ in range(5)
+    ]
+    result = KMeansClusteringService(n_clusters=4).cluster_studenti(studenti)
+    assert sorted(map(len, result)) == [5, 5]
+
+
+def _make_cached(base, tmp_path, parametri=None):
+    cache = ClusteringCache(tmp_path / "cache_clustering.json")
+    return CachedClusteringStrategy(base, cache, parametri or {"numero_cluster": 2})
+
+
+@pytest.mark.unit
+def test_cache_clustering_riusa_il_risultato_anche_tra_processi(tmp_path):
+    a = [_make_studente_in("A", (45.0, 9.0)) for _ in range(2)]
+    b = [_make_studente_in("B", (45.5, 9.5)), _make_studente_in("A", (45.0, 9.0))]
+    base = _make_base([a + b[1:], b[:1]])
+    service = _make_cached(base, tmp_path)
+    primo = service.cluster_studenti(a + b)
+
+    # Nuova istanza (es. modalità ottimizza) sulla stessa cache su disco
+    altra_base = _make_base([])
+    secondo = _make_cached(altra_base, tmp_path).cluster_studenti(a + b)
+    assert secondo == primo
+    altra_base.cluster_studenti.assert_not_called()
+
+
+@pytest.mark.unit
+def test_cache_clustering_invalidata_se_cambiano_input_o_parametri(tmp_path):
+    studenti = [
+        _make_studente_in("A", (45.0, 9.0)),
+        _make_studente_in("B", (45.5, 9.5)),
+    ]
+    base = _make_base([studenti])
+    service = _make_cached(base, tmp_path)
+    chiave = service.chiave(studenti)
+    service.cluster_studenti(studenti)
+
+    spostato = [studenti[0], _make_studente_in("B", (45.6, 9.5))]
+    assert service.chiave(spostato) != chiave
+    assert service.chiave(studenti + [studenti[0]]) != chiave
+    altri_parametri = _make_cached(base, tmp_path, {"numero_cluster": 3})
+    assert altri_parametri.chiave(studenti) != chiave
+
+    base.cluster_studenti.return_value = [spostato]
+    service.cluster_studenti(spostato)
+    assert base.cluster_studenti.call_count == 2
+
+
+def _make_due_gruppi(n_per_gruppo=20):
+    ovest = [
+        Studente(f"o{i}@x.it", f"O{i % 4}", "ING", (45.0 + 0.01 * (i % 4), 9.0))
+        for i in range(n_per_gruppo)
+    ]
+    est = [
+        Studente(f"e{i}@x.it", f"E{i % 5}", "ING", (46.0 + 0.01 * (i % 5), 10.0))
+        for i in range(n_per_gruppo)
+    ]
+    return ovest, est
+
+
+@pytest.mark.unit
+def test_minibatch_separa_i_gruppi_e_salva_i_centroidi(tmp_path):
+    ovest, est = _make_due_gruppi()
+    archivio = CentroidiCache(tmp_path / "cache_centroidi.json")
+    service = MiniBatchKMeansClusteringService(2, archivio)
+
+    result = service.cluster_studenti(ovest + est)
+    assert sorted(result, key=len) in ([ovest, est], [est, ovest])
+    salvati = CentroidiCache(tmp_path / "cache_centroidi.json").get("minibatch-2")
+    assert len(salvati) == 2
+
+
+@pytest.mark.unit
+def test_minibatch_a_caldo_dai_centroidi_salvati(tmp_path, capsys):
+    ovest, est = _make_due_gruppi()
+    archivio = CentroidiCache(tmp_path / "cache_centroidi.json")
+    archivio.set("minibatch-2", [(46.02, 10.0), (45.01, 9.0)])
+
+    result = MiniBatchKMeansClusteringService(2, archivio).cluster_studenti(ovest + est)
+    assert result == [est, ovest]  # Etichette nell'ordine dei centroidi salvati
+    assert "a caldo" in capsys.readouterr().out
+
+
+@pytest.mark.unit
+def test_minibatch_ignora_centroidi_di_un_altro_k(tmp_path, capsys):
+    ovest, est = _make_due_gruppi()
+    archivio = CentroidiCache(tmp_path / "cache_centroidi.json")
+    archivio.set("minibatch-2", [(45.0, 9.0)])
+
+    MiniBatchKMeansClusteringService(2, archivio).cluster_studenti(ovest + est)
+    assert "da zero" in capsys.readouterr().out
+
+
+@pytest.mark.unit
+def test_minibatch_partial_fit_a_blocchi_poi_clustering_a_caldo(tmp_path, capsys):
+    ovest, est = _make_due_gruppi()
+    archivio = CentroidiCache(tmp_path / "cache_centroidi.json")
+    service = MiniBatchKMeansClusteringService(2, archivio, batch_size=10)
+
+    service.partial_fit(ovest[:5])  # Blocco incompleto: solo accodato
+    assert service.modello is None
+    service.partial_fit(ovest[5:10] + est[:10])
+    assert service.modello is not None and not service._in_attesa
+
+    result = service.cluster_studenti(ovest + est)
+    assert sorted(result, key=len) in ([ovest, est], [est, ovest])
+    assert "a caldo" in capsys.readouterr().out
+    assert service.modello is None  # Stato consumato dal clustering
+
+
+@pytest.mark.unit
+def test_minibatch_partial_fit_senza_archivio_non_fa_nulla():
+    ovest, est = _make_due_gruppi()
+    service = MiniBatchKMeansClusteringService(2, batch_size=10)
+    service.partial_fit(ovest + est)
+    assert service.modello is None and not service._in_attesa
+
+
+@pytest.mark.unit
+def test_decoratori_inoltrano_partial_fit_alla_base():
+    base = MagicMock()
+    service = GridAggregationClustering(
+        CapacityBalancedClustering(RecursiveSplittingClustering(base, 10), 4), 1.0
+    )
+    studenti = [_make_studente((45.0, 9.0))]
+    service.partial_fit(studenti)
+    base.partial_fit.assert_called_once_with(studenti)
+
+
+DESTINAZIONE = (45.65, 9.6)
+
+
+@pytest.mark.unit
+def test_sweep_raggruppa_per_direzione_non_per_distanza():
+    # Nord e est, ciascuno a 1 km e a 30 km: K-Means unirebbe i due vicini
+    nord = [
+        _make_studente_in(loc, (DESTINAZIONE[0] + dlat, DESTINAZIONE[1]))
+        for loc, dlat in (("N1", 0.009), ("N30", 0.27))
+        for _ in range(4)
+    ]
+    est = [
+        _make_studente_in(loc, (DESTINAZIONE[0], DESTINAZIONE[1] + dlon))
+        for loc, dlon in (("E1", 0.013), ("E30", 0.385))
+        for _ in range(4)
+    ]
+    result = SweepClustering(2, lambda: DESTINAZIONE).cluster_studenti(nord + est)
+    assert sorted(result, key=lambda c: c[0].localita) == [est, nord]
+
+
+@pytest.mark.unit
+def test_sweep_settori_multipli_della_capacita():
+    # 22 località su una circonferenza, uno studente ciascuna: 11 + 11
+    # diventa 12 + 10, con il primo settore multiplo di 4
+    studenti = []
+    for i in range(22):
+        angolo = 2 * math.pi * i / 22
+        coordinate = (
+            DESTINAZIONE[0] + 0.1 * math.cos(angolo),
+            DESTINAZIONE[1] + 0.1 * math.sin(angolo),
+        )
+        studenti.append(_make_studente_in(f"L{i}", coordinate))
+    service = SweepClustering(2, lambda: DESTINAZIONE, capacita_auto=4)
+
+    result = service.cluster_studenti(studenti)
+    assert sorted(map(len, result)) == [10, 12]
+    assert sorted(s for c in result for s in map(id, c)) == sorted(map(id, studenti))
+
+
+@pytest.mark.unit
+def test_sweep_almeno_una_localita_per_settore():
+    # Una località con quasi tutti gli studenti non svuota gli altri settori
+    studenti = [_make_studente_in("BERGAMO", (45.7, 9.67)) for _ in range(40)]
+    studenti += [_make_studente_in(f"L{i}", (45.5, 9.4 + 0.1 * i)) for i in range(3)]
+    result = SweepClustering(4, lambda: DESTINAZIONE).cluster_studenti(studenti)
+    assert sorted(map(len, result)) == [1, 1, 1, 40]
+
+
+@pytest.mark.unit
+def test_sweep_ordine_angolare_da_nord_in_senso_orario():
+    # Nord, nord-est, est: il varco più ampio va da est a nord
+    lat, lon = DESTINAZIONE
+    coordinate = np.array([[lat, lon + 0.1], [lat + 0.1, lon], [lat + 0.07, lon + 0.1]])
+    ordine = SweepClustering._ordine_angolare(coordinate, DESTINAZIONE)
+    assert ordine.tolist() == [1, 2, 0]
+
+
+@pytest.mark.unit
+def test_sweep_value_error_senza_coordinate_destinazione():
+    studenti = [_make_studente_in(f"L{i}", (45.0, 9.0 + 0.01 * i)) for i in range(4)]
+    with pytest.raises(ValueError):
+        SweepClustering(2, lambda: None).cluster_studenti(studenti)
+
+
+def _make_provincia(n_studenti, n_localita, seed=0):
+    """Località sparse attorno alla destinazione e durate a 50 km/h"""
+    rng = np.random.default_rng(seed)
+    centri = DESTINAZIONE + rng.uniform(-0.3, 0.3, size=(n_localita, 2))
+    localita = [f"L{i}" for i in range(n_localita)]
+    studenti = [
+        Studente(f"s{i}@x.it", localita[j], "ABC"[i % 3], tuple(centri[j]))
+        for i, j in enumerate(rng.integers(0, n_localita, size=n_studenti))
+    ]
+    punti = np.vstack((centri, DESTINAZIONE)) * [111.3, 111.3 * 0.7]
+    km = np.hypot(*(punti[:, None, :] - punti[None, :, :]).transpose(2, 0, 1))
+    matrice = DurationMatrix(
+        localita=localita + ["DALMINE"], durate=km / 50 * 3600, distanze=km * 1000
+    )
+    return studenti, matrice
+
+
+@pytest.mark.performance
+def test_benchmark_sweep_contro_kmeans():
+    studenti, matrice = _make_provincia(3000, 300)
+    stimatore = GreedyOptimizer(4, 180, 600)
+    risultati = {}
+    for nome, service in (
+        ("kmeans", KMeansClusteringService(15)),
+        ("sweep", SweepClustering(15, lambda: DESTINAZIONE)),
+    ):
+        inizio = time.perf_counter()
+        clusters = service.cluster_studenti(studenti)
+        secondi = time.perf_counter() - inizio
+        percorsi = sum(
+            n * (n + 1) for n in (len({s.localita for s in c}) for c in clusters)
+        )
+        auto = sum(len(stimatore.optimize_cluster(c, matrice)) for c in clusters)
+        risultati[nome] = (percorsi, auto, secondi)
+
+    for nome, (percorsi, auto, secondi) in risultati.items():
+        print(f"{nome}: {percorsi} percorsi, {auto} auto, clustering in {secondi:.3f}s")
+    assert risultati["sweep"][0] <= risultati["kmeans"][0] * 1.1
+    assert risultati["sweep"][1] <= risultati["kmeans"][1] * 1.02
+
+
+def _make_base_spia(base):
+    """Base che registra i punti pesati visti durante il clustering"""
+    visti = []
+
+    def cluster_studenti(studenti):
+        visti.append(WeightedPoints.da_studenti(studenti))
+        return base.cluster_studenti(studenti)
+
+    spia = MagicMock()
+    spia.cluster_studenti.side_effect = cluster_studenti
+    return spia, visti
+
+
+@pytest.mark.unit
+def test_aggregazione_un_punto_pesato_per_cella_e_studenti_originali():
+    ovest, est = _make_due_gruppi()  # Località a ~1 km l'una dall'altra
+    base, visti = _make_base_spia(KMeansClusteringService(2))
+    service = GridAggregationClustering(base, cella_km=50.0)
+
+    result = service.cluster_studenti(ovest + est + [Studente("n@x.it", "N", "ING")])
+    assert sorted(result, key=len) in ([ovest, est], [est, ovest])
+    cluster_ovest = next(c for c in result if c[0].localita.startswith("O"))
+    assert all(s is o for s, o in zip(cluster_ovest, ovest))  # Oggetti originali
+    assert ovest[1].coordinate == (45.01, 9.0)  # Originali non modificati
+
+    assert len(visti[0]) == 2 and sorted(visti[0].pesi) == [20, 20]
+    # Baricentro pesato: località O0..O3 con 5 studenti ciascuna
+    assert visti[0].coordinate[0] == pytest.approx([45.015, 9.0])
+
+
+@pytest.mark.unit
+def test_aggregazione_celle_piccole_lasciano_i_punti_distinti():
+    ovest, est = _make_due_gruppi()
+    base, visti = _make_base_spia(GlobalClustering())
+    GridAggregationClustering(base, cella_km=0.1).cluster_studenti(ovest + est)
+    assert len(visti[0]) == 9
+
+
+@pytest.mark.unit
+def test_aggregazione_la_base_riceve_copie():
+    ovest, _ = _make_due_gruppi(2)
+    visti = []
+    base = MagicMock()
+    base.cluster_studenti.side_effect = lambda copie: visti.extend(copie) or [copie]
+
+    result = GridAggregationClustering(base, cella_km=50.0).cluster_studenti(ovest)
+    assert result[0][0] is ovest[0] and result[0][1] is ovest[1]
+    assert [s.coordinate for s in ovest] == [(45.0, 9.0), (45.01, 9.0)]
+    assert not any(copia is s for copia, s in zip(visti, ovest))
+    assert visti[0].coordinate == pytest.approx((45.005, 9.0))
+    assert visti[0].email == "o0@x.it" and visti[1].localita == "O1"
+
+
+@pytest.mark.performance
+def test_benchmark_aggregazione_su_tutta_la_regione():
+    # Lombardia: ~110 x 110 km, 50000 punti distinti (es. indirizzi)
+    rng = np.random.default_rng(0)
+    centri = [45.6, 9.6] + rng.uniform(-0.5, 0.5, size=(50_000, 2)) * [1.0, 1.4]
+    studenti = [
+        Studente(f"s{i}@x.it", f"L{j}", "ING", tuple(centri[j]))
+        for i, j in enumerate(rng.integers(0, len(centri), size=100_000))
+    ]
+    risultati = {}
+    for nome, service in (
+        ("kmeans", KMeansClusteringService(30)),
+        ("celle 5 km", GridAggregationClustering(KMeansClusteringService(30), 5.0)),
+    ):
+        inizio = time.perf_counter()
+        clusters = service.cluster_studenti(studenti)
+        risultati[nome] = (len(clusters), time.perf_counter() - inizio)
+
+    for nome, (n_cluster, secondi) in risultati.items():
+        print(f"{nome}: {n_cluster} cluster in {secondi:.3f}s")
+    assert risultati["celle 5 km"][0] == 30
@@ -0,0 +1,193 @@
+import math
+import random
+import pytest
+from src.business.optimization.annealing_optimizer import (
+    AnnealingOptimizer,
+    ParametriAnnealing,
+    _Isola,
+)
+from src.business.optimization.car_route import CarRoute
+from src.business.optimization.cluster_kernel import ClusterKernel
+from src.business.optimization.greedy_optimizer import GreedyOptimizer
+from src.data.models import DurationMatrix, Studente
+
+
+def _make_scenario(seed: int, n_studenti: int = 60, senza=frozenset()):
+    rng = random.Random(seed)
+    punti = {f"L{i}": (rng.uniform(-800, 800), rng.uniform(-800, 800)) for i in range(20)}
+    punti["DALMINE"] = (0, 0)
+    dati = {}
+    for a, (xa, ya) in punti.items():
+        for b, (xb, yb) in punti.items():
+            if a != b and (a, b) not in senza:
+                dati[f"{a}-{b}"] = {
+                    "durata_sec": math.hypot(xa - xb, ya - yb),
+                    "distanza_m": 0,
+                }
+    cluster = [
+        Studente(
+            email=f"s{i}@unibg.it",
+            localita=rng.choice(list(punti)[:-1]),
+            corso=rng.choice(["ING", "ECO", "INF"]),
+        )
+        for i in range(n_studenti)
+    ]
+    return cluster, DurationMatrix.from_cache_dict(dati)
+
+
+def _firma(equipaggi):
+    return [[m.email for m in e.membri] for e in equipaggi]
+
+
+def _make_annealing(**kwargs):
+    parametri = dict(isole=2, epoche=3, mosse_per_epoca=2000, seed=3)
+    parametri.update(kwargs)
+    return AnnealingOptimizer(
+        GreedyOptimizer(4, 180, 300), 4, 300, ParametriAnnealing(**parametri)
+    )
+
+
+@pytest.mark.unit
+def test_optimize_cluster_rispetta_i_vincoli_e_non_peggiora_il_greedy():
+    cluster, matrice = _make_scenario(0)
+    greedy = GreedyOptimizer(4, 180, 300).optimize_cluster(cluster, matrice)
+    risultato = _make_annealing().optimize_cluster(cluster, matrice)
+
+    assert len(risultato) <= len(greedy)
+    assert sorted(s.email for e in risultato for s in e.membri) == sorted(
+        s.email for s in cluster
+    )
+    kernel = ClusterKernel.build(cluster, matrice, "DALMINE")
+    for e in risultato:
+        assert e.capacita_utilizzata <= 4
+        tappe = list(dict.fromkeys(kernel.localita.index(s.localita) for s in e.membri))
+        assert CarRoute.da_tappe(kernel, tappe).deviazione <= 300 + 1e-6
+        assert e.percorso_tappe == [s.localita for s in e.membri] + ["DALMINE"]
+    assert [e.id for e in risultato] == list(range(1, len(risultato) + 1))
+
+
+@pytest.mark.unit
+def test_optimize_cluster_riproducibile_dal_seed():
+    cluster, matrice = _make_scenario(1)
+    primo = _make_annealing(seed=8).optimize_cluster(cluster, matrice)
+    secondo = _make_annealing(seed=8).optimize_cluster(cluster, matrice)
+    assert _firma(primo) == _firma(secondo)
+
+
+@pytest.mark.unit
+def test_optimize_cluster_parallelo_identico_al_sequenziale():
+    cluster, matrice = _make_scenario(2)
+    sequenziale = _make_annealing().optimize_cluster(cluster, matrice)
+    parallelo = _make_annealing(numero_worker=2).optimize_cluster(cluster, matrice)
+
+    assert _firma(parallelo) == _firma(sequenziale)
+    originali = {id(s) for s in cluster}
+    assert all(id(m) in originali for e in parallelo for m in e.membri)
+
+
+@pytest.mark.unit
+def test_optimize_cluster_stampa_le_mosse_al_secondo(capsys):
+    cluster, matrice = _make_scenario(3)
+    _make_annealing(epoche=2).optimize_cluster(cluster, matrice)
+
+    out = capsys.readouterr().out
+    assert "Annealing epoca 1/2" in out
+    assert "Annealing epoca 2/2" in out
+    assert "mosse/s" in out
+
+
+def _costo(kernel, equipaggi):
+    posizioni = {id(s): p for p, s in enumerate(kernel.studenti)}
+    soluzione = [[posizioni[id(m)] for m in e.membri] for e in equipaggi]
+    return _Isola(kernel, 4, 300, soluzione).costo
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("seed", [5, 6])
+def test_optimize_cluster_mai_peggiore_della_partenza(seed):
+    cluster, matrice = _make_scenario(seed, 80)
+    kernel = ClusterKernel.build(cluster, matrice, "DALMINE")
+    greedy = GreedyOptimizer(4, 180, 300).optimize_cluster(cluster, matrice)
+    risultato = _make_annealing(epoche=3).optimize_cluster(cluster, matrice)
+    assert _costo(kernel, risultato) <= _costo(kernel, greedy) + 1e-6
+
+
+@pytest.mark.unit
+def test_optimize_cluster_conserva_la_migliore_delle_epoche_precedenti(monkeypatch):
+    # Dalla seconda epoca le isole restituiscono solo auto singole (peggiori)
+    originale = AnnealingOptimizer._esegui_isole
+    prima_epoca = []
+
+    def esegui_isole(self, executor, kernel, soluzioni, semi, epoca):
+        if epoca == 0:
+            prima_epoca.extend(originale(self, executor, kernel, soluzioni, semi, 0))
+            return prima_epoca
+        singole = [[p] for p in range(kernel.n_studenti)]
+        costo = _Isola(kernel, 4, 300, singole).costo
+        return [(singole, singole, costo, 0) for _ in soluzioni]
+
+    monkeypatch.setattr(AnnealingOptimizer, "_esegui_isole", esegui_isole)
+    cluster, matrice = _make_scenario(6, 80)
+    kernel = ClusterKernel.build(cluster, matrice, "DALMINE")
+    greedy = GreedyOptimizer(4, 180, 300).optimize_cluster(cluster, matrice)
+
+    risultato = _make_annealing(epoche=3).optimize_cluster(cluster, matrice)
+    migliore_prima_epoca = min(costo for _, _, costo, _ in prima_epoca)
+    assert _costo(kernel, risultato) == pytest.approx(migliore_prima_epoca)
+    assert _costo(kernel, risultato) <= _costo(kernel, greedy)
+
+
+@pytest.mark.unit
+def test_migrazione_ad_anello_prende_la_vicina_solo_se_migliore():
+    correnti = [[[0]], [[1]], [[2]]]
+    migliori = [(10.0, [["m0"]]), (5.0, [["m1"]]), (7.0, [["m2"]])]
+
+    nuove = AnnealingOptimizer._migra(correnti, migliori)
+
+    # Isola 0 riceve dalla 2 (7 < 10), la 1 tiene la sua, la 2 riceve dalla 1
+    assert nuove == [[["m2"]], [[1]], [["m1"]]]
+
+
+@pytest.mark.unit
+def test_isola_costo_incrementale_coincide_con_il_ricalcolo():
+    cluster, matrice = _make_scenario(4)
+    kernel = ClusterKernel.build(cluster, matrice, "DALMINE")
+    posizioni = {id(s): p for p, s in enumerate(kernel.studenti)}
+    greedy = GreedyOptimizer(4, 180, 300).optimize_cluster(cluster, matrice)
+    isola = _Isola(kernel, 4, 300, [[posizioni[id(m)] for m in e.membri] for e in greedy])
+
+    rng = random.Random(0)
+    for _ in range(3000):
+        p = rng.randrange(kernel.n_studenti)
+        isola.mossa(p, [rng.random() for _ in range(4)], 200.0)
+
+    ricalcolata = _Isola(kernel, 4, 300, isola.soluzione())
+    assert isola.costo == pytest.approx(ricalcolata.costo)
+
+
+@pytest.mark.unit
+def test_isola_auto_con_durate_mancanti_restano_ferme_e_fuori_dal_costo():
+    cluster, matrice = _make_scenario(4)
+    greedy = GreedyOptimizer(4, 180, 300).optimize_cluster(cluster, matrice)
+    auto = next(e for e in greedy if len(set(e.percorso_tappe)) > 2)
+    a, b = list(dict.fromkeys(auto.percorso_tappe))[:2]
+
+    # Stessi studenti, ma senza la durata tra le prime due tappe di quell'auto
+    cluster, matrice = _make_scenario(4, senza={(a, b), (b, a)})
+    kernel = ClusterKernel.build(cluster, matrice, "DALMINE")
+    posizioni = {s.email: p for p, s in enumerate(kernel.studenti)}
+    soluzione = [[posizioni[m.email] for m in e.membri] for e in greedy]
+    isola = _Isola(kernel, 4, 300, soluzione)
+    indice = greedy.index(auto)
+    bloccata = soluzione[indice]
+    # Percorso non gratuito per l'annealing, ma fuori dal costo totale
+    assert _Isola._costo_auto(len(bloccata), isola.rotte[indice]) == math.inf
+    assert math.isfinite(isola.costo)
+
+    rng = random.Random(0)
+    for _ in range(3000):
+        p = rng.randrange(kernel.n_studenti)
+        isola.mossa(p, [rng.random() for _ in range(4)], 200.0)
+
+    assert sorted(bloccata) in [sorted(m) for m in isola.soluzione()]
+    assert isola.costo == pytest.approx(_Isola(kernel, 4, 300, isola.soluzione()).costo)
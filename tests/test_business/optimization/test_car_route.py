@@ -0,0 +1,165 @@
+import math
+import numpy as np
+import pytest
+from unittest.mock import MagicMock
+from src.business.optimization.car_route import CarRoute
+from src.business.optimization.cluster_kernel import ClusterKernel
+from src.data.models.duration_matrix import DurationMatrix
+
+
+def _make_studente(localita: str, corso: str = "Ingegneria"):
+    s = MagicMock()
+    s.localita = localita
+    s.corso = corso
+    return s
+
+
+def _make_kernel(punti: dict) -> ClusterKernel:
+    """Durate euclidee tra punti (DALMINE incluso)"""
+    dati = {}
+    for a, (xa, ya) in punti.items():
+        for b, (xb, yb) in punti.items():
+            if a != b:
+                durata = math.hypot(xa - xb, ya - yb)
+                dati[f"{a}-{b}"] = {"durata_sec": durata, "distanza_m": 0}
+    matrice = DurationMatrix.from_cache_dict(dati)
+    studenti = [_make_studente(loc) for loc in punti if loc != "DALMINE"]
+    return ClusterKernel.build(studenti, matrice, "DALMINE")
+
+
+def _id(kernel, loc):
+    return kernel.localita.index(loc)
+
+
+@pytest.mark.unit
+def test_percorso_solo_autista_costa_il_diretto():
+    kernel = _make_kernel({"A": (0, 100), "DALMINE": (0, 0)})
+    rotta = CarRoute(kernel, _id(kernel, "A"))
+    assert rotta.costo == pytest.approx(100)
+    assert rotta.deviazione == pytest.approx(0)
+
+
+@pytest.mark.unit
+def test_inserimento_sceglie_la_posizione_piu_economica():
+    kernel = _make_kernel(
+        {"A": (0, 300), "B": (0, 100), "C": (0, 200), "DALMINE": (0, 0)}
+    )
+    rotta = CarRoute(kernel, _id(kernel, "A"))
+    rotta.inserisci(_id(kernel, "B"))
+    delta, posizione = rotta.costo_inserimento(_id(kernel, "C"))
+
+    # C sta tra A e B sulla stessa retta: nessun costo aggiuntivo
+    assert delta == pytest.approx(0)
+    assert posizione == 1
+
+
+@pytest.mark.unit
+def test_inserimento_localita_presente_costa_zero():
+    kernel = _make_kernel({"A": (0, 300), "B": (50, 100), "DALMINE": (0, 0)})
+    rotta = CarRoute(kernel, _id(kernel, "A"))
+    rotta.inserisci(_id(kernel, "B"))
+    costo = rotta.costo
+
+    assert rotta.costo_inserimento(_id(kernel, "B")) == (0.0, None)
+    assert rotta.inserisci(_id(kernel, "B")) == 0.0
+    assert rotta.costo == costo
+    assert len(rotta.tappe) == 2
+
+
+@pytest.mark.unit
+def test_rimozione_tappa_intermedia_ripristina_il_costo():
+    kernel = _make_kernel({"A": (0, 300), "B": (80, 150), "DALMINE": (0, 0)})
+    rotta = CarRoute(kernel, _id(kernel, "A"))
+    rotta.inserisci(_id(kernel, "B"))
+    assert rotta.deviazione > 0
+
+    rotta.rimuovi(_id(kernel, "B"))
+    assert rotta.tappe == [_id(kernel, "A")]
+    assert rotta.costo == pytest.approx(300)
+
+
+@pytest.mark.unit
+def test_rimozione_autista_fa_ripartire_dalla_tappa_successiva():
+    kernel = _make_kernel({"A": (0, 300), "B": (80, 150), "DALMINE": (0, 0)})
+    rotta = CarRoute(kernel, _id(kernel, "A"))
+    rotta.inserisci(_id(kernel, "B"))
+
+    rotta.rimuovi(_id(kernel, "A"))
+    assert rotta.tappe == [_id(kernel, "B")]
+    assert rotta.costo == pytest.approx(rotta.diretto)
+    assert rotta.deviazione == pytest.approx(0)
+
+
+@pytest.mark.unit
+def test_arco_mancante_rende_il_percorso_infinito():
+    matrice = DurationMatrix.from_cache_dict(
+        {
+            "A-DALMINE": {"durata_sec": 300, "distanza_m": 0},
+            "B-DALMINE": {"durata_sec": 200, "distanza_m": 0},
+        }
+    )
+    kernel = ClusterKernel.build(
+        [_make_studente("A"), _make_studente("B")], matrice, "DALMINE"
+    )
+    rotta = CarRoute(kernel, _id(kernel, "A"))
+    rotta.inserisci(_id(kernel, "B"))
+
+    assert rotta.tappe == [_id(kernel, "A"), _id(kernel, "B")]
+    assert rotta.costo == float("inf")
+
+
+@pytest.mark.unit
+def test_da_tappe_rispetta_l_ordine_dato():
+    kernel = _make_kernel({"A": (0, 300), "B": (0, 100), "DALMINE": (0, 0)})
+    rotta = CarRoute.da_tappe(kernel, [_id(kernel, "B"), _id(kernel, "A")])
+
+    # B -> A -> DALMINE: 200 + 300, deviazione rispetto ai 100 del diretto
+    assert rotta.tappe == [_id(kernel, "B"), _id(kernel, "A")]
+    assert rotta.costo == pytest.approx(500)
+    assert rotta.deviazione == pytest.approx(400)
+
+
+@pytest.mark.unit
+def test_copia_e_indipendente():
+    kernel = _make_kernel({"A": (0, 300), "B": (80, 150), "DALMINE": (0, 0)})
+    rotta = CarRoute(kernel, _id(kernel, "A"))
+    copia = rotta.copia()
+    copia.inserisci(_id(kernel, "B"))
+
+    assert rotta.tappe == [_id(kernel, "A")]
+    assert rotta.costo == pytest.approx(300)
+
+
+@pytest.mark.unit
+def test_costi_inserimento_vettoriale_coincide_con_scalare():
+    kernel = _make_kernel(
+        {
+            "A": (0, 300),
+            "B": (80, 150),
+            "C": (-40, 200),
+            "D": (120, 40),
+            "DALMINE": (0, 0),
+        }
+    )
+    rotta = CarRoute(kernel, _id(kernel, "A"))
+    rotta.inserisci(_id(kernel, "B"))
+
+    costi = rotta.costi_inserimento()
+    for loc in range(len(kernel.localita)):
+        assert costi[loc] == rotta.costo_inserimento(loc)[0]
+    assert costi[_id(kernel, "A")] == 0
+    assert costi[_id(kernel, "B")] == 0
+
+
+@pytest.mark.unit
+def test_costi_inserimento_su_sottoinsieme_di_localita():
+    kernel = _make_kernel(
+        {"A": (0, 300), "B": (80, 150), "C": (-40, 200), "DALMINE": (0, 0)}
+    )
+    rotta = CarRoute(kernel, _id(kernel, "A"))
+    rotta.inserisci(_id(kernel, "B"))
+
+    sottoinsieme = np.array([_id(kernel, "C"), _id(kernel, "A")])
+    costi = rotta.costi_inserimento(sottoinsieme)
+    assert costi.tolist() == rotta.costi_inserimento()[sottoinsieme].tolist()
+    assert costi[1] == 0
@@ -0,0 +1,138 @@
+import numpy as np
+import pytest
+from unittest.mock import MagicMock
+from src.business.optimization.cluster_kernel import ClusterKernel
+from src.data.models.duration_matrix import DurationMatrix
+
+
+def _make_studente(localita: str, corso: str = "Ingegneria"):
+    s = MagicMock()
+    s.localita = localita
+    s.corso = corso
+    return s
+
+
+def _make_matrice(definizioni: dict) -> DurationMatrix:
+    return DurationMatrix.from_cache_dict(
+        {k: {"durata_sec": v, "distanza_m": 0} for k, v in definizioni.items()}
+    )
+
+
+def _deviazione(kernel, loc_a, loc_b):
+    a = kernel.localita.index(loc_a)
+    b = kernel.localita.index(loc_b)
+    return kernel.deviazione[a, b]
+
+
+@pytest.mark.unit
+def test_build_ordina_studenti_dal_piu_lontano():
+    s1 = _make_studente("Vicino")
+    s2 = _make_studente("Lontano")
+    matrice = _make_matrice({"Vicino-DALMINE": 300, "Lontano-DALMINE": 1500})
+    kernel = ClusterKernel.build([s1, s2], matrice, "DALMINE")
+    assert kernel.studenti == [s2, s1]
+    assert kernel.n_studenti == 2
+
+
+@pytest.mark.unit
+def test_build_ordinamento_stabile_a_parita_di_durata():
+    s1 = _make_studente("A")
+    s2 = _make_studente("B")
+    s3 = _make_studente("A")
+    matrice = _make_matrice({"A-DALMINE": 600, "B-DALMINE": 600})
+    kernel = ClusterKernel.build([s1, s2, s3], matrice, "DALMINE")
+    assert kernel.studenti == [s1, s2, s3]
+
+
+@pytest.mark.unit
+def test_build_durata_dest_mancante_e_inf_e_va_in_testa():
+    s1 = _make_studente("Bergamo")
+    s2 = _make_studente("Ignota")
+    matrice = _make_matrice({"Bergamo-DALMINE": 1200})
+    kernel = ClusterKernel.build([s1, s2], matrice, "DALMINE")
+    assert kernel.studenti[0] is s2
+    assert kernel.durata_dest[kernel.localita.index("Ignota")] == float("inf")
+
+
+@pytest.mark.unit
+def test_deviazione_formula_corretta():
+    matrice = _make_matrice({"A-B": 400, "B-DALMINE": 300, "A-DALMINE": 600})
+    kernel = ClusterKernel.build(
+        [_make_studente("A"), _make_studente("B")], matrice, "DALMINE"
+    )
+    assert _deviazione(kernel, "A", "B") == pytest.approx((400 + 300) - 600)
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("chiave_mancante", ["A-B", "B-DALMINE", "A-DALMINE"])
+def test_deviazione_inf_se_un_percorso_mancante(chiave_mancante):
+    tutti = {"A-B": 400, "B-DALMINE": 300, "A-DALMINE": 600}
+    matrice = _make_matrice({k: v for k, v in tutti.items() if k != chiave_mancante})
+    kernel = ClusterKernel.build(
+        [_make_studente("A"), _make_studente("B")], matrice, "DALMINE"
+    )
+    assert _deviazione(kernel, "A", "B") == float("inf")
+
+
+@pytest.mark.unit
+def test_deviazione_stessa_localita_zero_anche_senza_dati():
+    kernel = ClusterKernel.build(
+        [_make_studente("A"), _make_studente("A")], _make_matrice({}), "DALMINE"
+    )
+    assert np.all(np.diag(kernel.deviazione) == 0)
+
+
+@pytest.mark.unit
+def test_corsi_mappati_su_id_interi():
+    studenti = [
+        _make_studente("A", "ING"),
+        _make_studente("A", "ECO"),
+        _make_studente("A", "ING"),
+    ]
+    kernel = ClusterKernel.build(studenti, _make_matrice({"A-DALMINE": 1}), "DALMINE")
+    assert kernel.n_corsi == 2
+    assert kernel.corso[0] == kernel.corso[2]
+    assert kernel.corso[0] != kernel.corso[1]
+
+
+@pytest.mark.unit
+def test_build_cluster_vuoto():
+    kernel = ClusterKernel.build([], _make_matrice({}), "DALMINE")
+    assert kernel.n_studenti == 0
+    assert kernel.deviazione.shape == (0, 0)
+
+
+@pytest.mark.unit
+def test_build_durate_tra_localita_inf_se_mancante():
+    s1 = _make_studente("A")
+    s2 = _make_studente("B")
+    matrice = _make_matrice({"A-B": 120, "A-DALMINE": 900, "B-DALMINE": 600})
+    kernel = ClusterKernel.build([s1, s2], matrice, "DALMINE")
+
+    a = kernel.localita.index("A")
+    b = kernel.localita.index("B")
+    assert kernel.durate[a, b] == 120
+    assert kernel.durate[b, a] == np.inf
+    assert kernel.durate[a, a] == 0
+
+
+@pytest.mark.unit
+def test_build_coordinate_per_localita():
+    s1 = _make_studente("A")
+    s1.coordinate = (45.7, 9.6)
+    s2 = _make_studente("B")
+    s2.coordinate = (45.5, 9.8)
+    matrice = _make_matrice({"A-DALMINE": 900, "B-DALMINE": 600})
+    kernel = ClusterKernel.build([s1, s2], matrice, "DALMINE")
+    assert kernel.coordinate[kernel.localita.index("A")].tolist() == [45.7, 9.6]
+    assert kernel.coordinate[kernel.localita.index("B")].tolist() == [45.5, 9.8]
+
+
+@pytest.mark.unit
+def test_build_coordinate_none_se_mancanti():
+    s1 = _make_studente("A")
+    s1.coordinate = (45.7, 9.6)
+    s2 = _make_studente("B")
+    s2.coordinate = None
+    matrice = _make_matrice({"A-DALMINE": 900, "B-DALMINE": 600})
+    assert ClusterKernel.build([s1, s2], matrice, "DALMINE").coordinate is None
@@ -0,0 +1,111 @@
+import pytest
+from src.business.optimization.cross_cluster_rebalancer import CrossClusterRebalancer
+from src.data.models import DurationMatrix, Equipaggio, Studente
+
+
+def _make_matrice(definizioni: dict) -> DurationMatrix:
+    return DurationMatrix.from_cache_dict(
+        {k: {"durata_sec": v, "distanza_m": 0} for k, v in definizioni.items()}
+    )
+
+
+def _make_studente(email: str, localita: str, coordinate=(45.65, 9.6)):
+    return Studente(email=email, localita=localita, corso="ING", coordinate=coordinate)
+
+
+def _make_equipaggio(id_: int, *membri: Studente) -> Equipaggio:
+    return Equipaggio(
+        id=id_,
+        autista=membri[0],
+        passeggeri=list(membri[1:]),
+        percorso_tappe=[s.localita for s in membri] + ["DALMINE"],
+    )
+
+
+# A e B vicini: A raccoglie B con 60 sec di deviazione
+_DURATE = {
+    "A-DALMINE": 1000,
+    "B-DALMINE": 900,
+    "A-B": 160,
+    "B-A": 160,
+}
+
+
+@pytest.mark.unit
+def test_fonde_autisti_soli_di_cluster_diversi(capsys):
+    a = _make_studente("a@x", "A", (45.70, 9.60))
+    b = _make_studente("b@x", "B", (45.69, 9.60))
+    risultati = [[_make_equipaggio(1, a)], [_make_equipaggio(1, b)]]
+
+    flotta = CrossClusterRebalancer(4, 300).ribilancia(risultati, _make_matrice(_DURATE))
+
+    assert len(flotta) == 1
+    (fusa,) = flotta
+    assert fusa.autista is a
+    assert fusa.passeggeri == [b]
+    assert fusa.percorso_tappe == ["A", "B", "DALMINE"]
+    assert fusa.durata_percorso_sec == pytest.approx(1060)
+    assert "1 fusioni (2 -> 1 auto)" in capsys.readouterr().out
+
+
+@pytest.mark.unit
+def test_stesso_cluster_non_viene_fuso():
+    a = _make_studente("a@x", "A", (45.70, 9.60))
+    b = _make_studente("b@x", "B", (45.69, 9.60))
+    risultati = [[_make_equipaggio(1, a), _make_equipaggio(2, b)]]
+
+    flotta = CrossClusterRebalancer(4, 300).ribilancia(risultati, _make_matrice(_DURATE))
+
+    assert len(flotta) == 2
+
+
+@pytest.mark.unit
+def test_fuori_raggio_non_viene_valutato():
+    # Circa 11 km di distanza, raggio 300 sec a 50 km/h ≈ 4.2 km
+    a = _make_studente("a@x", "A", (45.70, 9.60))
+    b = _make_studente("b@x", "B", (45.60, 9.60))
+    risultati = [[_make_equipaggio(1, a)], [_make_equipaggio(1, b)]]
+
+    flotta = CrossClusterRebalancer(4, 300).ribilancia(risultati, _make_matrice(_DURATE))
+
+    assert len(flotta) == 2
+
+
+@pytest.mark.unit
+def test_deviazione_eccessiva_o_capacita_superata_non_fondono():
+    a = _make_studente("a@x", "A", (45.70, 9.60))
+    b = _make_studente("b@x", "B", (45.69, 9.60))
+    c = _make_studente("c@x", "B", (45.69, 9.60))
+
+    # Deviazione di 60 sec oltre il massimo di 30
+    lontani = [[_make_equipaggio(1, a)], [_make_equipaggio(1, b)]]
+    assert len(CrossClusterRebalancer(4, 30).ribilancia(lontani, _make_matrice(_DURATE))) == 2
+
+    # 1 + 2 membri in auto da 2 posti
+    pieni = [[_make_equipaggio(1, a)], [_make_equipaggio(1, b, c)]]
+    assert len(CrossClusterRebalancer(2, 300).ribilancia(pieni, _make_matrice(_DURATE))) == 2
+
+
+@pytest.mark.unit
+def test_auto_fusa_puo_fondersi_ancora_con_un_terzo_cluster():
+    durate = dict(_DURATE, **{"C-DALMINE": 950, "A-C": 60, "C-B": 60, "C-A": 60, "B-C": 60})
+    a = _make_studente("a@x", "A", (45.70, 9.60))
+    b = _make_studente("b@x", "B", (45.69, 9.60))
+    c = _make_studente("c@x", "C", (45.695, 9.60))
+    risultati = [[_make_equipaggio(1, a)], [_make_equipaggio(1, b)], [_make_equipaggio(1, c)]]
+
+    flotta = CrossClusterRebalancer(4, 300).ribilancia(risultati, _make_matrice(durate))
+
+    assert len(flotta) == 1
+    assert flotta[0].percorso_tappe == ["A", "C", "B", "DALMINE"]
+
+
+@pytest.mark.unit
+def test_studenti_senza_coordinate_restano_invariati():
+    a = _make_studente("a@x", "A", None)
+    b = _make_studente("b@x", "B", None)
+    risultati = [[_make_equipaggio(1, a)], [_make_equipaggio(1, b)]]
+
+    flotta = CrossClusterRebalancer(4, 300).ribilancia(risultati, _make_matrice(_DURATE))
+
+    assert [e.autista for e in flotta] == [a, b]
@@ -0,0 +1,175 @@
+import math
+import random
+import time
+import pytest
+from unittest.mock import MagicMock
+from src.business.optimization.exact_optimizer import ExactOptimizer, _ripartizioni
+from src.business.optimization.greedy_optimizer import GreedyOptimizer
+from src.data.models.duration_matrix import DurationMatrix
+
+
+def _make_studente(localita: str, corso: str = "Ingegneria"):
+    s = MagicMock()
+    s.localita = localita
+    s.corso = corso
+    return s
+
+
+def _make_durate(punti: dict) -> dict:
+    """Durate euclidee tra punti (DALMINE incluso)"""
+    durate = {}
+    for a, (xa, ya) in punti.items():
+        for b, (xb, yb) in punti.items():
+            if a != b:
+                durate[f"{a}-{b}"] = math.hypot(xa - xb, ya - yb)
+    return durate
+
+
+def _make_matrice(durate: dict) -> DurationMatrix:
+    return DurationMatrix.from_cache_dict(
+        {k: {"durata_sec": v, "distanza_m": 0} for k, v in durate.items()}
+    )
+
+
+def _make_exact(capacita=4, max_dev=300, soglia=40, tempo=5.0):
+    fallback = GreedyOptimizer(capacita, 0, max_dev)
+    return ExactOptimizer(
+        capacita_auto=capacita,
+        max_deviazione_sec=max_dev,
+        fallback=fallback,
+        soglia_studenti=soglia,
+        tempo_limite_sec=tempo,
+    )
+
+
+def _deviazione_percorso(equipaggio, durate):
+    tappe = list(dict.fromkeys(equipaggio.percorso_tappe))
+    costo = sum(durate[f"{a}-{b}"] for a, b in zip(tappe, tappe[1:]))
+    return costo - durate[f"{tappe[0]}-DALMINE"]
+
+
+@pytest.mark.unit
+def test_ripartizioni_rispetta_limiti_e_somma():
+    risultato = sorted(_ripartizioni(2, [1, 2]))
+    assert risultato == [(0, 2), (1, 1)]
+    assert list(_ripartizioni(4, [1, 2])) == []
+
+
+@pytest.mark.unit
+def test_optimize_cluster_batte_il_greedy(capsys):
+    # Il greedy fa salire B con l'autista A e lascia C e D separati;
+    # l'ottimo accoppia A-C e B-D
+    punti = {"A": (0, 1000), "B": (0, 700), "C": (-150, 900), "D": (150, 650)}
+    punti["DALMINE"] = (0, 0)
+    durate = _make_durate(punti)
+    cluster = [_make_studente(loc) for loc in "ABCD"]
+    matrice = _make_matrice(durate)
+
+    greedy = GreedyOptimizer(2, 0, 60).optimize_cluster(cluster, matrice)
+    exact = _make_exact(capacita=2, max_dev=60)
+    risultato = exact.optimize_cluster(cluster, matrice)
+
+    assert len(greedy) == 3
+    assert len(risultato) == 2
+    assert "ottimo dimostrato" in capsys.readouterr().out
+    for equipaggio in risultato:
+        assert _deviazione_percorso(equipaggio, durate) <= 60 + 1e-6
+        assert equipaggio.durata_percorso_sec is not None
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("seed", range(3))
+def test_optimize_cluster_rispetta_vincoli_e_non_peggiora(seed):
+    rng = random.Random(seed)
+    punti = {f"L{i}": (rng.uniform(-800, 800), rng.uniform(-800, 800)) for i in range(12)}
+    punti["DALMINE"] = (0, 0)
+    durate = _make_durate(punti)
+    matrice = _make_matrice(durate)
+    cluster = [_make_studente(rng.choice(list(punti)[:-1])) for _ in range(25)]
+
+    greedy = GreedyOptimizer(4, 0, 300).optimize_cluster(cluster, matrice)
+    risultato = _make_exact().optimize_cluster(cluster, matrice)
+
+    assert math.ceil(len(cluster) / 4) <= len(risultato) <= len(greedy)
+    assert sorted(id(s) for e in risultato for s in e.membri) == sorted(map(id, cluster))
+    for equipaggio in risultato:
+        assert equipaggio.capacita_utilizzata <= 4
+        assert _deviazione_percorso(equipaggio, durate) <= 300 + 1e-6
+
+
+@pytest.mark.unit
+def test_optimize_cluster_oltre_soglia_usa_il_fallback():
+    fallback = MagicMock()
+    attesi = [MagicMock()]
+    fallback.optimize_cluster.return_value = attesi
+    exact = ExactOptimizer(4, 300, fallback, soglia_studenti=2)
+
+    cluster = [_make_studente("A") for _ in range(3)]
+    matrice = MagicMock()
+    assert exact.optimize_cluster(cluster, matrice) is attesi
+    fallback.optimize_cluster.assert_called_once_with(cluster, matrice)
+
+
+@pytest.mark.unit
+def test_optimize_cluster_tempo_scaduto_riporta_gap(capsys):
+    rng = random.Random(1)
+    punti = {f"L{i}": (rng.uniform(-800, 800), rng.uniform(-800, 800)) for i in range(12)}
+    punti["DALMINE"] = (0, 0)
+    matrice = _make_matrice(_make_durate(punti))
+    cluster = [_make_studente(rng.choice(list(punti)[:-1])) for _ in range(25)]
+
+    greedy = GreedyOptimizer(4, 0, 300).optimize_cluster(cluster, matrice)
+    risultato = _make_exact(tempo=0).optimize_cluster(cluster, matrice)
+
+    assert len(risultato) == len(greedy)
+    gap = len(greedy) - math.ceil(len(cluster) / 4)
+    output = capsys.readouterr().out
+    if gap:
+        assert f"gap dimostrato ≤ {gap} auto" in output
+    else:
+        assert "ottimo dimostrato" in output
+
+
+@pytest.mark.unit
+def test_optimize_cluster_durate_mancanti_usa_il_fallback(capsys):
+    cluster = [_make_studente("A"), _make_studente("B")]
+    matrice = _make_matrice({"A-DALMINE": 500})
+
+    risultato = _make_exact().optimize_cluster(cluster, matrice)
+
+    assert len(risultato) == 2
+    assert "gap" in capsys.readouterr().out
+
+
+@pytest.mark.unit
+def test_optimize_cluster_minimo_relativo_ai_tipi_enumerati(capsys):
+    # A e B troppo lontane per condividere l'auto: 2 auto contro il limite di 1
+    punti = {"A": (0, 1000), "B": (1000, 0), "DALMINE": (0, 0)}
+    matrice = _make_matrice(_make_durate(punti))
+
+    risultato = _make_exact().optimize_cluster(
+        [_make_studente("A"), _make_studente("B")], matrice
+    )
+
+    assert len(risultato) == 2
+    output = capsys.readouterr().out
+    assert "minimo sui tipi di equipaggio enumerati" in output
+    assert "ottimo dimostrato" not in output
+
+
+@pytest.mark.unit
+def test_optimize_cluster_scadenza_durante_l_enumerazione(capsys):
+    # 40 località vicine: le combinazioni da enumerare sono decine di migliaia
+    rng = random.Random(0)
+    punti = {f"L{i}": (rng.uniform(900, 1100), rng.uniform(900, 1100)) for i in range(40)}
+    punti["DALMINE"] = (0, 0)
+    matrice = _make_matrice(_make_durate(punti))
+    cluster = [_make_studente(f"L{i}") for i in range(40)]
+
+    greedy = GreedyOptimizer(4, 0, 300).optimize_cluster(cluster, matrice)
+    inizio = time.perf_counter()
+    risultato = _make_exact(tempo=0.2).optimize_cluster(cluster, matrice)
+
+    assert time.perf_counter() - inizio < 2.0
+    assert len(risultato) == len(greedy)
+    assert "tempo scaduto nell'enumerazione" in capsys.readouterr().out
@@ -0,0 +1,125 @@
+import math
+import random
+import time
+from concurrent import futures
+import numpy as np
+import pytest
+from src.business.optimization import grasp_optimizer
+from src.business.optimization.cluster_kernel import ClusterKernel
+from src.business.optimization.grasp_optimizer import GraspOptimizer
+from src.business.optimization.greedy_optimizer import GreedyOptimizer
+from src.data.models import DurationMatrix, Studente
+
+
+def _make_scenario(seed: int, n_studenti: int = 60):
+    rng = random.Random(seed)
+    punti = {f"L{i}": (rng.uniform(-800, 800), rng.uniform(-800, 800)) for i in range(20)}
+    punti["DALMINE"] = (0, 0)
+    dati = {}
+    for a, (xa, ya) in punti.items():
+        for b, (xb, yb) in punti.items():
+            if a != b:
+                dati[f"{a}-{b}"] = {
+                    "durata_sec": math.hypot(xa - xb, ya - yb),
+                    "distanza_m": 0,
+                }
+    cluster = [
+        Studente(
+            email=f"s{i}@unibg.it",
+            localita=rng.choice(list(punti)[:-1]),
+            corso=rng.choice(["ING", "ECO", "INF"]),
+        )
+        for i in range(n_studenti)
+    ]
+    return cluster, DurationMatrix.from_cache_dict(dati)
+
+
+def _firma(equipaggi):
+    return [[m.email for m in e.membri] for e in equipaggi]
+
+
+def _make_grasp(**kwargs):
+    return GraspOptimizer(GreedyOptimizer(4, 180, 300), **kwargs)
+
+
+@pytest.mark.unit
+def test_optimize_cluster_riproducibile_dal_seed():
+    cluster, matrice = _make_scenario(0)
+    primo = _make_grasp(iterazioni=15, seed=11).optimize_cluster(cluster, matrice)
+    secondo = _make_grasp(iterazioni=15, seed=11).optimize_cluster(cluster, matrice)
+    assert _firma(primo) == _firma(secondo)
+
+
+@pytest.mark.unit
+def test_optimize_cluster_mai_peggio_del_greedy():
+    cluster, matrice = _make_scenario(1)
+    greedy = GreedyOptimizer(4, 180, 300).optimize_cluster(cluster, matrice)
+    risultato = _make_grasp(iterazioni=20).optimize_cluster(cluster, matrice)
+
+    assert len(risultato) <= len(greedy)
+    assert sorted(s.email for e in risultato for s in e.membri) == sorted(
+        s.email for s in cluster
+    )
+    assert all(e.capacita_utilizzata <= 4 for e in risultato)
+    assert [e.id for e in risultato] == list(range(1, len(risultato) + 1))
+
+
+@pytest.mark.unit
+def test_optimize_cluster_tempo_esaurito_restituisce_il_greedy(capsys):
+    cluster, matrice = _make_scenario(2)
+    greedy = GreedyOptimizer(4, 180, 300).optimize_cluster(cluster, matrice)
+    risultato = _make_grasp(iterazioni=50, tempo_limite_sec=1e-9).optimize_cluster(
+        cluster, matrice
+    )
+
+    assert _firma(risultato) == _firma(greedy)
+    assert "GRASP: 1 iterazioni" in capsys.readouterr().out
+
+
+@pytest.mark.unit
+def test_optimize_cluster_parallelo_identico_al_sequenziale():
+    cluster, matrice = _make_scenario(3)
+    sequenziale = _make_grasp(iterazioni=8, seed=5).optimize_cluster(cluster, matrice)
+    parallelo = _make_grasp(iterazioni=8, seed=5, numero_worker=2).optimize_cluster(
+        cluster, matrice
+    )
+
+    assert _firma(parallelo) == _firma(sequenziale)
+    # Gli equipaggi usano gli studenti originali, non copie dai worker
+    originali = {id(s) for s in cluster}
+    assert all(id(m) in originali for e in parallelo for m in e.membri)
+
+
+@pytest.mark.unit
+def test_parallelo_tempo_esaurito_tiene_il_greedy(monkeypatch, capsys):
+    # L'eccezione di concurrent.futures, distinta dal builtin su Python 3.10
+    def as_completed(fs, timeout=None):
+        raise futures.TimeoutError()
+
+    monkeypatch.setattr(grasp_optimizer, "as_completed", as_completed)
+    cluster, matrice = _make_scenario(4)
+    greedy = GreedyOptimizer(4, 180, 300).optimize_cluster(cluster, matrice)
+    risultato = _make_grasp(
+        iterazioni=4, tempo_limite_sec=1e-9, numero_worker=2
+    ).optimize_cluster(cluster, matrice)
+
+    assert _firma(risultato) == _firma(greedy)
+    assert "GRASP: 1 iterazioni" in capsys.readouterr().out
+
+
+@pytest.mark.unit
+def test_worker_salta_i_task_rimasti_in_coda_dopo_la_scadenza(monkeypatch):
+    cluster, matrice = _make_scenario(4)
+    greedy = GreedyOptimizer(4, 180, 300)
+    kernel = ClusterKernel.build(cluster, matrice, greedy.destinazione)
+    seme = np.random.SeedSequence(1)
+    for nome in ("_greedy_worker", "_kernel_worker", "_k_worker", "_scadenza_worker"):
+        monkeypatch.setattr(grasp_optimizer, nome, getattr(grasp_optimizer, nome))
+
+    grasp_optimizer._inizializza_worker(greedy, kernel, 3, time.time() - 1)
+    assert grasp_optimizer._iterazione_worker(seme) is None
+
+    grasp_optimizer._inizializza_worker(greedy, kernel, 3, time.time() + 60)
+    assert grasp_optimizer._iterazione_worker(seme) == grasp_optimizer._iterazione(
+        greedy, kernel, 3, seme
+    )
@@ -1,6 +1,13 @@
 import pytest
+import random
+import numpy as np
 from unittest.mock import MagicMock
 from src.business.optimization.greedy_optimizer import GreedyOptimizer
+from src.business.optimization.spatial_index import proietta_km
+from src.business.optimization.car_route import CarRoute
+from src.business.optimization.cluster_kernel import ClusterKernel
+from src.business.optimization.unassigned_pool import UnassignedPool
+from src.data.models.duration_matrix import DurationMatrix
 
 
 def _make_studente(localita: str, corso: str = "Ingegneria"):
@@ -10,14 +17,100 @@ def _make_studente(localita: str, corso: str = "Ingegneria"):
     return s
 
 
-def _make_percorso(durata_sec: float):
-    p = MagicMock()
-    p.durata_sec = durata_sec
-    return p
+def _make_matrice(definizioni: dict) -> DurationMatrix:
+    return DurationMatrix.from_cache_dict(
+        {k: {"durata_sec": v, "distanza_m": 0} for k, v in definizioni.items()}
+    )
 
 
-def _make_percorsi(definizioni: dict) -> dict:
-    return {k: _make_percorso(v) for k, v in definizioni.items()}
+def _trova(opt, autista, candidati, matrice):
+    kernel = ClusterKernel.build([autista] + candidati, matrice, "DALMINE")
+    posizioni = {id(s): p for p, s in enumerate(kernel.studenti)}
+    non_assegnati = UnassignedPool(kernel.gruppi)
+    pos_autista = non_assegnati.estrai_piu_lontano()
+    assert pos_autista == posizioni[id(autista)]
+    rotta = CarRoute(kernel, int(kernel.loc[pos_autista]))
+    gruppo = opt._trova_miglior_passeggero(
+        kernel,
+        [pos_autista],
+        rotta,
+        non_assegnati,
+    )
+    return None if gruppo is None else kernel.studenti[non_assegnati.testa(gruppo)]
+
+
+def _calcola_tappe(opt, membri, matrice):
+    kernel = ClusterKernel.build(membri, matrice, "DALMINE")
+    posizioni = {id(s): p for p, s in enumerate(kernel.studenti)}
+    membri = sorted(posizioni[id(s)] for s in membri)
+    rotta = CarRoute(kernel, int(kernel.loc[membri[0]]))
+    for p in membri[1:]:
+        rotta.inserisci(int(kernel.loc[p]))
+    return opt._calcola_tappe(kernel, membri, rotta)
+
+
+def _greedy_riferimento(opt, cluster, durate):
+    """
+    Implementazione scalare per-studente, usata come oracolo.
+    Score = inserimento più economico nel percorso dell'auto - bonus;
+    la deviazione cumulata del percorso resta entro max_deviazione.
+    A parità di score preferisce lo stesso (località, corso) dell'ultimo membro.
+    """
+
+    def durata(a, b):
+        return 0.0 if a == b else float(durate.get(f"{a}-{b}", float("inf")))
+
+    def inserimento(percorso, loc):
+        if loc in percorso:
+            return 0.0, None
+        migliore, posizione = float("inf"), len(percorso) - 1
+        for k in range(len(percorso) - 1):
+            esistente = durata(percorso[k], percorso[k + 1])
+            if esistente == float("inf"):
+                continue
+            delta = durata(percorso[k], loc) + durata(loc, percorso[k + 1]) - esistente
+            if delta < migliore:
+                migliore, posizione = delta, k + 1
+        return migliore, posizione
+
+    non_assegnati = sorted(
+        cluster, key=lambda s: durata(s.localita, "DALMINE"), reverse=True
+    )
+    gruppi = []
+    while non_assegnati:
+        membri = [non_assegnati.pop(0)]
+        percorso = [membri[0].localita, "DALMINE"]
+        costo = durata(membri[0].localita, "DALMINE")
+        diretto = costo
+        while len(membri) < opt.capacita_auto and non_assegnati:
+            corsi = {m.corso for m in membri}
+            migliore, miglior_score = None, float("inf")
+            for c in non_assegnati:
+                delta, _ = inserimento(percorso, c.localita)
+                if costo - diretto + delta > opt.max_deviazione:
+                    continue
+                score = delta - (opt.bonus_corso if c.corso in corsi else 0)
+                stesso_gruppo = (c.localita, c.corso) == (
+                    membri[-1].localita,
+                    membri[-1].corso,
+                )
+                if score < miglior_score or (
+                    score == miglior_score
+                    and stesso_gruppo
+                    and (migliore.localita, migliore.corso)
+                    != (membri[-1].localita, membri[-1].corso)
+                ):
+                    migliore, miglior_score = c, score
+            if migliore is None:
+                break
+            delta, posizione = inserimento(percorso, migliore.localita)
+            if posizione is not None:
+                percorso.insert(posizione, migliore.localita)
+                costo += delta
+            membri.append(migliore)
+            non_assegnati.remove(migliore)
+        gruppi.append(membri)
+    return gruppi
 
 
 def _make_optimizer(capacita=4, bonus=300, max_dev=600):
@@ -52,8 +145,8 @@ def test_init_destinazione_custom():
 def test_optimize_cluster_restituisce_lista():
     opt = _make_optimizer()
     s1 = _make_studente("Bergamo")
-    percorsi = _make_percorsi({"Bergamo-DALMINE": 1200})
-    result = opt.optimize_cluster([s1], percorsi)
+    matrice = _make_matrice({"Bergamo-DALMINE": 1200})
+    result = opt.optimize_cluster([s1], matrice)
     assert isinstance(result, list)
 
 
@@ -63,7 +156,7 @@ def test_optimize_cluster_tutti_gli_studenti_assegnati():
     s1 = _make_studente("Bergamo")
     s2 = _make_studente("Brescia")
     s3 = _make_studente("Milano")
-    percorsi = _make_percorsi(
+    matrice = _make_matrice(
         {
             "Bergamo-DALMINE": 1200,
             "Brescia-DALMINE": 900,
@@ -76,7 +169,7 @@ def test_optimize_cluster_tutti_gli_studenti_assegnati():
             "Milano-Brescia": 300,
         }
     )
-    result = opt.optimize_cluster([s1, s2, s3], percorsi)
+    result = opt.optimize_cluster([s1, s2, s3], matrice)
     assegnati = [e.autista for e in result] + [p for e in result for p in e.passeggeri]
     assert len(assegnati) == 3
 
@@ -86,7 +179,7 @@ def test_optimize_cluster_autista_e_il_piu_lontano():
     opt = _make_optimizer(capacita=2)
     s_vicino = _make_studente("Brescia")
     s_lontano = _make_studente("Bergamo")
-    percorsi = _make_percorsi(
+    matrice = _make_matrice(
         {
             "Bergamo-DALMINE": 1200,
             "Brescia-DALMINE": 600,
@@ -94,7 +187,7 @@ def test_optimize_cluster_autista_e_il_piu_lontano():
             "Brescia-Bergamo": 400,
         }
     )
-    result = opt.optimize_cluster([s_vicino, s_lontano], percorsi)
+    result = opt.optimize_cluster([s_vicino, s_lontano], matrice)
     assert result[0].autista is s_lontano
 
 
@@ -102,8 +195,8 @@ def test_optimize_cluster_autista_e_il_piu_lontano():
 def test_optimize_cluster_singolo_studente_crea_un_equipaggio():
     opt = _make_optimizer()
     s1 = _make_studente("Bergamo")
-    percorsi = _make_percorsi({"Bergamo-DALMINE": 1200})
-    result = opt.optimize_cluster([s1], percorsi)
+    matrice = _make_matrice({"Bergamo-DALMINE": 1200})
+    result = opt.optimize_cluster([s1], matrice)
     assert len(result) == 1
     assert result[0].autista is s1
     assert result[0].passeggeri == []
@@ -113,13 +206,13 @@ def test_optimize_cluster_singolo_studente_crea_un_equipaggio():
 def test_optimize_cluster_rispetta_capacita_auto():
     opt = _make_optimizer(capacita=2, max_dev=99999)
     studenti = [_make_studente(f"Loc{i}") for i in range(4)]
-    percorsi = {}
+    durate = {}
     for i in range(4):
-        percorsi[f"Loc{i}-DALMINE"] = 1000 - i * 100
+        durate[f"Loc{i}-DALMINE"] = 1000 - i * 100
         for j in range(4):
             if i != j:
-                percorsi[f"Loc{i}-Loc{j}"] = 100
-    result = opt.optimize_cluster(studenti, _make_percorsi(percorsi))
+                durate[f"Loc{i}-Loc{j}"] = 100
+    result = opt.optimize_cluster(studenti, _make_matrice(durate))
     assert all(len(e.passeggeri) + 1 <= 2 for e in result)
 
 
@@ -128,85 +221,24 @@ def test_optimize_cluster_id_equipaggi_incrementali():
     opt = _make_optimizer(capacita=1)
     s1 = _make_studente("Bergamo")
     s2 = _make_studente("Brescia")
-    percorsi = _make_percorsi(
+    matrice = _make_matrice(
         {
             "Bergamo-DALMINE": 1200,
             "Brescia-DALMINE": 600,
         }
     )
-    result = opt.optimize_cluster([s1, s2], percorsi)
+    result = opt.optimize_cluster([s1, s2], matrice)
     ids = [e.id for e in result]
     assert ids == list(range(1, len(result) + 1))
 
 
-@pytest.mark.unit
-def test_get_durata_a_dest_percorso_presente():
-    opt = _make_optimizer()
-    s = _make_studente("Bergamo")
-    percorsi = _make_percorsi({"Bergamo-DALMINE": 1200})
-    assert opt._get_durata_a_dest(s, percorsi) == pytest.approx(1200)
-
-
-@pytest.mark.unit
-def test_get_durata_a_dest_percorso_mancante():
-    opt = _make_optimizer()
-    s = _make_studente("Bergamo")
-    assert opt._get_durata_a_dest(s, {}) == float("inf")
-
-
-@pytest.mark.unit
-def test_ordina_per_distanza_ordine_decrescente():
-    opt = _make_optimizer()
-    s1 = _make_studente("Vicino")
-    s2 = _make_studente("Lontano")
-    percorsi = _make_percorsi(
-        {
-            "Vicino-DALMINE": 300,
-            "Lontano-DALMINE": 1500,
-        }
-    )
-    result = opt._ordina_per_distanza([s1, s2], percorsi)
-    assert result[0] is s2
-    assert result[1] is s1
-
-
-@pytest.mark.unit
-def test_calcola_deviazione_formula_corretta():
-    opt = _make_optimizer()
-    percorsi = _make_percorsi(
-        {
-            "A-B": 400,
-            "B-DALMINE": 300,
-            "A-DALMINE": 600,
-        }
-    )
-    result = opt._calcola_deviazione("A", "B", percorsi)
-    assert result == pytest.approx((400 + 300) - 600)
-
-
-@pytest.mark.unit
-def test_calcola_deviazione_percorso_mancante_ritorna_inf():
-    opt = _make_optimizer()
-    result = opt._calcola_deviazione("A", "B", {})
-    assert result == float("inf")
-
-
-@pytest.mark.unit
-@pytest.mark.parametrize("chiave_mancante", ["A-B", "B-DALMINE", "A-DALMINE"])
-def test_calcola_deviazione_inf_se_un_percorso_mancante(chiave_mancante):
-    opt = _make_optimizer()
-    tutti = {"A-B": 400, "B-DALMINE": 300, "A-DALMINE": 600}
-    percorsi = _make_percorsi({k: v for k, v in tutti.items() if k != chiave_mancante})
-    assert opt._calcola_deviazione("A", "B", percorsi) == float("inf")
-
-
 @pytest.mark.unit
 def test_trova_miglior_passeggero_stesso_corso_preferito():
     opt = _make_optimizer(bonus=500, max_dev=99999)
     autista = _make_studente("Bergamo", corso="Ingegneria")
     c_stesso_corso = _make_studente("Brescia", corso="Ingegneria")
     c_altro_corso = _make_studente("Milano", corso="Economia")
-    percorsi = _make_percorsi(
+    matrice = _make_matrice(
         {
             "Bergamo-Brescia": 400,
             "Brescia-DALMINE": 300,
@@ -215,9 +247,7 @@ def test_trova_miglior_passeggero_stesso_corso_preferito():
             "Milano-DALMINE": 300,
         }
     )
-    result = opt._trova_miglior_passeggero(
-        [autista], [c_stesso_corso, c_altro_corso], percorsi
-    )
+    result = _trova(opt, autista, [c_stesso_corso, c_altro_corso], matrice)
     assert result is c_stesso_corso
 
 
@@ -226,14 +256,14 @@ def test_trova_miglior_passeggero_esclude_deviazione_eccessiva():
     opt = _make_optimizer(bonus=0, max_dev=100)
     autista = _make_studente("Bergamo")
     candidato = _make_studente("Brescia")
-    percorsi = _make_percorsi(
+    matrice = _make_matrice(
         {
             "Bergamo-Brescia": 500,
             "Brescia-DALMINE": 300,
             "Bergamo-DALMINE": 600,
         }
     )
-    result = opt._trova_miglior_passeggero([autista], [candidato], percorsi)
+    result = _trova(opt, autista, [candidato], matrice)
     assert result is None
 
 
@@ -242,8 +272,8 @@ def test_trova_miglior_passeggero_stessa_localita_deviazione_zero():
     opt = _make_optimizer(bonus=0, max_dev=0)
     autista = _make_studente("Bergamo")
     candidato = _make_studente("Bergamo")
-    percorsi = _make_percorsi({"Bergamo-DALMINE": 600})
-    result = opt._trova_miglior_passeggero([autista], [candidato], percorsi)
+    matrice = _make_matrice({"Bergamo-DALMINE": 600})
+    result = _trova(opt, autista, [candidato], matrice)
     assert result is candidato
 
 
@@ -251,7 +281,7 @@ def test_trova_miglior_passeggero_stessa_localita_deviazione_zero():
 def test_trova_miglior_passeggero_nessun_candidato_ritorna_none():
     opt = _make_optimizer()
     autista = _make_studente("Bergamo")
-    result = opt._trova_miglior_passeggero([autista], [], {})
+    result = _trova(opt, autista, [], _make_matrice({}))
     assert result is None
 
 
@@ -260,13 +290,13 @@ def test_calcola_tappe_termina_con_destinazione():
     opt = _make_optimizer()
     s1 = _make_studente("Bergamo")
     s2 = _make_studente("Brescia")
-    percorsi = _make_percorsi(
+    matrice = _make_matrice(
         {
             "Bergamo-DALMINE": 1200,
             "Brescia-DALMINE": 600,
         }
     )
-    tappe = opt._calcola_tappe([s1, s2], percorsi)
+    tappe = _calcola_tappe(opt, [s1, s2], matrice)
     assert tappe[-1] == "DALMINE"
 
 
@@ -275,13 +305,175 @@ def test_calcola_tappe_ordine_distanza_decrescente():
     opt = _make_optimizer()
     s_vicino = _make_studente("Brescia")
     s_lontano = _make_studente("Bergamo")
-    percorsi = _make_percorsi(
+    matrice = _make_matrice(
         {
             "Bergamo-DALMINE": 1200,
             "Brescia-DALMINE": 600,
         }
     )
-    tappe = opt._calcola_tappe([s_vicino, s_lontano], percorsi)
+    tappe = _calcola_tappe(opt, [s_vicino, s_lontano], matrice)
     assert tappe[0] == "Bergamo"
     assert tappe[1] == "Brescia"
-    assert tappe[2] == "DALMINE"
\ No newline at end of file
+    assert tappe[2] == "DALMINE"
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("seed", range(5))
+def test_optimize_cluster_identico_al_greedy_scalare(seed):
+    # Durate euclidee: rispettano la disuguaglianza triangolare come i tempi
+    # stradali reali, ipotesi sotto cui i gruppi si riempiono in un passo
+    rng = random.Random(seed)
+    localita = [f"Loc{i}" for i in range(12)]
+    punti = {loc: (rng.uniform(0, 30), rng.uniform(0, 30)) for loc in localita}
+    punti["DALMINE"] = (15.0, 15.0)
+    durate = {}
+    for a, (xa, ya) in punti.items():
+        for b, (xb, yb) in punti.items():
+            if a != b and rng.random() < 0.9:
+                durate[f"{a}-{b}"] = 60 * ((xa - xb) ** 2 + (ya - yb) ** 2) ** 0.5
+    cluster = [
+        _make_studente(rng.choice(localita), rng.choice(["ING", "ECO", "INF"]))
+        for _ in range(60)
+    ]
+    opt = _make_optimizer(capacita=4, bonus=180, max_dev=600)
+
+    result = opt.optimize_cluster(cluster, _make_matrice(durate))
+    assert sum(e.capacita_utilizzata for e in result) == len(cluster)
+    atteso = _greedy_riferimento(opt, cluster, durate)
+
+    assert [[e.autista] + e.passeggeri for e in result] == atteso
+
+
+@pytest.mark.unit
+def test_optimize_cluster_limita_la_deviazione_cumulata():
+    # Ogni passeggero aggiunge 200 s rispetto al precedente: la deviazione
+    # a coppie resta sotto soglia, quella del percorso completo no
+    opt = _make_optimizer(capacita=4, bonus=0, max_dev=300)
+    a, b, c = _make_studente("A"), _make_studente("B"), _make_studente("C")
+    matrice = _make_matrice(
+        {
+            "A-DALMINE": 1000,
+            "B-DALMINE": 900,
+            "C-DALMINE": 800,
+            "A-B": 300,
+            "B-C": 300,
+            "A-C": 500,
+            "C-B": 300,
+        }
+    )
+    result = opt.optimize_cluster([a, b, c], matrice)
+    assert [e.membri for e in result] == [[a, b], [c]]
+
+
+@pytest.mark.unit
+def test_optimize_cluster_tappe_in_ordine_di_percorso():
+    # C sta tra A e B: il percorso A -> C -> B è più corto di A -> B -> C
+    opt = _make_optimizer(capacita=3, bonus=0, max_dev=600)
+    a, b, c = _make_studente("A"), _make_studente("B"), _make_studente("C")
+    matrice = _make_matrice(
+        {
+            "A-DALMINE": 1000,
+            "B-DALMINE": 500,
+            "C-DALMINE": 800,
+            "A-B": 500,
+            "A-C": 200,
+            "C-B": 300,
+            "B-C": 300,
+        }
+    )
+    result = opt.optimize_cluster([a, b, c], matrice)
+    assert len(result) == 1
+    assert result[0].percorso_tappe == ["A", "C", "B", "DALMINE"]
+
+
+@pytest.mark.unit
+def test_optimize_cluster_riempie_auto_dallo_stesso_gruppo():
+    opt = _make_optimizer(capacita=4, bonus=180, max_dev=600)
+    vicini = [_make_studente("Bergamo", "ECO") for _ in range(5)]
+    matrice = _make_matrice({"Bergamo-DALMINE": 900})
+    result = opt.optimize_cluster(vicini, matrice)
+    assert [e.capacita_utilizzata for e in result] == [4, 1]
+    assert result[0].membri == vicini[:4]
+
+
+def _make_scenario_geografico(seed, n_localita=40, n_studenti=150):
+    """Località con coordinate e durate proporzionali alla distanza (1 km = 60 s)"""
+    rng = random.Random(seed)
+    punti = {
+        f"Loc{i}": (45.5 + rng.uniform(-0.2, 0.2), 9.6 + rng.uniform(-0.3, 0.3))
+        for i in range(n_localita)
+    }
+    punti["DALMINE"] = (45.65, 9.6)
+    km = dict(zip(punti, proietta_km(np.array(list(punti.values())))))
+    durate = {
+        f"{a}-{b}": 60 * float(np.hypot(*(km[a] - km[b])))
+        for a in punti
+        for b in punti
+        if a != b
+    }
+    cluster = []
+    for _ in range(n_studenti):
+        loc = rng.choice([loc for loc in punti if loc != "DALMINE"])
+        studente = _make_studente(loc, rng.choice(["ING", "ECO", "INF"]))
+        studente.coordinate = punti[loc]
+        cluster.append(studente)
+    return cluster, durate
+
+
+@pytest.mark.unit
+def test_optimize_cluster_k_vicine_oltre_le_localita_identico_al_completo():
+    cluster, durate = _make_scenario_geografico(0, n_localita=10, n_studenti=40)
+    matrice = _make_matrice(durate)
+    completo = _make_optimizer(capacita=4, bonus=180, max_dev=600)
+    ristretto = _make_optimizer(capacita=4, bonus=180, max_dev=600)
+    ristretto.k_localita_vicine = 10
+
+    assert [e.membri for e in ristretto.optimize_cluster(cluster, matrice)] == [
+        e.membri for e in completo.optimize_cluster(cluster, matrice)
+    ]
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("seed", range(3))
+def test_optimize_cluster_k_vicine_soluzione_valida(seed):
+    cluster, durate = _make_scenario_geografico(seed)
+    opt = _make_optimizer(capacita=4, bonus=180, max_dev=600)
+    opt.k_localita_vicine = 5
+
+    result = opt.optimize_cluster(cluster, _make_matrice(durate))
+
+    membri = [s for e in result for s in e.membri]
+    assert sorted(map(id, membri)) == sorted(map(id, cluster))
+    for e in result:
+        assert e.capacita_utilizzata <= 4
+        tappe = e.percorso_tappe
+        durata = sum(
+            durate.get(f"{a}-{b}", 0.0) for a, b in zip(tappe, tappe[1:])
+        )
+        assert durata - durate[f"{tappe[0]}-DALMINE"] <= 600 + 1e-6
+
+
+@pytest.mark.unit
+def test_optimize_cluster_k_vicine_cerca_solo_tra_le_localita_vicine():
+    # C è lungo il tragitto (inserimento gratuito) ma lontana in linea d'aria;
+    # con k = 1 l'autista di A guarda solo B, la località più vicina
+    opt = _make_optimizer(capacita=2, bonus=0, max_dev=600)
+    a, b, c = _make_studente("A"), _make_studente("B"), _make_studente("C")
+    a.coordinate, b.coordinate, c.coordinate = (45.0, 9.0), (45.01, 9.0), (45.5, 9.0)
+    matrice = _make_matrice(
+        {
+            "A-DALMINE": 1000,
+            "B-DALMINE": 900,
+            "C-DALMINE": 500,
+            "A-B": 200,
+            "A-C": 500,
+            "B-A": 200,
+            "B-C": 400,
+            "C-A": 500,
+            "C-B": 400,
+        }
+    )
+    assert opt.optimize_cluster([a, b, c], matrice)[0].membri == [a, c]
+
+    opt.k_localita_vicine = 1
+    assert opt.optimize_cluster([a, b, c], matrice)[0].membri == [a, b]
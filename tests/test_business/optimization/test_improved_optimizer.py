@@ -0,0 +1,43 @@
+import pytest
+from unittest.mock import MagicMock
+from src.business.optimization.improved_optimizer import ImprovedOptimizer
+from src.data.models.equipaggio import Equipaggio
+
+
+def _make_equipaggio(equipaggio_id: int):
+    return Equipaggio(id=equipaggio_id, autista=MagicMock(), passeggeri=[])
+
+
+@pytest.mark.unit
+def test_optimize_cluster_applica_i_miglioramenti_in_ordine():
+    iniziali = [_make_equipaggio(1), _make_equipaggio(2)]
+    intermedi = [_make_equipaggio(7)]
+    finali = [_make_equipaggio(5), _make_equipaggio(9)]
+
+    optimizer = MagicMock()
+    optimizer.optimize_cluster.return_value = iniziali
+    primo = MagicMock()
+    primo.migliora.return_value = intermedi
+    secondo = MagicMock()
+    secondo.migliora.return_value = finali
+
+    cluster, matrice = [MagicMock()], MagicMock()
+    risultato = ImprovedOptimizer(optimizer, [primo, secondo]).optimize_cluster(
+        cluster, matrice
+    )
+
+    optimizer.optimize_cluster.assert_called_once_with(cluster, matrice)
+    primo.migliora.assert_called_once_with(iniziali, matrice)
+    secondo.migliora.assert_called_once_with(intermedi, matrice)
+    assert risultato is finali
+    assert [e.id for e in risultato] == [1, 2]
+
+
+@pytest.mark.unit
+def test_optimize_cluster_senza_miglioramenti_restituisce_la_base():
+    iniziali = [_make_equipaggio(1)]
+    optimizer = MagicMock()
+    optimizer.optimize_cluster.return_value = iniziali
+
+    risultato = ImprovedOptimizer(optimizer, []).optimize_cluster([], MagicMock())
+    assert risultato is iniziali
@@ -0,0 +1,150 @@
+import math
+import random
+import pytest
+from unittest.mock import MagicMock
+from src.business.optimization.greedy_optimizer import GreedyOptimizer
+from src.business.optimization.local_search import LocalSearchImprover
+from src.data.models.duration_matrix import DurationMatrix
+from src.data.models.equipaggio import Equipaggio
+
+
+def _make_studente(localita: str, corso: str = "Ingegneria"):
+    s = MagicMock()
+    s.localita = localita
+    s.corso = corso
+    return s
+
+
+def _make_durate(punti: dict) -> dict:
+    """Durate euclidee tra punti (DALMINE incluso)"""
+    durate = {}
+    for a, (xa, ya) in punti.items():
+        for b, (xb, yb) in punti.items():
+            if a != b:
+                durate[f"{a}-{b}"] = math.hypot(xa - xb, ya - yb)
+    return durate
+
+
+def _make_matrice(durate: dict) -> DurationMatrix:
+    return DurationMatrix.from_cache_dict(
+        {k: {"durata_sec": v, "distanza_m": 0} for k, v in durate.items()}
+    )
+
+
+def _make_equipaggi(*gruppi):
+    return [
+        Equipaggio(id=i, autista=membri[0], passeggeri=list(membri[1:]))
+        for i, membri in enumerate(gruppi, 1)
+    ]
+
+
+def _deviazione_percorso(equipaggio, durate):
+    """Deviazione del percorso lungo le tappe distinte rispetto al diretto"""
+    tappe = list(dict.fromkeys(equipaggio.percorso_tappe))
+    costo = sum(durate.get(f"{a}-{b}", 0) for a, b in zip(tappe, tappe[1:]))
+    return costo - durate[f"{tappe[0]}-DALMINE"]
+
+
+@pytest.mark.unit
+def test_migliora_fonde_due_auto_semivuote():
+    durate = _make_durate({"A": (0, 900), "B": (0, 600), "DALMINE": (0, 0)})
+    a1, a2, b1 = _make_studente("A"), _make_studente("A"), _make_studente("B")
+    equipaggi = _make_equipaggi([a1, a2], [b1])
+
+    ls = LocalSearchImprover(capacita_auto=4, max_deviazione_sec=300, tempo_limite_sec=5)
+    risultato = ls.migliora(equipaggi, _make_matrice(durate))
+
+    assert len(risultato) == 1
+    assert risultato[0].autista in (a1, a2)
+    assert set(map(id, risultato[0].membri)) == {id(a1), id(a2), id(b1)}
+    assert risultato[0].percorso_tappe == ["A", "A", "B", "DALMINE"]
+
+
+@pytest.mark.unit
+def test_migliora_non_supera_max_deviazione():
+    durate = _make_durate({"A": (0, 900), "B": (900, 0), "DALMINE": (0, 0)})
+    equipaggi = _make_equipaggi([_make_studente("A")], [_make_studente("B")])
+
+    ls = LocalSearchImprover(capacita_auto=4, max_deviazione_sec=300, tempo_limite_sec=5)
+    risultato = ls.migliora(equipaggi, _make_matrice(durate))
+
+    assert len(risultato) == 2
+
+
+@pytest.mark.unit
+def test_migliora_non_sposta_da_un_auto_che_resta_fuori_soglia():
+    # A -> C devia di ~620 s: togliere uno dei due C lascia l'auto fuori soglia
+    durate = _make_durate(
+        {"A": (0, 900), "C": (600, 600), "B": (900, 900), "DALMINE": (0, 0)}
+    )
+    fuori_soglia = [_make_studente("A"), _make_studente("C"), _make_studente("C")]
+    lungo_strada = [_make_studente("B") for _ in range(3)]
+    equipaggi = _make_equipaggi(fuori_soglia, lungo_strada)
+
+    ls = LocalSearchImprover(capacita_auto=4, max_deviazione_sec=300, tempo_limite_sec=5)
+    risultato = ls.migliora(equipaggi, _make_matrice(durate))
+
+    assert [set(map(id, e.membri)) for e in risultato] == [
+        set(map(id, fuori_soglia)),
+        set(map(id, lungo_strada)),
+    ]
+
+
+@pytest.mark.unit
+def test_migliora_non_supera_capacita():
+    durate = _make_durate({"A": (0, 900), "DALMINE": (0, 0)})
+    equipaggi = _make_equipaggi(
+        [_make_studente("A") for _ in range(3)], [_make_studente("A") for _ in range(3)]
+    )
+
+    ls = LocalSearchImprover(capacita_auto=4, max_deviazione_sec=300, tempo_limite_sec=5)
+    risultato = ls.migliora(equipaggi, _make_matrice(durate))
+
+    assert len(risultato) == 2
+    assert sorted(e.capacita_utilizzata for e in risultato) == [2, 4]
+
+
+@pytest.mark.unit
+def test_migliora_con_budget_nullo_non_applica_mosse():
+    durate = _make_durate({"A": (0, 900), "DALMINE": (0, 0)})
+    equipaggi = _make_equipaggi([_make_studente("A")], [_make_studente("A")])
+
+    ls = LocalSearchImprover(capacita_auto=4, max_deviazione_sec=300, tempo_limite_sec=0)
+    risultato = ls.migliora(equipaggi, _make_matrice(durate))
+
+    assert len(risultato) == 2
+    assert [e.id for e in risultato] == [1, 2]
+
+
+@pytest.mark.unit
+def test_migliora_singolo_equipaggio_invariato():
+    equipaggi = _make_equipaggi([_make_studente("A")])
+    ls = LocalSearchImprover(capacita_auto=4, max_deviazione_sec=300, tempo_limite_sec=5)
+    assert ls.migliora(equipaggi, MagicMock()) is equipaggi
+
+
+@pytest.mark.unit
+def test_migliora_dopo_greedy_rispetta_i_vincoli():
+    rng = random.Random(3)
+    punti = {f"L{i}": (rng.uniform(-800, 800), rng.uniform(-800, 800)) for i in range(25)}
+    punti["DALMINE"] = (0, 0)
+    durate = _make_durate(punti)
+    matrice = _make_matrice(durate)
+    cluster = [
+        _make_studente(rng.choice(list(punti)[:-1]), rng.choice(["ING", "ECO"]))
+        for _ in range(60)
+    ]
+
+    greedy = GreedyOptimizer(4, 180, 300).optimize_cluster(cluster, matrice)
+    originali = {frozenset(map(id, e.membri)) for e in greedy}
+
+    ls = LocalSearchImprover(capacita_auto=4, max_deviazione_sec=300, tempo_limite_sec=5)
+    risultato = ls.migliora(greedy, matrice)
+
+    assert len(risultato) <= len(greedy)
+    assert sorted(id(s) for e in risultato for s in e.membri) == sorted(map(id, cluster))
+    for equipaggio in risultato:
+        assert equipaggio.capacita_utilizzata <= 4
+        # Le auto toccate dalla ricerca locale rispettano la deviazione
+        if frozenset(map(id, equipaggio.membri)) not in originali:
+            assert _deviazione_percorso(equipaggio, durate) <= 300 + 1e-6
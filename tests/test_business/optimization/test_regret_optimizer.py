@@ -0,0 +1,138 @@
+import math
+import random
+import time
+import pytest
+from unittest.mock import MagicMock
+from src.business.optimization.car_route import CarRoute
+from src.business.optimization.cluster_kernel import ClusterKernel
+from src.business.optimization.greedy_optimizer import GreedyOptimizer
+from src.business.optimization.regret_optimizer import RegretOptimizer
+from src.data.models import DurationMatrix, Studente
+
+
+def _make_studente(localita: str, corso: str = "Ingegneria"):
+    s = MagicMock()
+    s.localita = localita
+    s.corso = corso
+    return s
+
+
+def _make_matrice(definizioni: dict) -> DurationMatrix:
+    return DurationMatrix.from_cache_dict(
+        {k: {"durata_sec": v, "distanza_m": 0} for k, v in definizioni.items()}
+    )
+
+
+def _make_scenario(seed: int, n_studenti: int, n_localita: int):
+    rng = random.Random(seed)
+    punti = {
+        f"L{i}": (rng.uniform(-800, 800), rng.uniform(-800, 800))
+        for i in range(n_localita)
+    }
+    punti["DALMINE"] = (0, 0)
+    dati = {}
+    for a, (xa, ya) in punti.items():
+        for b, (xb, yb) in punti.items():
+            if a != b:
+                dati[f"{a}-{b}"] = {
+                    "durata_sec": math.hypot(xa - xb, ya - yb),
+                    "distanza_m": 0,
+                }
+    cluster = [
+        Studente(
+            email=f"s{i}@unibg.it",
+            localita=rng.choice(list(punti)[:-1]),
+            corso=rng.choice(["ING", "ECO", "INF"]),
+        )
+        for i in range(n_studenti)
+    ]
+    return cluster, DurationMatrix.from_cache_dict(dati)
+
+
+def _verifica_vincoli(equipaggi, cluster, matrice, capacita, max_deviazione):
+    assert sorted(s.email for e in equipaggi for s in e.membri) == sorted(
+        s.email for s in cluster
+    )
+    kernel = ClusterKernel.build(cluster, matrice, "DALMINE")
+    for e in equipaggi:
+        assert e.capacita_utilizzata <= capacita
+        tappe = [kernel.localita.index(loc) for loc in dict.fromkeys(e.percorso_tappe[:-1])]
+        assert CarRoute.da_tappe(kernel, tappe).deviazione <= max_deviazione + 1e-6
+
+
+@pytest.mark.unit
+def test_studente_con_una_sola_auto_inserito_per_primo():
+    # A e B incompatibili; X raggiungibile solo da A, Y da entrambe
+    matrice = _make_matrice(
+        {
+            "A-DALMINE": 1000,
+            "B-DALMINE": 1000,
+            "X-DALMINE": 500,
+            "Y-DALMINE": 500,
+            "A-X": 550,
+            "A-Y": 510,
+            "B-Y": 520,
+            "B-X": 700,
+        }
+    )
+    a, b, x, y = (_make_studente(loc) for loc in "ABXY")
+    cluster = [a, b, x, y]
+
+    greedy = GreedyOptimizer(2, 180, 100).optimize_cluster(cluster, matrice)
+    regret = RegretOptimizer(2, 180, 100, k_regret=2).optimize_cluster(cluster, matrice)
+
+    # Il greedy dà Y ad A e lascia X da solo; il regret serve prima X
+    assert len(greedy) == 3
+    assert len(regret) == 2
+    assert {tuple(s.localita for s in e.membri) for e in regret} == {
+        ("A", "X"),
+        ("B", "Y"),
+    }
+
+
+@pytest.mark.unit
+def test_localita_incompatibili_aprono_auto_in_parallelo():
+    matrice = _make_matrice({"A-DALMINE": 1000, "B-DALMINE": 900, "A-B": 5000})
+    cluster = [_make_studente("A"), _make_studente("B")]
+
+    equipaggi = RegretOptimizer(4, 180, 100).optimize_cluster(cluster, matrice)
+
+    assert [e.autista.localita for e in equipaggi] == ["A", "B"]
+    assert [e.id for e in equipaggi] == [1, 2]
+
+
+@pytest.mark.unit
+def test_optimize_cluster_rispetta_i_vincoli():
+    cluster, matrice = _make_scenario(0, 120, 25)
+    equipaggi = RegretOptimizer(4, 180, 300).optimize_cluster(cluster, matrice)
+    _verifica_vincoli(equipaggi, cluster, matrice, 4, 300)
+    # Membri in ordine di raccolta
+    assert all(
+        e.percorso_tappe == [s.localita for s in e.membri] + ["DALMINE"]
+        for e in equipaggi
+    )
+
+
+@pytest.mark.unit
+def test_optimize_cluster_vuoto():
+    matrice = _make_matrice({})
+    assert RegretOptimizer(4, 180, 300).optimize_cluster([], matrice) == []
+
+
+@pytest.mark.performance
+def test_benchmark_regret_contro_greedy():
+    cluster, matrice = _make_scenario(1, 2000, 150)
+    risultati = {}
+    for nome, optimizer in (
+        ("greedy", GreedyOptimizer(4, 180, 300)),
+        ("regret", RegretOptimizer(4, 180, 300)),
+    ):
+        inizio = time.perf_counter()
+        equipaggi = optimizer.optimize_cluster(cluster, matrice)
+        risultati[nome] = (len(equipaggi), time.perf_counter() - inizio)
+        _verifica_vincoli(equipaggi, cluster, matrice, 4, 300)
+
+    for nome, (auto, secondi) in risultati.items():
+        print(f"{nome}: {auto} auto in {secondi:.3f}s")
+    assert risultati["regret"][0] <= risultati["greedy"][0]
+    assert risultati["regret"][1] < 5.0
@@ -0,0 +1,113 @@
+import math
+import random
+import pytest
+from unittest.mock import MagicMock
+from src.business.optimization.savings_optimizer import SavingsOptimizer
+from src.data.models.duration_matrix import DurationMatrix
+
+
+def _make_studente(localita: str, corso: str = "Ingegneria"):
+    s = MagicMock()
+    s.localita = localita
+    s.corso = corso
+    return s
+
+
+def _make_durate(punti: dict) -> dict:
+    """Durate euclidee tra punti (DALMINE incluso)"""
+    durate = {}
+    for a, (xa, ya) in punti.items():
+        for b, (xb, yb) in punti.items():
+            if a != b:
+                durate[f"{a}-{b}"] = math.hypot(xa - xb, ya - yb)
+    return durate
+
+
+def _make_matrice(durate: dict) -> DurationMatrix:
+    return DurationMatrix.from_cache_dict(
+        {k: {"durata_sec": v, "distanza_m": 0} for k, v in durate.items()}
+    )
+
+
+def _deviazione_percorso(equipaggio, durate):
+    tappe = list(dict.fromkeys(equipaggio.percorso_tappe))
+    costo = sum(durate.get(f"{a}-{b}", 0) for a, b in zip(tappe, tappe[1:]))
+    return costo - durate[f"{tappe[0]}-DALMINE"]
+
+
+@pytest.mark.unit
+def test_optimize_cluster_accoda_localita_sulla_strada():
+    durate = _make_durate({"A": (0, 900), "B": (0, 600), "DALMINE": (0, 0)})
+    a, b = _make_studente("A"), _make_studente("B")
+
+    opt = SavingsOptimizer(capacita_auto=4, max_deviazione_sec=300)
+    equipaggi = opt.optimize_cluster([b, a], _make_matrice(durate))
+
+    assert len(equipaggi) == 1
+    assert equipaggi[0].autista is a
+    assert equipaggi[0].passeggeri == [b]
+    assert equipaggi[0].percorso_tappe == ["A", "B", "DALMINE"]
+
+
+@pytest.mark.unit
+def test_optimize_cluster_rispetta_capacita():
+    durate = _make_durate({"A": (0, 900), "DALMINE": (0, 0)})
+    cluster = [_make_studente("A") for _ in range(7)]
+
+    opt = SavingsOptimizer(capacita_auto=3, max_deviazione_sec=300)
+    equipaggi = opt.optimize_cluster(cluster, _make_matrice(durate))
+
+    assert sorted(e.capacita_utilizzata for e in equipaggi) == [1, 3, 3]
+    assert [e.id for e in equipaggi] == [1, 2, 3]
+
+
+@pytest.mark.unit
+def test_optimize_cluster_rispetta_max_deviazione():
+    durate = _make_durate({"A": (0, 900), "B": (900, 0), "DALMINE": (0, 0)})
+    opt = SavingsOptimizer(capacita_auto=4, max_deviazione_sec=300)
+    equipaggi = opt.optimize_cluster(
+        [_make_studente("A"), _make_studente("B")], _make_matrice(durate)
+    )
+    assert len(equipaggi) == 2
+
+
+@pytest.mark.unit
+def test_optimize_cluster_durata_mancante_non_unisce():
+    durate = {"A-DALMINE": 900, "B-DALMINE": 600}
+    opt = SavingsOptimizer(capacita_auto=4, max_deviazione_sec=300)
+    equipaggi = opt.optimize_cluster(
+        [_make_studente("A"), _make_studente("B")], _make_matrice(durate)
+    )
+    assert len(equipaggi) == 2
+
+
+@pytest.mark.unit
+def test_optimize_cluster_scenario_casuale_rispetta_i_vincoli():
+    rng = random.Random(5)
+    punti = {f"L{i}": (rng.uniform(-800, 800), rng.uniform(-800, 800)) for i in range(30)}
+    punti["DALMINE"] = (0, 0)
+    durate = _make_durate(punti)
+    cluster = [_make_studente(rng.choice(list(punti)[:-1])) for _ in range(80)]
+
+    opt = SavingsOptimizer(capacita_auto=4, max_deviazione_sec=300)
+    equipaggi = opt.optimize_cluster(cluster, _make_matrice(durate))
+
+    assert sorted(id(s) for e in equipaggi for s in e.membri) == sorted(map(id, cluster))
+    for equipaggio in equipaggi:
+        assert equipaggio.capacita_utilizzata <= 4
+        assert _deviazione_percorso(equipaggio, durate) <= 300 + 1e-6
+
+
+@pytest.mark.unit
+def test_optimize_cluster_auto_piene_non_ricevono_altre_fusioni():
+    durate = _make_durate({"A": (0, 900), "B": (0, 600), "DALMINE": (0, 0)})
+    cluster = [_make_studente("A") for _ in range(30)] + [
+        _make_studente("B") for _ in range(21)
+    ]
+
+    opt = SavingsOptimizer(capacita_auto=4, max_deviazione_sec=0)
+    equipaggi = opt.optimize_cluster(cluster, _make_matrice(durate))
+
+    assert sorted(id(s) for e in equipaggi for s in e.membri) == sorted(map(id, cluster))
+    assert [e.capacita_utilizzata for e in equipaggi].count(4) == 12
+    assert len(equipaggi) == 13
@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+from src.business.optimization.spatial_index import (
+    KM_PER_GRADO,
+    proietta_km,
+    vicinati_localita,
+)
+
+
+@pytest.mark.unit
+def test_proietta_km_latitudine_e_longitudine():
+    xy = proietta_km(np.array([[0.0, 0.0], [1.0, 1.0]]))
+    assert xy[1, 0] - xy[0, 0] == pytest.approx(KM_PER_GRADO)
+    # Longitudine scalata per il coseno della latitudine media (0.5°)
+    assert xy[1, 1] - xy[0, 1] == pytest.approx(KM_PER_GRADO * np.cos(np.radians(0.5)))
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("seed", range(3))
+def test_vicinati_localita_coincidono_con_forza_bruta(seed):
+    rng = np.random.default_rng(seed)
+    localita = [f"L{i:03d}" for i in range(200)]
+    coordinate = 45.5 + rng.uniform(-0.3, 0.3, size=(200, 2))
+    punti = proietta_km(coordinate)
+    vicinati = vicinati_localita(localita, coordinate, 7)
+
+    for i, loc in enumerate(localita):
+        distanze = np.hypot(*(punti - punti[i]).T)
+        attesi = [localita[j] for j in np.argsort(distanze, kind="stable")[:7]]
+        assert vicinati[loc] == attesi
+
+
+@pytest.mark.unit
+def test_vicinati_localita_meno_localita_di_k():
+    vicinati = vicinati_localita(["A", "B"], np.array([[45.0, 9.0], [45.1, 9.0]]), 5)
+    assert vicinati == {"A": ["A", "B"], "B": ["B", "A"]}
+    assert vicinati_localita([], np.empty((0, 2)), 5) == {}
+
+
+@pytest.mark.unit
+def test_vicinati_localita_indipendenti_dall_ordine():
+    rng = np.random.default_rng(0)
+    localita = [f"L{i}" for i in range(50)]
+    coordinate = 45.5 + rng.uniform(-0.2, 0.2, size=(50, 2))
+    vicinati = vicinati_localita(localita, coordinate, 4)
+
+    # Ogni località è la più vicina a se stessa
+    assert all(v[0] == loc and len(v) == 4 for loc, v in vicinati.items())
+    inverso = vicinati_localita(localita[::-1], coordinate[::-1], 4)
+    assert inverso == vicinati
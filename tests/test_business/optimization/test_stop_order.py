@@ -0,0 +1,115 @@
+import itertools
+import math
+import random
+import pytest
+from src.business.optimization.stop_order import StopOrderSolver
+from src.data.models import DurationMatrix, Equipaggio, Studente
+
+
+def _make_studente(email: str, localita: str) -> Studente:
+    return Studente(email=email, localita=localita, corso="Ingegneria")
+
+
+def _make_matrice(durate: dict) -> DurationMatrix:
+    return DurationMatrix.from_cache_dict(
+        {k: {"durata_sec": v, "distanza_m": 0} for k, v in durate.items()}
+    )
+
+
+def _make_durate(punti: dict) -> dict:
+    """Durate euclidee tra punti (DALMINE incluso)"""
+    durate = {}
+    for a, (xa, ya) in punti.items():
+        for b, (xb, yb) in punti.items():
+            if a != b:
+                durate[f"{a}-{b}"] = math.hypot(xa - xb, ya - yb)
+    return durate
+
+
+def _costo(percorso, durate):
+    return sum(durate[f"{a}-{b}"] for a, b in zip(percorso, percorso[1:]))
+
+
+@pytest.mark.unit
+def test_ordina_equipaggio_trova_il_percorso_piu_breve():
+    # L'ordine per durata verso DALMINE (C, A, B) non è il più breve
+    durate = {
+        "A-B": 100, "B-A": 100, "A-C": 400, "C-A": 400, "B-C": 100, "C-B": 100,
+        "A-DALMINE": 500, "B-DALMINE": 450, "C-DALMINE": 520,
+    }
+    autista = _make_studente("a@x", "A")
+    p_b = _make_studente("b@x", "B")
+    p_c = _make_studente("c@x", "C")
+    equipaggio = Equipaggio(id=1, autista=autista, passeggeri=[p_c, p_b])
+
+    StopOrderSolver().ordina_equipaggio(equipaggio, _make_matrice(durate))
+
+    assert equipaggio.percorso_tappe == ["A", "B", "C", "DALMINE"]
+    assert equipaggio.passeggeri == [p_b, p_c]
+    assert equipaggio.durata_percorso_sec == pytest.approx(100 + 100 + 520)
+
+
+@pytest.mark.unit
+def test_ordina_equipaggio_coincide_con_la_forza_bruta():
+    rng = random.Random(7)
+    punti = {f"L{i}": (rng.uniform(-500, 500), rng.uniform(-500, 500)) for i in range(7)}
+    punti["DALMINE"] = (0, 0)
+    durate = _make_durate(punti)
+    autista = _make_studente("a@x", "L0")
+    passeggeri = [_make_studente(f"p{i}@x", f"L{i}") for i in range(1, 7)]
+    equipaggio = Equipaggio(id=1, autista=autista, passeggeri=passeggeri)
+
+    StopOrderSolver().ordina_equipaggio(equipaggio, _make_matrice(durate))
+
+    migliore = min(
+        _costo(["L0", *ordine, "DALMINE"], durate)
+        for ordine in itertools.permutations([f"L{i}" for i in range(1, 7)])
+    )
+    assert equipaggio.durata_percorso_sec == pytest.approx(migliore)
+    assert _costo(equipaggio.percorso_tappe, durate) == pytest.approx(migliore)
+
+
+@pytest.mark.unit
+def test_ordina_equipaggio_stessa_localita_una_tappa():
+    durate = {"A-B": 100, "A-DALMINE": 500, "B-DALMINE": 450}
+    autista = _make_studente("a@x", "A")
+    p1 = _make_studente("p1@x", "B")
+    p2 = _make_studente("p2@x", "A")
+    equipaggio = Equipaggio(id=1, autista=autista, passeggeri=[p1, p2])
+
+    StopOrderSolver().ordina_equipaggio(equipaggio, _make_matrice(durate))
+
+    assert equipaggio.passeggeri == [p2, p1]
+    assert equipaggio.percorso_tappe == ["A", "A", "B", "DALMINE"]
+    assert equipaggio.durata_percorso_sec == pytest.approx(550)
+
+
+@pytest.mark.unit
+def test_ordina_equipaggio_durate_mancanti_durata_sconosciuta():
+    durate = {"A-DALMINE": 500, "B-DALMINE": 450}
+    equipaggio = Equipaggio(
+        id=1, autista=_make_studente("a@x", "A"), passeggeri=[_make_studente("b@x", "B")]
+    )
+
+    StopOrderSolver().ordina_equipaggio(equipaggio, _make_matrice(durate))
+
+    assert equipaggio.percorso_tappe == ["A", "B", "DALMINE"]
+    assert equipaggio.durata_percorso_sec is None
+
+
+@pytest.mark.unit
+def test_ordina_flotta_memoizza_equipaggi_identici():
+    durate = {"A-B": 100, "A-DALMINE": 500, "B-DALMINE": 450}
+    flotta = [
+        Equipaggio(
+            id=i, autista=_make_studente(f"a{i}@x", "A"),
+            passeggeri=[_make_studente(f"b{i}@x", "B")],
+        )
+        for i in range(3)
+    ]
+
+    solver = StopOrderSolver()
+    solver.ordina_flotta(flotta, _make_matrice(durate))
+
+    assert solver.percorsi_risolti == 1
+    assert all(e.durata_percorso_sec == pytest.approx(550) for e in flotta)
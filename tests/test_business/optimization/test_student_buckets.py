@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+from src.business.optimization.student_buckets import StudentBuckets
+
+
+def _build(loc, corso):
+    return StudentBuckets.build(
+        np.array(loc, dtype=np.intp), np.array(corso, dtype=np.intp)
+    )
+
+
+@pytest.mark.unit
+def test_raggruppa_per_localita_e_corso():
+    gruppi = _build([0, 0, 1, 0], [0, 1, 0, 0])
+    assert gruppi.n_gruppi == 3
+    assert list(gruppi.gruppo) == [0, 1, 2, 0]
+    assert list(gruppi.conteggi) == [2, 1, 1]
+
+
+@pytest.mark.unit
+def test_gruppi_numerati_per_prima_apparizione():
+    gruppi = _build([2, 1, 2, 0], [0, 0, 0, 0])
+    assert list(gruppi.loc) == [2, 1, 0]
+    assert [list(p) for p in gruppi.posizioni] == [[0, 2], [1], [3]]
+
+
+@pytest.mark.unit
+def test_localita_e_corso_del_gruppo():
+    gruppi = _build([1, 1, 0], [3, 2, 3])
+    assert list(gruppi.loc) == [1, 1, 0]
+    assert list(gruppi.corso) == [3, 2, 3]
+
+
+@pytest.mark.unit
+def test_build_vuoto():
+    gruppi = _build([], [])
+    assert gruppi.n_gruppi == 0
+    assert len(gruppi.gruppo) == 0
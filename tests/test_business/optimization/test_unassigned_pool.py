@@ -0,0 +1,77 @@
+import numpy as np
+import pytest
+from src.business.optimization.student_buckets import StudentBuckets
+from src.business.optimization.unassigned_pool import UnassignedPool
+
+
+def _make_pool(loc, corso=None):
+    loc = np.array(loc, dtype=np.intp)
+    corso = np.zeros_like(loc) if corso is None else np.array(corso, dtype=np.intp)
+    return UnassignedPool(StudentBuckets.build(loc, corso))
+
+
+@pytest.mark.unit
+def test_pool_iniziale_contiene_tutti():
+    pool = _make_pool([0, 1, 2])
+    assert len(pool) == 3
+    assert pool.disponibili.all()
+    assert pool.gruppi_disponibili.all()
+    assert pool.cursore == 0
+
+
+@pytest.mark.unit
+def test_estrai_piu_lontano_rispetta_ordine():
+    pool = _make_pool([0, 1, 0])
+    assert [pool.estrai_piu_lontano() for _ in range(3)] == [0, 1, 2]
+    assert len(pool) == 0
+    assert not pool
+
+
+@pytest.mark.unit
+def test_estrai_piu_lontano_salta_prelevati():
+    pool = _make_pool([0, 0, 1, 2])
+    assert pool.preleva(0, 2) == [0, 1]
+    assert pool.estrai_piu_lontano() == 2
+    assert pool.cursore == 2
+
+
+@pytest.mark.unit
+def test_preleva_limita_ai_rimanenti_del_gruppo():
+    pool = _make_pool([0, 1, 0, 0])
+    assert pool.preleva(0, 10) == [0, 2, 3]
+    assert len(pool) == 1
+    assert not pool.gruppi_disponibili[0]
+    assert pool.rimanenti_gruppo[0] == 0
+
+
+@pytest.mark.unit
+def test_testa_avanza_con_i_prelievi():
+    pool = _make_pool([0, 1, 0, 1])
+    assert pool.testa(1) == 1
+    pool.preleva(1, 1)
+    assert pool.testa(1) == 3
+
+
+@pytest.mark.unit
+def test_estrai_da_pool_vuoto_solleva_index_error():
+    pool = _make_pool([0])
+    pool.estrai_piu_lontano()
+    with pytest.raises(IndexError):
+        pool.estrai_piu_lontano()
+
+
+@pytest.mark.unit
+def test_estrai_tra_i_piu_lontani_sceglie_tra_i_primi_k_gruppi():
+    # Posizioni 0,1 nel gruppo 0; 2 nel gruppo 1; 3 nel gruppo 2
+    rng = np.random.default_rng(0)
+    for _ in range(10):
+        pool = _make_pool([0, 0, 1, 2])
+        assert pool.estrai_tra_i_piu_lontani(2, rng) in (0, 2)
+        assert len(pool) == 3
+
+
+@pytest.mark.unit
+def test_estrai_tra_i_piu_lontani_pool_vuoto():
+    pool = _make_pool([])
+    with pytest.raises(IndexError):
+        pool.estrai_tra_i_piu_lontani(2, np.random.default_rng(0))
@@ -1,6 +1,8 @@
 import pytest
 from unittest.mock import MagicMock
 from src.business.orchestrators.optimization_facade import OptimizationFacade
+from src.business.optimization.greedy_optimizer import GreedyOptimizer
+from src.data.models import DurationMatrix, Studente
 
 
 def _make_studente(localita: str):
@@ -126,4 +128,104 @@ def test_optimize_full_stampa_avanzamento_cluster(capsys):
     facade, _, _ = _make_facade(clusters=[[s1]], equipaggi_per_cluster=lambda c, p: [])
     facade.optimize_full([s1], {})
     captured = capsys.readouterr()
-    assert "1/1" in captured.out
\ No newline at end of file
+    assert "1/1" in captured.out
+
+@pytest.mark.unit
+def test_init_numero_worker_default_sequenziale():
+    facade, _, _ = _make_facade()
+    assert facade.numero_worker == 1
+
+
+@pytest.mark.unit
+def test_optimize_full_rinumera_equipaggi_su_tutta_la_flotta():
+    s1 = _make_studente("Bergamo")
+    s2 = _make_studente("Brescia")
+    eq1, eq2, eq3 = _make_equipaggio(), _make_equipaggio(), _make_equipaggio()
+    risposte = iter([[eq1, eq2], [eq3]])
+    facade, _, _ = _make_facade(
+        clusters=[[s1], [s2]], equipaggi_per_cluster=lambda c, p: next(risposte)
+    )
+    facade.optimize_full([s1, s2], {})
+    assert [eq1.id, eq2.id, eq3.id] == [1, 2, 3]
+
+
+def _make_scenario_reale():
+    localita = [f"LOC{i}" for i in range(6)]
+    cache = {}
+    for i, a in enumerate(localita):
+        cache[f"{a}-DALMINE"] = {"durata_sec": 600 + 120 * i, "distanza_m": 0}
+        for j, b in enumerate(localita):
+            if a != b:
+                cache[f"{a}-{b}"] = {"durata_sec": 90 * abs(i - j), "distanza_m": 0}
+    studenti = [
+        Studente(email=f"s{i}@test.it", localita=localita[i % 6], corso="ING")
+        for i in range(18)
+    ]
+    clusters = [studenti[:7], studenti[7:12], studenti[12:]]
+    optimizer = GreedyOptimizer(
+        capacita_auto=4, bonus_corso_laurea=180, max_deviazione_sec=900
+    )
+    return clusters, optimizer, DurationMatrix.from_cache_dict(cache)
+
+
+@pytest.mark.unit
+def test_optimize_full_parallelo_identico_al_sequenziale(capsys):
+    clusters, optimizer, matrice = _make_scenario_reale()
+    clustering = MagicMock()
+    clustering.cluster_studenti.return_value = clusters
+
+    sequenziale = OptimizationFacade(clustering, optimizer, numero_worker=1)
+    parallelo = OptimizationFacade(clustering, optimizer, numero_worker=2)
+
+    atteso = sequenziale.optimize_full([], matrice)
+    result = parallelo.optimize_full([], matrice)
+
+    assert [e.id for e in result] == list(range(1, len(result) + 1))
+    assert result == atteso
+    assert "parallela" in capsys.readouterr().out
+
+
+@pytest.mark.unit
+def test_optimize_full_un_solo_cluster_resta_sequenziale(capsys):
+    clusters, optimizer, matrice = _make_scenario_reale()
+    clustering = MagicMock()
+    clustering.cluster_studenti.return_value = clusters[:1]
+    facade = OptimizationFacade(clustering, optimizer, numero_worker=4)
+    facade.optimize_full([], matrice)
+    assert "parallela" not in capsys.readouterr().out
+
+
+@pytest.mark.unit
+def test_optimize_full_ordina_tappe_della_flotta():
+    eq1, eq2 = _make_equipaggio(), _make_equipaggio()
+    facade, _, _ = _make_facade(
+        clusters=[[_make_studente("Bergamo")]], equipaggi_per_cluster=lambda c, p: [eq1, eq2]
+    )
+    ordinatore = MagicMock()
+    ordinatore.percorsi_risolti = 1
+    facade.ordinatore_tappe = ordinatore
+    matrice = MagicMock()
+
+    flotta = facade.optimize_full([], matrice)
+
+    ordinatore.ordina_flotta.assert_called_once_with(flotta, matrice)
+    assert flotta == [eq1, eq2]
+
+
+@pytest.mark.unit
+def test_optimize_full_ribilancia_prima_di_rinumerare():
+    eq1, eq2, fusa = _make_equipaggio(), _make_equipaggio(), _make_equipaggio()
+    facade, _, _ = _make_facade(
+        clusters=[[_make_studente("A")], [_make_studente("B")]],
+        equipaggi_per_cluster=[[eq1], [eq2]],
+    )
+    ribilanciatore = MagicMock()
+    ribilanciatore.ribilancia.return_value = [fusa]
+    facade.ribilanciatore = ribilanciatore
+    matrice = MagicMock()
+
+    flotta = facade.optimize_full([], matrice)
+
+    ribilanciatore.ribilancia.assert_called_once_with([[eq1], [eq2]], matrice)
+    assert flotta == [fusa]
+    assert fusa.id == 1
@@ -1,5 +1,5 @@
 import pytest
-from unittest.mock import MagicMock, patch
+from unittest.mock import MagicMock
 from src.business.orchestrators.optimize_orchestrator import OptimizeOrchestrator
 
 
@@ -24,7 +24,6 @@ def _make_orchestrator(
 
     cache_repo = MagicMock()
     cache_repo.coordinate_cache.get.side_effect = lambda loc: (45.5, 9.6)
-    cache_repo.percorsi_cache.data.items.return_value = []
 
     validator = MagicMock()
     validator.validate_cache_completeness.return_value = _make_validation_result(
@@ -78,24 +77,19 @@ def test_execute_arricchisce_studenti_con_coordinate():
 
 
 @pytest.mark.unit
-def test_build_percorsi_dict_converte_cache_in_dict():
+def test_build_duration_matrix_delega_alla_cache_percorsi():
     orc, _, cache_repo, _, _ = _make_orchestrator()
-    cache_repo.percorsi_cache.data.items.return_value = [
-        ("Bergamo-DALMINE", {"durata": 1200}),
-        ("Brescia-DALMINE", {"durata": 900}),
-    ]
-    with patch(
-        "src.business.orchestrators.optimize_orchestrator.Percorso"
-    ) as MockPercorso:
-        MockPercorso.from_cache_dict.return_value = MagicMock()
-        result = orc._build_percorsi_dict()
-        assert "Bergamo-DALMINE" in result
-        assert "Brescia-DALMINE" in result
-        assert MockPercorso.from_cache_dict.call_count == 2
+    matrice = MagicMock()
+    cache_repo.percorsi_cache.to_duration_matrix.return_value = matrice
+    assert orc._build_duration_matrix() is matrice
+    cache_repo.percorsi_cache.to_duration_matrix.assert_called_once_with()
 
 
 @pytest.mark.unit
-def test_build_percorsi_dict_vuoto_se_cache_vuota():
-    orc, _, cache_repo, _, _ = _make_orchestrator()
-    cache_repo.percorsi_cache.data.items.return_value = []
-    assert orc._build_percorsi_dict() == {}
+def test_execute_passa_matrice_a_optimize_full():
+    studenti = [_make_studente("Bergamo")]
+    orc, _, cache_repo, _, optimization = _make_orchestrator(studenti=studenti)
+    matrice = MagicMock()
+    cache_repo.percorsi_cache.to_duration_matrix.return_value = matrice
+    orc.execute()
+    optimization.optimize_full.assert_called_once_with(studenti, matrice)
@@ -1,6 +1,11 @@
+import random
+import numpy as np
 import pytest
 from unittest.mock import MagicMock
 from src.business.orchestrators.populate_orchestrator import PopulateOrchestrator
+from src.business.optimization.greedy_optimizer import GreedyOptimizer
+from src.business.optimization.spatial_index import proietta_km
+from src.data.models.duration_matrix import DurationMatrix
 
 
 def _make_studente(localita: str, coordinate=None):
@@ -101,6 +106,22 @@ def test_geocode_localita_non_duplica_richieste_per_stessa_localita():
     assert chiamate.count("Bergamo") == 1
 
 
+@pytest.mark.unit
+def test_geocode_localita_passa_gli_studenti_al_clustering_incrementale():
+    s1, s2 = _make_studente("Bergamo"), _make_studente("Bergamo")
+    s3 = _make_studente("X")
+    orc, _, api_facade, clustering, _ = _make_orchestrator([s1, s2, s3])
+    api_facade.get_coordinate_with_cache.side_effect = lambda loc: (
+        None if loc == "X" else (45.69, 9.67)
+    )
+    orc._geocode_localita([s1, s2, s3])
+
+    # Un blocco per località geocodificata, nessuno per quelle senza coordinate
+    blocchi = [c.args[0] for c in clustering.partial_fit.call_args_list]
+    assert [s1, s2] in blocchi and [] in blocchi  # [] = DALMINE senza studenti
+    assert all(s3 not in blocco for blocco in blocchi)
+
+
 @pytest.mark.unit
 def test_identifica_percorsi_restituisce_set_di_tuple():
     s1 = _make_studente("Bergamo", (45.69, 9.67))
@@ -206,3 +227,90 @@ def test_execute_chiama_save_all_finale():
     api_facade.get_coordinate_with_cache.side_effect = lambda loc: (45.5, 9.6)
     orc.execute()
     cache.save_all.assert_called()
+
+
+@pytest.mark.unit
+def test_identifica_percorsi_con_k_vicine_solo_coppie_nei_vicinati():
+    # Quattro località in fila: con k = 1 ciascuna si abbina solo alla più vicina
+    studenti = [
+        _make_studente(f"L{i}", (45.0 + 0.1 * i, 9.5)) for i in range(4)
+    ]
+    orc, _, _, clustering, _ = _make_orchestrator(studenti)
+    clustering.cluster_studenti.return_value = [studenti]
+    orc.k_localita_vicine = 1
+
+    result = orc._identifica_percorsi_necessari(studenti)
+    assert ("L0", "L1") in result and ("L2", "L3") in result
+    assert ("L0", "L2") not in result and ("L0", "L3") not in result
+    assert all((f"L{i}", "DALMINE") in result for i in range(4))
+
+
+@pytest.mark.unit
+def test_identifica_percorsi_coppie_di_confine_entro_il_raggio():
+    # Due cluster in fila: L1 e L2 a ~11 km, L0 e L3 più lontane dal bordo
+    studenti = [
+        _make_studente(f"L{i}", (45.0 + 0.1 * i, 9.5)) for i in range(4)
+    ]
+    orc, _, _, clustering, _ = _make_orchestrator(studenti)
+    clustering.cluster_studenti.return_value = [studenti[:2], studenti[2:]]
+
+    senza = orc._identifica_percorsi_necessari(studenti)
+    assert ("L1", "L2") not in senza
+
+    orc.raggio_confine_km = 12.5
+    result = orc._identifica_percorsi_necessari(studenti)
+    assert ("L1", "L2") in result and ("L2", "L1") in result
+    assert ("L0", "L2") not in result and ("L1", "L3") not in result
+    assert result - senza == {("L1", "L2"), ("L2", "L1")}
+
+
+@pytest.mark.unit
+def test_coppie_di_confine_senza_percorsi_da_una_localita_a_se_stessa():
+    # L1 divisa tra i due cluster (es. dal bilanciamento per capacità)
+    posizioni = {"L0": (45.0, 9.5), "L1": (45.1, 9.5), "L2": (45.2, 9.5)}
+    studenti = [_make_studente(loc, posizioni[loc]) for loc in ("L0", "L1", "L1", "L2")]
+    orc, _, _, clustering, _ = _make_orchestrator(studenti)
+    clustering.cluster_studenti.return_value = [studenti[:2], studenti[2:]]
+    orc.raggio_confine_km = 1.0
+
+    result = orc._coppie_di_confine([studenti[:2], studenti[2:]])
+    assert result == set()
+    assert all(a != b for a, b in orc._identifica_percorsi_necessari(studenti))
+
+
+@pytest.mark.unit
+def test_percorsi_con_k_vicine_bastano_al_greedy():
+    # Con le stesse k vicine il greedy non esce mai dai percorsi di popola
+    rng = random.Random(0)
+    punti = {
+        f"L{i}": (45.5 + rng.uniform(-0.2, 0.2), 9.6 + rng.uniform(-0.3, 0.3))
+        for i in range(30)
+    }
+    punti["DALMINE"] = (45.65, 9.6)
+    km = dict(zip(punti, proietta_km(np.array(list(punti.values())))))
+    studenti = []
+    for i in range(120):
+        loc = rng.choice(list(punti)[:-1])
+        studente = _make_studente(loc, punti[loc])
+        studente.corso = rng.choice(["ING", "ECO"])
+        studenti.append(studente)
+    orc, _, _, clustering, _ = _make_orchestrator(studenti)
+    clustering.cluster_studenti.return_value = [studenti]
+    orc.k_localita_vicine = 3
+
+    def matrice(coppie):
+        durate = {(a, b): 60 * float(np.hypot(*(km[a] - km[b]))) for a, b in coppie}
+        return DurationMatrix.from_cache_dict(
+            {
+                f"{a}-{b}": {"durata_sec": d, "distanza_m": 0}
+                for (a, b), d in durate.items()
+            }
+        )
+
+    scaricate = matrice(orc._identifica_percorsi_necessari(studenti))
+    complete = matrice((a, b) for a in punti for b in punti if a != b)
+    greedy = GreedyOptimizer(4, 180, 600, k_localita_vicine=3)
+
+    assert [e.percorso_tappe for e in greedy.optimize_cluster(studenti, scaricate)] == [
+        e.percorso_tappe for e in greedy.optimize_cluster(studenti, complete)
+    ]
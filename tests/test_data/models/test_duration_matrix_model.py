@@ -0,0 +1,92 @@
+"""
+Test suite per modello DurationMatrix
+
+Coverage target: 100% del modulo duration_matrix.py
+"""
+
+import math
+import numpy as np
+import pytest
+from src.data.models import DurationMatrix
+
+
+CACHE_DATA = {
+    "BERGAMO-DALMINE": {"durata_sec": 720, "distanza_m": 12000, "geometria": []},
+    "TREVIOLO-DALMINE": {"durata_sec": 480, "distanza_m": 8000, "geometria": []},
+    "BERGAMO-TREVIOLO": {"durata_sec": 240, "distanza_m": 4000, "geometria": []},
+}
+
+
+class TestDurationMatrixModel:
+    def test_from_cache_dict_interna_tutte_le_localita(self):
+        matrice = DurationMatrix.from_cache_dict(CACHE_DATA)
+
+        assert set(matrice.localita) == {"BERGAMO", "DALMINE", "TREVIOLO"}
+        assert matrice.n_localita == 3
+        for loc in matrice.localita:
+            assert matrice.localita[matrice.indice(loc)] == loc
+
+    def test_durate_e_distanze_lette_dalla_cache(self):
+        matrice = DurationMatrix.from_cache_dict(CACHE_DATA)
+
+        assert matrice.durata("BERGAMO", "DALMINE") == pytest.approx(720)
+        assert matrice.distanza("BERGAMO", "TREVIOLO") == pytest.approx(4000)
+
+        i = matrice.indice("TREVIOLO")
+        j = matrice.indice("DALMINE")
+        assert matrice.durate[i, j] == pytest.approx(480)
+        assert matrice.distanze[i, j] == pytest.approx(8000)
+
+    def test_coppie_mancanti_sono_nan(self):
+        matrice = DurationMatrix.from_cache_dict(CACHE_DATA)
+
+        # Percorso inverso mai scaricato
+        assert math.isnan(matrice.durata("DALMINE", "BERGAMO"))
+        assert math.isnan(matrice.distanza("DALMINE", "BERGAMO"))
+
+    def test_diagonale_a_zero(self):
+        matrice = DurationMatrix.from_cache_dict(CACHE_DATA)
+
+        assert np.all(np.diag(matrice.durate) == 0)
+        assert matrice.durata("BERGAMO", "BERGAMO") == 0
+
+    def test_localita_sconosciuta(self):
+        matrice = DurationMatrix.from_cache_dict(CACHE_DATA)
+
+        assert matrice.indice("ATLANTIDE") is None
+        assert math.isnan(matrice.durata("ATLANTIDE", "DALMINE"))
+        assert math.isnan(matrice.distanza("BERGAMO", "ATLANTIDE"))
+        assert matrice.durata("ATLANTIDE", "ATLANTIDE") == 0
+        assert list(matrice.indici_di(["ATLANTIDE", "BERGAMO"])) == [
+            -1,
+            matrice.indice("BERGAMO"),
+        ]
+
+    def test_voci_senza_durata_ignorate(self):
+        matrice = DurationMatrix.from_cache_dict(
+            {"A-B": {"durata_sec": None, "distanza_m": 10}}
+        )
+
+        assert matrice.n_localita == 0
+        assert math.isnan(matrice.durata("A", "B"))
+
+    def test_sottomatrice_durate(self):
+        matrice = DurationMatrix.from_cache_dict(CACHE_DATA)
+
+        sotto = matrice.sottomatrice_durate(["BERGAMO", "ATLANTIDE", "DALMINE"])
+
+        assert sotto.shape == (3, 3)
+        assert sotto[0, 2] == pytest.approx(720)
+        assert np.isnan(sotto[1, 2])
+        assert np.isnan(sotto[0, 1])
+        assert np.all(np.diag(sotto) == 0)
+
+    def test_matrice_vuota(self):
+        matrice = DurationMatrix.from_cache_dict({})
+
+        assert matrice.localita == []
+        assert matrice.durate.shape == (0, 0)
+
+        sotto = matrice.sottomatrice_durate(["A", "B"])
+        assert sotto[0, 0] == 0
+        assert np.isnan(sotto[0, 1])
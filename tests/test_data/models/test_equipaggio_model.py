@@ -54,6 +54,7 @@ class TestEquipaggioModel:
         assert equipaggio.autista == autista
         assert len(equipaggio.passeggeri) == 0
         assert len(equipaggio.percorso_tappe) == 0
+        assert equipaggio.durata_percorso_sec is None
 
     def test_property_membri(self):
         """Verifica che membri contenga autista + passeggeri"""
@@ -0,0 +1,75 @@
+"""
+Test suite per SharedDurationMatrix
+
+Coverage target: 100% del modulo shared_duration_matrix.py
+"""
+
+import pickle
+import numpy as np
+import pytest
+from src.data.models import DurationMatrix, SharedDurationMatrix
+
+
+CACHE_DATA = {
+    "BERGAMO-DALMINE": {"durata_sec": 720, "distanza_m": 12000},
+    "TREVIOLO-DALMINE": {"durata_sec": 480, "distanza_m": 8000},
+}
+
+
+class TestSharedDurationMatrix:
+    def test_collega_ricostruisce_la_matrice(self):
+        matrice = DurationMatrix.from_cache_dict(CACHE_DATA)
+
+        with SharedDurationMatrix(matrice) as condivisa:
+            collegata, segmenti = SharedDurationMatrix.collega(condivisa.descrittore)
+
+            assert collegata.localita == matrice.localita
+            np.testing.assert_array_equal(collegata.durate, matrice.durate)
+            np.testing.assert_array_equal(collegata.distanze, matrice.distanze)
+            assert collegata.durata("BERGAMO", "DALMINE") == 720
+
+            del collegata
+            for segmento in segmenti:
+                segmento.close()
+
+    def test_vista_collegata_in_sola_lettura(self):
+        matrice = DurationMatrix.from_cache_dict(CACHE_DATA)
+
+        with SharedDurationMatrix(matrice) as condivisa:
+            collegata, segmenti = SharedDurationMatrix.collega(condivisa.descrittore)
+
+            with pytest.raises(ValueError):
+                collegata.durate[0, 0] = 1.0
+
+            del collegata
+            for segmento in segmenti:
+                segmento.close()
+
+    def test_descrittore_picklabile_e_senza_array(self):
+        matrice = DurationMatrix.from_cache_dict(CACHE_DATA)
+
+        with SharedDurationMatrix(matrice) as condivisa:
+            descrittore = pickle.loads(pickle.dumps(condivisa.descrittore))
+
+        assert descrittore == condivisa.descrittore
+        assert descrittore.localita == tuple(matrice.localita)
+
+    def test_close_rimuove_i_segmenti(self):
+        matrice = DurationMatrix.from_cache_dict(CACHE_DATA)
+        condivisa = SharedDurationMatrix(matrice)
+        condivisa.close()
+        condivisa.close()  # Idempotente
+
+        with pytest.raises(FileNotFoundError):
+            SharedDurationMatrix.collega(condivisa.descrittore)
+
+    def test_matrice_vuota(self):
+        matrice = DurationMatrix.from_cache_dict({})
+
+        with SharedDurationMatrix(matrice) as condivisa:
+            collegata, segmenti = SharedDurationMatrix.collega(condivisa.descrittore)
+            assert collegata.durate.shape == (0, 0)
+
+            del collegata
+            for segmento in segmenti:
+                segmento.close()
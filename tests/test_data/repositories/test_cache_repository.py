@@ -2,6 +2,8 @@ import pytest
 from pathlib import Path
 from src.data.repositories.cache_repository import (
     CacheRepository,
+    CentroidiCache,
+    ClusteringCache,
     CoordinateCache,
     PercorsiCache,
 )
@@ -111,6 +113,65 @@ class TestPercorsiCache:
         assert cache2.has_complete("BERGAMO", "DALMINE")
         assert isinstance(cache2.get("BERGAMO", "DALMINE"), Percorso)
 
+    def test_to_duration_matrix(self, temp_cache_dir):
+        cache = PercorsiCache(temp_cache_dir / "percorsi.json")
+        cache.set(
+            Percorso(
+                partenza="BERGAMO",
+                destinazione="DALMINE",
+                durata_sec=720,
+                distanza_m=12500,
+                geometria=[(9.6773, 45.6983), (9.5969, 45.6469)],
+            )
+        )
+
+        matrice = cache.to_duration_matrix()
+
+        assert matrice.durata("BERGAMO", "DALMINE") == 720
+        assert matrice.distanza("BERGAMO", "DALMINE") == 12500
+
+
+class TestClusteringCache:
+    def test_set_get_e_persistenza(self, temp_cache_dir):
+        cache_file = temp_cache_dir / "clustering.json"
+        cache = ClusteringCache(cache_file)
+        assert cache.get("abc") is None
+
+        cache.set("abc", {"BERGAMO": [0, 0, 1], "DALMINE": [1]})
+        cache.save()
+
+        assert ClusteringCache(cache_file).get("abc") == {
+            "BERGAMO": [0, 0, 1],
+            "DALMINE": [1],
+        }
+
+    def test_tiene_solo_le_voci_piu_recenti(self, temp_cache_dir):
+        cache = ClusteringCache(temp_cache_dir / "clustering.json")
+        for i in range(ClusteringCache.MAX_VOCI + 1):
+            cache.set(f"k{i}", {"A": [i]})
+        # Riscrivere una voce la rende la più recente
+        cache.set("k1", {"A": [1]})
+        cache.set("nuova", {"A": [0]})
+
+        assert len(cache.data) == ClusteringCache.MAX_VOCI
+        assert cache.get("k0") is None and cache.get("k2") is None
+        assert cache.get("k1") == {"A": [1]}
+
+
+class TestCentroidiCache:
+    def test_set_get_e_persistenza(self, temp_cache_dir):
+        cache_file = temp_cache_dir / "centroidi.json"
+        cache = CentroidiCache(cache_file)
+        assert cache.get("minibatch-2") is None
+
+        cache.set("minibatch-2", [(45.6, 9.6), (45.7, 9.8)])
+        cache.save()
+
+        assert CentroidiCache(cache_file).get("minibatch-2") == [
+            (45.6, 9.6),
+            (45.7, 9.8),
+        ]
+
 
 class TestCacheRepository:
     def test_save_all_crea_file_cache(self, temp_cache_dir):
@@ -129,4 +190,6 @@ class TestCacheRepository:
         repo.save_all()
 
         assert (temp_cache_dir / "cache_coordinate.json").exists()
-        assert (temp_cache_dir / "cache_percorsi.json").exists()
\ No newline at end of file
+        assert (temp_cache_dir / "cache_percorsi.json").exists()
+        assert (temp_cache_dir / "cache_clustering.json").exists()
+        assert (temp_cache_dir / "cache_centroidi.json").exists()
\ No newline at end of file
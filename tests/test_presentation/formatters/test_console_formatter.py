@@ -71,6 +71,24 @@ class TestConsoleFormatter:
         assert "p1@unibg.it" in result
         assert "p2@unibg.it" in result
 
+    def test_format_flotta_mostra_durata_percorso(self):
+        formatter = ConsoleFormatter(config_repo=DummyConfigRepo())
+        autista = _make_studente("a@unibg.it", "BERGAMO", "INGEGNERIA")
+        eq = _make_equipaggio(1, autista, tappe=["BERGAMO", "DALMINE"])
+        eq.durata_percorso_sec = 1230
+
+        result = formatter.format_flotta([eq])
+
+        assert "Durata percorso: 20.5 min" in result
+
+    def test_format_flotta_senza_durata_non_mostra_riga(self):
+        formatter = ConsoleFormatter(config_repo=DummyConfigRepo())
+        autista = _make_studente("a@unibg.it", "BERGAMO", "INGEGNERIA")
+
+        result = formatter.format_flotta([_make_equipaggio(1, autista)])
+
+        assert "Durata percorso" not in result
+
     def test_print_flotta_stampa_su_stdout(self, capsys):
         formatter = ConsoleFormatter(config_repo=DummyConfigRepo())
         autista = _make_studente("x@unibg.it", "BERGAMO", "INGEGNERIA")